@@ -0,0 +1,173 @@
+# Replay benchmark for vision/filters.py
+#
+# Replays the same synthetic hand session (strokes with known labels) at
+# several camera frame rates and runs the main.py stroke flow on it:
+# detect_stroke -> classify_shot on the first frame that crosses
+# MOVE_THRESHOLD. Raw frame deltas only classify correctly near the rate the
+# thresholds were tuned at; filtered, time-normalized deltas should not care.
+# The second table runs the same strokes with a synthetic 21-landmark hand
+# and engine/shots.py's landmark rules switched on (upright and tilted palm).
+#
+#   python -m bench.filter_rates
+import math
+import random
+import time
+
+import numpy as np
+
+from engine import shots
+from engine.shots import classify_shot
+from vision.filters import REFERENCE_DT, make_filter, peak_delta
+from vision.landmarks import NUM_LANDMARKS, HandFeatures
+
+MOVE_THRESHOLD = 0.035   # main.py CONSTANTS
+NOISE = 0.002            # landmark jitter, normalized image units
+RATES = [15, 24, 30, 60, 90]
+REST = 0.7               # seconds between strokes
+STROKE_TIME = 0.2
+RETURN_TIME = 0.5
+
+# label, peak velocity (units/s) in x and y
+STROKES = [
+    ("SMASH", 0.4, 4.2),
+    ("CLEAR", 0.3, -4.2),
+    ("DROP", 2.0, 0.3),
+    ("DROP", -2.0, 0.2),
+    ("SMASH", -0.5, 4.6),
+    ("CLEAR", -0.4, -4.6),
+]
+
+# ---------------- SYNTHETIC SESSION ----------------
+# Each stroke is a sin² velocity pulse; position has a closed form, so every
+# frame rate samples the exact same motion.
+def _pulse_distance(t, duration):
+    t = min(max(t, 0.0), duration)
+    return t / 2 - duration / (4 * math.pi) * math.sin(2 * math.pi * t / duration)
+
+def make_session(repeats=20):
+    schedule = []
+    start = REST
+    for _ in range(repeats):
+        for label, vx, vy in STROKES:
+            schedule.append((start, label, vx, vy))
+            start += STROKE_TIME + REST
+    return schedule, start
+
+def position(schedule, t):
+    x, y = 0.5, 0.5
+    for start, _, vx, vy in schedule:
+        if t <= start:
+            break
+        # stroke pulse, then drift back to the rest position
+        out = _pulse_distance(t - start, STROKE_TIME)
+        back = _pulse_distance(t - start - STROKE_TIME, RETURN_TIME) * STROKE_TIME / RETURN_TIME
+        x += vx * (out - back)
+        y += vy * (out - back)
+    return x, y
+
+
+def hand_template(tilt=0.0):
+    # Landmark offsets from the centroid of an open hand, fingers up: wrist
+    # below, four joints per finger from thumb to pinky. tilt rotates the
+    # hand in the image plane (radians, the features' palm_angle).
+    points = np.zeros((NUM_LANDMARKS, 3), np.float32)
+    points[0, 1] = 0.06
+    for finger in range(5):
+        for joint in range(4):
+            points[1 + 4 * finger + joint, :2] = (-0.04 + 0.02 * finger, 0.02 - 0.025 * joint)
+    points[:, :2] -= points[:, :2].mean(axis=0)
+    c, s = math.cos(tilt), math.sin(tilt)
+    x, y = points[:, 0].copy(), points[:, 1].copy()
+    points[:, 0] = c * x - s * y
+    points[:, 1] = s * x + c * y
+    return points
+
+
+# ---------------- REPLAY ----------------
+def replay(schedule, duration, fps, method, seed=0, move_threshold=MOVE_THRESHOLD, hand=None):
+    # hand: hand_template() to also feed per-frame landmark features to
+    # classify_shot (used only with shots.LANDMARK_RULES on)
+    rng = random.Random(seed)
+    f = make_filter(method)
+    prev = None
+    features = HandFeatures() if hand is not None else None
+    points = np.empty((NUM_LANDMARKS, 3), np.float32)
+
+    correct = 0
+    stroke_idx = 0
+    fired = False
+
+    n = int(duration * fps)
+    for i in range(n):
+        t = i / fps
+        x, y = position(schedule, t)
+        x += rng.gauss(0, NOISE)
+        y += rng.gauss(0, NOISE)
+        if features is not None:
+            points[:] = hand
+            points[:, 0] += x
+            points[:, 1] += y
+            features.load(points, t=t)
+
+        if f is None:
+            dx = dy = 0.0
+            if prev is not None:
+                dx, dy = x - prev[0], y - prev[1]
+            prev = (x, y)
+        else:
+            f.update(t, x, y)
+            # filtered: classify at the velocity peak, not the first crossing
+            dx, dy = peak_delta(f) or (0.0, 0.0)
+
+        # advance to the stroke window we are in
+        while stroke_idx < len(schedule) and t > schedule[stroke_idx][0] + STROKE_TIME + 0.15:
+            stroke_idx += 1
+            fired = False
+        if stroke_idx >= len(schedule):
+            break
+
+        start, label = schedule[stroke_idx][:2]
+        if fired or t < start:
+            continue
+
+        if abs(dx) > move_threshold or abs(dy) > move_threshold:
+            fired = True
+            if classify_shot(dx, dy, features) == label:
+                correct += 1
+
+    return correct / len(schedule)
+
+def time_filter(method, n=200000):
+    f = make_filter(method)
+    start = time.perf_counter()
+    for i in range(n):
+        f.update(i / 60.0, 0.5 + 0.001 * (i & 7), 0.5)
+    return (time.perf_counter() - start) / n * 1e9
+
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    schedule, duration = make_session()
+    methods = ["none", "one_euro", "kalman"]
+
+    print(f"{len(schedule)} strokes, {duration:.0f} s session, accuracy per frame rate\n")
+    print("method     " + "".join(f"{fps:>8} fps" for fps in RATES) + "     spread")
+    for method in methods:
+        scores = [replay(schedule, duration, fps, method) for fps in RATES]
+        row = "".join(f"{s * 100:11.1f}%" for s in scores)
+        print(f"{method:<10}{row}  {100 * (max(scores) - min(scores)):8.1f}%")
+
+    print("\nwith landmark rules (engine/shots.py LANDMARK_RULES)")
+    shots.LANDMARK_RULES = True
+    for tilt in (0.0, 0.8):
+        hand = hand_template(tilt)
+        for method in methods:
+            scores = [replay(schedule, duration, fps, method, hand=hand) for fps in RATES]
+            row = "".join(f"{s * 100:11.1f}%" for s in scores)
+            name = f"{method}, tilt {tilt:g}"
+            print(f"{name:<20}{row}  {100 * (max(scores) - min(scores)):8.1f}%")
+    shots.LANDMARK_RULES = False
+
+    print()
+    for method in methods[1:]:
+        print(f"{method:<10} update: {time_filter(method):.0f} ns")
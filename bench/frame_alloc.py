@@ -0,0 +1,131 @@
+# Allocation benchmark for the main.py frame path (runtime/buffers.py)
+#
+# Replays a synthetic recorded session through capture -> flip -> RGB
+# conversion (HandTracker._prepare) -> draw, once allocating fresh frames
+# the way main.py used to and once through reused dst= buffers. Reports
+# bytes allocated per frame (tracemalloc peak above the loop's baseline),
+# pool growth, and frame-time spread as a measure of allocator jitter.
+#
+#   python -m bench.frame_alloc --frames 600 --size 640x480
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from engine.state import GameState
+from main import draw_scene
+from runtime.buffers import FramePool
+from vision.sources import SessionRecorder, open_source
+
+
+# ---------------- SYNTHETIC SESSION ----------------
+def record_session(path, frames, width, height):
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (height, width, 3), np.uint8)
+    recorder = SessionRecorder(path, "raw")
+    for i in range(frames):
+        recorder.write(np.roll(base, i, axis=1), i / 30)
+    recorder.close()
+
+
+# ---------------- LOOPS ----------------
+# Each loop yields once per frame so the harness can measure around it
+def allocating(cap, game):
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            return
+        frame = cv2.flip(frame, 1)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        vis = draw_scene(frame, game)
+        yield rgb, vis
+
+def pooled(cap, game, pools):
+    capture, tracker, render = pools
+    raw = None
+    while True:
+        ret, raw = cap.read(raw)
+        if not ret:
+            return
+        frame = capture.acquire(raw.shape)
+        cv2.flip(raw, 1, dst=frame)
+        rgb = tracker.acquire(frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        vis = render.acquire(frame.shape)
+        draw_scene(frame, game, vis)
+        yield rgb, vis
+        capture.release(frame)
+        tracker.release(rgb)
+        render.release(vis)
+
+
+def measure(path, mode, warmup=30):
+    game = GameState(verbose=False)
+    pools = (FramePool(), FramePool(), FramePool())
+
+    def frames():
+        cap = open_source(path, realtime=False)
+        return allocating(cap, game) if mode == "alloc" else pooled(cap, game, pools)
+
+    # -------- BYTES PER FRAME --------
+    tracemalloc.start()
+    per_frame = []
+    loop = frames()
+    base = 0
+    for i, out in enumerate(loop):
+        del out
+        if i >= warmup:
+            per_frame.append(tracemalloc.get_traced_memory()[1] - base)
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    tracemalloc.stop()
+
+    # -------- FRAME TIMES (no tracing) --------
+    gc_before = sum(s["collections"] for s in gc.get_stats())
+    times = []
+    loop = frames()
+    start = time.perf_counter()
+    for out in loop:
+        del out
+        end = time.perf_counter()
+        times.append(end - start)
+        start = end
+    collections = sum(s["collections"] for s in gc.get_stats()) - gc_before
+
+    times = np.array(times[warmup:]) * 1000
+    return {
+        "bytes": float(np.mean(per_frame)),
+        "grown": sum(p.allocated for p in pools),
+        "p50": float(np.percentile(times, 50)),
+        "p99": float(np.percentile(times, 99)),
+        "max": float(times.max()),
+        "std": float(times.std()),
+        "gc": collections,
+    }
+
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--size", default="640x480", help="WIDTHxHEIGHT")
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session")
+        record_session(path, args.frames, width, height)
+
+        print(f"{args.frames} frames {width}x{height}\n")
+        print("mode       bytes/frame  buffers   p50 ms   p99 ms   max ms   std ms  gc runs")
+        for mode in ("alloc", "pooled"):
+            r = measure(path, mode)
+            print(
+                f"{mode:<8} {r['bytes'] / 1024:10.1f} KB {r['grown']:8d} {r['p50']:8.2f} "
+                f"{r['p99']:8.2f} {r['max']:8.2f} {r['std']:8.2f} {r['gc']:8d}"
+            )
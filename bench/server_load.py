@@ -0,0 +1,187 @@
+# Load test for runtime/server.py
+#
+# Opens --sessions connections, joins a session on each and plays: every
+# client sends one hand sample per tick, following the shuttle in its
+# snapshots and swinging whenever its rally is idle. Reports the server's
+# tick cost and lateness (its STATS reply), snapshot delivery per session
+# and how many sessions one core would carry at the tick rate.
+#
+#   python -m bench.server_load --sessions 500 --spawn     # own server
+#   python -m bench.server_load --sessions 500 --port 8765 # running one
+#
+# Client and server share the machine: on few cores the client's own load
+# shows up as server lateness.
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+from engine.controls import CONSTANTS
+from engine.rules import IDLE
+from engine.sim import SHOT_STROKES
+from engine.snapshot import FIELD_NAMES, SnapshotDecoder
+from runtime.server import (INPUT, JOIN, SNAPSHOT, STATS, STATS_REPLY, TICK_HZ, WELCOME,
+                            encode, read_message)
+
+STATE, RALLY_COUNT, SHUTTLE_X = (FIELD_NAMES.index(name) for name in ("state", "rally_count", "shuttle_x"))
+
+# ---------------- CLIENT ----------------
+class Client:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.reader = self.writer = None
+        self.sid = None
+
+        self.cx = 0.5
+        self.state = IDLE
+        self.shuttle_x = 5.0
+        self.next_swing = 0.0
+
+        self.decoder = SnapshotDecoder()
+        self.snapshots = 0
+        self.rallies = 0
+        self.stats = None       # future for a STATS_REPLY
+
+    async def connect(self, host, port, unix):
+        if unix:
+            self.reader, self.writer = await asyncio.open_unix_connection(unix)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(encode(JOIN))
+        kind, values = await read_message(self.reader)
+        if kind != WELCOME:
+            raise RuntimeError(f"expected WELCOME, got message type {kind}")
+        self.sid = values[0]
+
+    async def listen(self):
+        try:
+            while True:
+                kind, values = await read_message(self.reader)
+                if kind == SNAPSHOT:
+                    self.snapshots += 1
+                    snap, _ = self.decoder.decode(values[0])
+                    self.state, self.rallies = snap[STATE], snap[RALLY_COUNT]
+                    self.shuttle_x = snap[SHUTTLE_X]
+                elif kind == STATS_REPLY and self.stats is not None:
+                    self.stats.set_result(values)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def sample(self, now):
+        # Hand under the shuttle (inverse of apply_hand_input's mapping),
+        # a swing once a second while the rally is idle, still otherwise
+        c = CONSTANTS
+        self.cx = (self.shuttle_x / c["COURT_WIDTH"] - 0.5) / c["HAND_SENSITIVITY"] + 0.5
+        if self.state == IDLE and now >= self.next_swing:
+            self.next_swing = now + 1.0
+            sdx, sdy = SHOT_STROKES[self.rng.choice(list(SHOT_STROKES))]
+            return encode(INPUT, self.cx, 0.5, sdx, sdy, sdx, sdy)
+        return encode(INPUT, self.cx, 0.5, 0.0, 0.0, 0.0, 0.0)
+
+
+# ---------------- SERVER PROCESS ----------------
+def spawn_server(port, hz):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "runtime.server", "--port", str(port), "--hz", str(hz), "--report", "0"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return proc
+
+def cpu_seconds(pid):
+    # utime + stime of a process (Linux /proc); None elsewhere
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError):
+        return None
+
+async def wait_for_server(host, port, timeout=10.0):
+    end = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > end:
+                raise
+            await asyncio.sleep(0.1)
+
+
+# ---------------- RUN ----------------
+async def run(args):
+    proc = None
+    if args.spawn:
+        proc = spawn_server(args.port, args.hz)
+        await wait_for_server(args.host, args.port)
+
+    try:
+        clients = [Client(i) for i in range(args.sessions)]
+        for client in clients:
+            await client.connect(args.host, args.port, args.unix)
+        listeners = [asyncio.create_task(c.listen()) for c in clients]
+
+        # Measure from here on: every session is live
+        cpu0 = cpu_seconds(proc.pid) if proc else None
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        dt = 1.0 / args.hz
+        deadline = start
+        while loop.time() - start < args.seconds:
+            now = loop.time() - start
+            for client in clients:
+                client.writer.write(client.sample(now))
+            deadline += dt
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+        elapsed = loop.time() - start
+        cpu1 = cpu_seconds(proc.pid) if proc else None
+        delivered = sum(c.snapshots for c in clients)
+        rallies = sum(c.rallies for c in clients)
+
+        probe = clients[0]
+        probe.stats = loop.create_future()
+        probe.writer.write(encode(STATS))
+        stats = await asyncio.wait_for(probe.stats, 5.0)
+
+        for client in clients:
+            client.writer.close()
+        for task in listeners:
+            task.cancel()
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    sessions, ticks, skipped, mean, p50, p99, worst, late = stats
+    busy = mean * args.hz / 1000        # share of one core spent ticking
+    print(f"sessions      {args.sessions} ({sessions} on the server)")
+    print(f"tick          mean {mean:.3f} ms  p50 {p50:.3f}  p99 {p99:.3f}  max {worst:.3f}")
+    print(f"late p99      {late:.3f} ms")
+    print(f"snapshots     {delivered / elapsed / args.sessions:.1f} /s per session "
+          f"(tick rate {args.hz:g}), {skipped} skipped")
+    print(f"exchanges     {rallies}")
+    if busy > 0:
+        print(f"per core      {args.sessions / busy:,.0f} sessions (tick work, {100 * busy:.1f}% of a core)")
+    if cpu0 is not None and cpu1 is not None and cpu1 > cpu0:
+        share = (cpu1 - cpu0) / elapsed
+        print(f"              {args.sessions / share:,.0f} sessions (whole server process, "
+              f"{100 * share:.1f}% of a core)")
+
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--hz", type=float, default=TICK_HZ, help="input rate (and server tick rate with --spawn)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a unix socket server")
+    parser.add_argument("--spawn", action="store_true", help="start a server process for the test (TCP)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
@@ -0,0 +1,325 @@
+# Benchmark suite for the engine and vision hot paths
+#
+# Every case runs offline on synthetic input (or a recorded landmark trace
+# with --trace) and reports time per call and calls per second. Results are
+# compared with a stored baseline; any case slower than the baseline by
+# more than --threshold fails the run (exit code 1). The comparison uses the
+# best round, which is far less sensitive to machine noise than the median.
+#
+#   python -m bench.suite --save                 # record the baseline
+#   python -m bench.suite                        # compare against it
+#   python -m bench.suite --only classify draw   # a subset
+#
+# Baselines are per machine, so bench/baseline.json is not committed (see
+# .gitignore): record one before changing the code under test.
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from engine.controls import CONSTANTS
+from engine.physics import ShuttlePhysics3D
+from engine.rules import IDLE
+from engine.shots import classify_shot
+from engine.state import GameState
+from vision.landmarks import HandFeatures, NUM_LANDMARKS
+from vision.trace import PRESENT, TRACE_DTYPE, TraceTracker, load_trace
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+THRESHOLD = 0.25        # fail when a case is >25% slower than its baseline
+ROUNDS = 7              # timed rounds per case
+
+
+# ---------------- SYNTHETIC INPUT ----------------
+def synthetic_trace(seconds=20, fps=30):
+    # Landmark records for the labelled strokes of bench/filter_rates.py
+    from bench.filter_rates import make_session, position
+
+    schedule, _ = make_session(2)
+    records = np.zeros(int(seconds * fps), TRACE_DTYPE)
+    rng = np.random.default_rng(0)
+    offsets = rng.normal(0, 0.03, (NUM_LANDMARKS, 2)).astype(np.float32)
+
+    for i, rec in enumerate(records):
+        t = i / fps
+        x, y = position(schedule, t)
+        rec["t"] = t
+        rec["present"] = PRESENT
+        rec["score"] = 0.95
+        rec["points"][:, 0] = x + offsets[:, 0]
+        rec["points"][:, 1] = y + offsets[:, 1]
+    return records
+
+def synthetic_frames(count=60, width=640, height=480):
+    # A bright "hand" blob sweeping over noise
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 80, (height, width, 3), np.uint8)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        x = 100 + (i * 7) % (width - 200)
+        frame[200:300, x:x + 80] = (180, 200, 230)
+        frames.append(frame)
+    return frames
+
+
+# ---------------- CASES ----------------
+# A case is set up once and returns run(n): perform n calls of the hot path.
+def case_classify(trace):
+    strokes = [(0.0, 0.12), (0.0, -0.12), (0.05, 0.0), (0.01, 0.01), (0.03, 0.09)]
+    features = HandFeatures()
+    for rec in trace[:2]:
+        features.load(rec["points"], rec["handedness"], rec["score"], float(rec["t"]))
+
+    def run(n):
+        for i in range(n):
+            dx, dy = strokes[i % 5]
+            classify_shot(dx, dy, features if i & 1 else None)
+    return run
+
+def case_update(trace):
+    # One GameState.update per 60 Hz tick, hitting again whenever idle so
+    # every state is exercised
+    game = GameState(verbose=False, rng=random.Random(0))
+    clock = [0.0]
+
+    def run(n):
+        now = clock[0]
+        for _ in range(n):
+            now += 1 / 60
+            if game.state == IDLE:
+                game.start_player_hit(now, "SMASH")
+            game.update(now, CONSTANTS)
+        clock[0] = now
+    return run
+
+def case_physics(trace):
+    shuttle = ShuttlePhysics3D()
+    clock = [0.0]
+
+    def run(n):
+        now = clock[0]
+        for _ in range(n):
+            now += 1 / 60
+            if not shuttle.active:
+                shuttle.launch(2.0, 650, 8.0, 0.65, 3.0, now)
+            shuttle.update(now)
+        clock[0] = now
+    return run
+
+def case_trace_tracker(trace):
+    tracker = TraceTracker(trace, "one_euro")
+
+    def run(n):
+        for _ in range(n):
+            if tracker.done:
+                tracker.rewind()
+            tracker.get_hand_data()
+    return run
+
+def case_hand_tracker(trace):
+    # MediaPipe inference on synthetic frames (needs mediapipe and the model)
+    from vision.hand_tracking import HandTracker
+
+    tracker = HandTracker("VIDEO")
+    frames = synthetic_frames()
+    clock = [0]
+
+    def run(n):
+        for _ in range(n):
+            clock[0] += 1
+            tracker.get_hand_data(frames[clock[0] % len(frames)], clock[0] * 33)
+    return run
+
+def case_multi_hand(trace):
+    # Two players through one num_hands=2 call; against hand_tracker this
+    # is the cost of the second player
+    from vision.hand_tracking import MultiHandTracker
+
+    tracker = MultiHandTracker(2, "VIDEO")
+    frames = synthetic_frames()
+    clock = [0]
+
+    def run(n):
+        for _ in range(n):
+            clock[0] += 1
+            tracker.get_hand_data(frames[clock[0] % len(frames)], clock[0] * 33)
+    return run
+
+def case_slots(hands):
+    # PlayerSlots.update (ID tracking + per-player features) on `hands`
+    # synthetic detections per frame, no MediaPipe: slots_1 / 2 / 4 show how
+    # the per-frame cost grows with the number of hands
+    def setup(trace):
+        from types import SimpleNamespace
+        from vision.multi_hand import PlayerSlots
+
+        slots = PlayerSlots(hands, "one_euro")
+        frames = []
+        for rec in trace[:60]:
+            # The trace's hand, once in each player's strip of the frame
+            frames.append([
+                ([SimpleNamespace(x=(h + x) / hands, y=y, z=z) for x, y, z in rec["points"].tolist()], None, None)
+                for h in range(hands)
+            ])
+        clock = [0]
+
+        def run(n):
+            for _ in range(n):
+                clock[0] += 1
+                slots.update(frames[clock[0] % len(frames)], clock[0] * 33)
+        return run
+    return setup
+
+def case_draw(trace):
+    from main import draw_scene
+
+    game = GameState(verbose=False)
+    game.shuttle_x, game.shuttle_y = 3.0, 420.0
+    frame = synthetic_frames(1)[0]
+
+    def run(n):
+        for _ in range(n):
+            draw_scene(frame, game)
+    return run
+
+def case_loop(trace):
+    # Whole main.py serial loop, headless: raw session replay + trace input
+    from main import no_display, run_serial
+    from vision.sources import SessionRecorder, open_source
+
+    frames = synthetic_frames()
+    # Removed when the case is garbage collected (or at exit): run() keeps
+    # a reference for as long as the session is replayed
+    tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(tmp.name, "session")
+    recorder = SessionRecorder(path, "raw")
+    for i, frame in enumerate(frames):
+        recorder.write(frame, i / 30)
+    recorder.close()
+
+    def run(n, tmp=tmp):
+        done = 0
+        while done < n:
+            count = min(n - done, len(frames))
+            cap = open_source(path, realtime=False)
+            limited = _Limit(cap, count)
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_serial(limited, TraceTracker(trace), GameState(verbose=False), no_display)
+            done += count
+    return run
+
+class _Limit:
+    # Stops a source after `count` frames
+    def __init__(self, source, count):
+        self.source = source
+        self.left = count
+
+    def __getattr__(self, name):
+        return getattr(self.source, name)
+
+    def read(self, dst=None):
+        if self.left <= 0:
+            return False, None
+        self.left -= 1
+        return self.source.read(dst)
+
+
+# name -> (setup, calls per round)
+CASES = {
+    "classify": (case_classify, 20000),
+    "update": (case_update, 20000),
+    "physics": (case_physics, 20000),
+    "trace_tracker": (case_trace_tracker, 5000),
+    "hand_tracker": (case_hand_tracker, 20),
+    "multi_hand": (case_multi_hand, 20),
+    "slots_1": (case_slots(1), 2000),
+    "slots_2": (case_slots(2), 2000),
+    "slots_4": (case_slots(4), 1000),
+    "draw": (case_draw, 200),
+    "loop": (case_loop, 60),
+}
+
+
+# ---------------- HARNESS ----------------
+def measure(run, calls, rounds=ROUNDS):
+    run(max(1, calls // 10))        # warm up
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run(calls)
+        per_call.append((time.perf_counter() - start) / calls)
+    per_call.sort()
+    return {
+        "us": per_call[len(per_call) // 2] * 1e6,
+        "best_us": per_call[0] * 1e6,
+        "per_s": 1 / per_call[len(per_call) // 2],
+    }
+
+def run_suite(names, trace, scale=1.0):
+    results = {}
+    for name in names:
+        setup, calls = CASES[name]
+        try:
+            run = setup(trace)
+        except ImportError as e:
+            print(f"{name:<14} skipped ({e})")
+            continue
+        results[name] = measure(run, max(1, int(calls * scale)))
+    return results
+
+def compare(results, baseline, threshold):
+    failed = []
+    print(f"\n{'case':<14}{'us/call':>12}{'best us':>12}{'calls/s':>12}{'baseline':>12}{'change':>9}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            status, change = "new", ""
+        else:
+            ratio = r["best_us"] / base["best_us"] - 1
+            change = f"{100 * ratio:+.0f}%"
+            status = "ok"
+            if ratio > threshold:
+                status = "SLOWER"
+                failed.append(name)
+        base_us = f"{base['best_us']:.2f}" if base else "-"
+        print(f"{name:<14}{r['us']:>12.2f}{r['best_us']:>12.2f}{r['per_s']:>12,.0f}{base_us:>12}{change:>9}  {status}")
+    return failed
+
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="+", choices=list(CASES), help="cases to run")
+    parser.add_argument("--trace", help="recorded landmark trace (default: synthetic)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown, fraction")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply calls per round")
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace, mmap=False) if args.trace else synthetic_trace()
+    results = run_suite(args.only or list(CASES), trace, args.scale)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    failed = compare(results, baseline, args.threshold)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nbaseline saved to {args.baseline}")
+    elif failed:
+        print(f"\nFAIL: {', '.join(failed)} slower than baseline by more than {100 * args.threshold:.0f}%")
+        sys.exit(1)
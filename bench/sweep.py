@@ -0,0 +1,191 @@
+# Parameter sweep over engine/controls.py CONSTANTS and engine/shots.py
+# thresholds
+#
+# Every configuration is evaluated headlessly on a process pool:
+#   win_rate         scripted-player GameState rallies (engine/sim.py), or
+#                    the batched engine with --lanes (engine/batch.py)
+#   stroke_accuracy  labelled synthetic strokes (bench/filter_rates.py)
+#                    replayed at several frame rates
+#   trace_*          per recorded landmark trace (--trace): win rate and
+#                    exchanges per minute when the trace drives the player
+# One CSV row per configuration, written in order as results come in.
+#
+#   python -m bench.sweep --grid AI_REACT_TIME=0.3,0.4,0.5 --grid SMASH_SPEED=0.035,0.045
+#   python -m bench.sweep --range CATCH_RADIUS=0.5:1.2 --range DROP_SPEED=0.01:0.03 --samples 64
+import argparse
+import csv
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import shots
+from engine.controls import CONSTANTS
+
+# Module-level thresholds in engine/shots.py a configuration may override
+SHOT_PARAMS = [
+    "SMASH_SPEED",
+    "CLEAR_SPEED",
+    "DROP_SPEED",
+    "UPWARD_DY",
+    "DOWNWARD_DY",
+    "LANDMARK_RULES",
+    "SMASH_TIP_SPEED",
+    "CLEAR_PALM_ANGLE",
+]
+SHOT_DEFAULTS = {name: getattr(shots, name) for name in SHOT_PARAMS}
+
+ACCURACY_RATES = [15, 30, 60]
+
+
+# ---------------- CONFIGURATIONS ----------------
+def _check_name(name):
+    if name not in CONSTANTS and name not in SHOT_PARAMS:
+        raise ValueError(f"Unknown parameter: {name}")
+    return name
+
+def parse_grid(specs):
+    # ["NAME=v1,v2", ...] -> cartesian product of all values
+    axes = []
+    for spec in specs:
+        name, values = spec.split("=", 1)
+        axes.append([(_check_name(name), float(v)) for v in values.split(",")])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+def parse_ranges(specs, samples, seed=0):
+    # ["NAME=lo:hi", ...] -> `samples` uniform random draws
+    ranges = []
+    for spec in specs:
+        name, bounds = spec.split("=", 1)
+        lo, hi = (float(v) for v in bounds.split(":"))
+        ranges.append((_check_name(name), lo, hi))
+    rng = random.Random(seed)
+    return [{name: rng.uniform(lo, hi) for name, lo, hi in ranges} for _ in range(samples)]
+
+
+# ---------------- EVALUATION ----------------
+# Shot thresholds are module globals read by classify_shot, so they are set
+# on engine.shots for the duration of one evaluation. Every pool worker is
+# its own process, so configurations never see each other's values.
+def _apply_shot_params(params):
+    for name in SHOT_PARAMS:
+        setattr(shots, name, params.get(name, SHOT_DEFAULTS[name]))
+
+def _rallies(constants, job):
+    from engine.sim import ScriptedPlayer, Simulator, summarize
+
+    if job["lanes"]:
+        from engine.batch import run_batch
+
+        game, _ = run_batch(job["lanes"], job["exchanges"], job["dt"], job["seed"], constants)
+        won, lost = int(game.won.sum()), int(game.lost.sum())
+        return won / (won + lost), (won + lost) / max(lost, 1)
+
+    player = ScriptedPlayer(constants, seed=job["seed"])
+    sim = Simulator(player, constants, job["dt"], seed=job["seed"])
+    summary = summarize(sim.run(job["exchanges"]))
+    return summary["win_rate"], summary["rally_length"]
+
+def _stroke_accuracy(constants, job):
+    from bench.filter_rates import make_session, replay
+
+    schedule, duration = make_session(job["repeats"])
+    scores = [
+        replay(schedule, duration, fps, job["filter"], job["seed"], constants["MOVE_THRESHOLD"])
+        for fps in ACCURACY_RATES
+    ]
+    return sum(scores) / len(scores)
+
+def _trace_rallies(constants, path, job):
+    from engine.sim import Simulator, TracePlayer, summarize
+
+    player = TracePlayer(path, job["filter"])
+    sim = Simulator(player, constants, job["dt"], seed=job["seed"])
+    outcomes = sim.run()
+    minutes = sim.clock.now / 60
+    return summarize(outcomes)["win_rate"], len(outcomes) / minutes if minutes else 0.0
+
+def evaluate(args):
+    index, params, job = args
+    start = time.perf_counter()
+
+    constants = dict(CONSTANTS)
+    constants.update({k: v for k, v in params.items() if k in CONSTANTS})
+    _apply_shot_params(params)
+
+    row = {"index": index}
+    row.update(params)
+    row["win_rate"], row["rally_length"] = _rallies(constants, job)
+    row["stroke_accuracy"] = _stroke_accuracy(constants, job)
+    for i, path in enumerate(job["traces"]):
+        row[f"trace{i}_win_rate"], row[f"trace{i}_exchanges_per_min"] = _trace_rallies(constants, path, job)
+    row["eval_seconds"] = time.perf_counter() - start
+
+    _apply_shot_params({})
+    return row
+
+
+# ---------------- RUN ----------------
+def sweep(configs, job, out, workers=None):
+    tasks = [(i, params, job) for i, params in enumerate(configs)]
+    names = sorted({name for params in configs for name in params})
+    columns = ["index"] + names + ["win_rate", "rally_length", "stroke_accuracy"]
+    for i in range(len(job["traces"])):
+        columns += [f"trace{i}_win_rate", f"trace{i}_exchanges_per_min"]
+    columns.append("eval_seconds")
+
+    start = time.perf_counter()
+    with open(out, "w", newline="") as f, ProcessPoolExecutor(workers) as pool:
+        writer = csv.DictWriter(f, columns)
+        writer.writeheader()
+        # map() keeps configuration order; small chunks keep all workers busy
+        chunk = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+        for row in pool.map(evaluate, tasks, chunksize=chunk):
+            writer.writerow({k: round(v, 6) if isinstance(v, float) else v for k, v in row.items()})
+            f.flush()
+            print(
+                f"[{row['index'] + 1}/{len(tasks)}] win {row['win_rate']:.3f} "
+                f"acc {row['stroke_accuracy']:.3f} ({row['eval_seconds']:.2f} s)"
+            )
+    return time.perf_counter() - start
+
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=LO:HI")
+    parser.add_argument("--samples", type=int, default=32, help="random configurations for --range")
+    parser.add_argument("--trace", action="append", default=[], help="landmark trace to replay per configuration")
+    parser.add_argument("--filter", default="one_euro", help="motion filter for traces and stroke accuracy")
+    parser.add_argument("--exchanges", type=int, default=1000, help="exchanges per configuration (per lane with --lanes)")
+    parser.add_argument("--lanes", type=int, default=0, help="use the batched engine with this many lanes")
+    parser.add_argument("--repeats", type=int, default=5, help="synthetic stroke session repeats")
+    parser.add_argument("--dt", type=float, default=1 / 60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="pool size (default: all cores)")
+    parser.add_argument("--out", default="sweep.csv")
+    args = parser.parse_args()
+
+    if args.grid and args.range:
+        parser.error("use either --grid or --range")
+    if args.grid:
+        configs = parse_grid(args.grid)
+    elif args.range:
+        configs = parse_ranges(args.range, args.samples, args.seed)
+    else:
+        configs = [{}]    # baseline only
+
+    job = {
+        "exchanges": args.exchanges,
+        "lanes": args.lanes,
+        "repeats": args.repeats,
+        "filter": args.filter,
+        "traces": args.trace,
+        "dt": args.dt,
+        "seed": args.seed,
+    }
+
+    elapsed = sweep(configs, job, args.out, args.workers)
+    print(f"{len(configs)} configurations in {elapsed:.1f} s -> {args.out}")
@@ -1,6 +1,10 @@
 import cv2
+import sys
 
-cap = cv2.VideoCapture(0)
+from vision.sources import open_source
+
+# Camera index, recorded session directory or video file (vision/sources.py)
+cap = open_source(sys.argv[1] if len(sys.argv) > 1 else 0)
 
 if not cap.isOpened():
     print("Camera not opened")
@@ -0,0 +1,96 @@
+from engine.controls import CONSTANTS
+from engine.physics import landing_time, solve_launch, trajectory
+
+# ---------------- AI OPPONENT ----------------
+# Replaces the AI's teleport to the landing spot and its fixed random shot
+# pairs. Everything is decided once per shot:
+#   plan()         on the player's hit: landing x and time predicted from
+#                  the shuttle's launch, and a straight run there under a
+#                  speed limit
+#   position()     every frame: one clamped interpolation along that run
+#   choose_shot()  when the AI hits back: shot type and target from where
+#                  the player stands
+# so the per-frame cost is constant no matter how the rally goes.
+
+AI_SPEED = 9.0          # court units / s
+AI_REACTION = 0.12      # s after the player's hit before the AI moves
+AI_REACH = 0.8          # court units; further from the shuttle = miss
+AI_READ_ERROR = 0.06    # relative error of the AI's read of the launch velocity
+
+class AIOpponent:
+    def __init__(self, constants=CONSTANTS, speed=AI_SPEED, reaction=AI_REACTION,
+                 reach=AI_REACH, read_error=AI_READ_ERROR):
+        self.constants = constants
+        self.speed = speed
+        self.reaction = reaction
+        self.reach = reach
+        self.read_error = read_error
+
+        # Current plan: move from (t0, x0) to (t1, x1)
+        self.t0 = self.t1 = 0.0
+        self.x0 = self.x1 = 5.0
+        self.landing_x = 5.0            # where the shuttle really comes down
+        self.intercept_time = 0.0
+        self.predicted_x = 5.0          # the AI's read of it
+        self.predicted_time = 0.0
+        self.reachable = True
+
+    # ---------------- PREDICT + PLAN ----------------
+    def plan(self, game, now):
+        # Called as the player's shot leaves. The shuttle's flight is an
+        # engine/physics.py launch that comes down on to_ai_x after the
+        # game's flight time; the AI reads that launch velocity off the
+        # swing, off by up to read_error in each component, and predicts
+        # where and when the shuttle lands from its reading alone.
+        x0 = game.player_x
+        vx, vz, g = solve_launch(game.to_ai_x - x0, game.duration)
+        self.landing_x = game.to_ai_x
+        self.intercept_time = now + game.duration
+
+        if self.read_error:
+            vx *= 1 + game.rng.uniform(-self.read_error, self.read_error)
+            vz *= 1 + game.rng.uniform(-self.read_error, self.read_error)
+        flight = float(landing_time(vz, g))
+        self.predicted_x = float(trajectory(x0, vx, vz, g, flight)[0])
+        self.predicted_time = now + flight
+
+        self.x0 = game.ai_x
+        self.t0 = now + self.reaction
+        travel = self.speed * max(0.0, self.predicted_time - self.t0)
+        self.x1 = self.x0 + max(-travel, min(travel, self.predicted_x - self.x0))
+        self.t1 = self.t0 + abs(self.x1 - self.x0) / self.speed
+
+        # Judged where the AI really is when the shuttle comes down: the run
+        # is timed to the predicted landing, so it may still be under way
+        # (or long over) at the real one
+        self.reachable = abs(self.position(self.intercept_time) - self.landing_x) <= self.reach
+        return self.predicted_x, self.predicted_time
+
+    def position(self, now):
+        if now <= self.t0:
+            return self.x0
+        if now >= self.t1:
+            return self.x1
+        return self.x0 + (self.x1 - self.x0) * (now - self.t0) / (self.t1 - self.t0)
+
+    # ---------------- SHOT CHOICE ----------------
+    def choose_shot(self, game, incoming):
+        # (shot, target x): a smash on a high ball, otherwise short when the
+        # player is deep and deep when they are up at the net; always away
+        # from the player's side
+        player_y = self.constants["PLAYER_Y"]
+        if incoming == "CLEAR":
+            shot = "SMASH"
+        elif game.player_y > player_y + 20:
+            shot = "DROP"
+        elif game.player_y < player_y - 40:
+            shot = "CLEAR"
+        else:
+            shot = game.rng.choice(["CLEAR", "DROP"])
+
+        court = self.constants["COURT_WIDTH"]
+        if game.player_x < court / 2:
+            target = game.rng.uniform(court * 0.6, court * 0.85)
+        else:
+            target = game.rng.uniform(court * 0.15, court * 0.4)
+        return shot, target
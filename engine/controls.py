@@ -0,0 +1,105 @@
+from engine.rules import AI_WAIT, IDLE
+from engine.shots import classify_shot
+from runtime.profiler import PROFILER
+
+# ---------------- CONSTANTS ----------------
+# Shared by main.py, the headless simulator and tuning tools
+CONSTANTS = {
+    "COURT_WIDTH": 10,
+    "SCREEN_W": 600,
+    "SCREEN_H": 800,
+    "PLAYER_Y": 680,
+    "AI_Y": 200,
+    "SHUTTLE_TIME": 0.65,
+    "AI_REACT_TIME": 0.4,
+    "COOLDOWN": 0.8,
+    "MOVE_THRESHOLD": 0.035,
+    "NEUTRAL_THRESHOLD": 0.012,
+    "HAND_SENSITIVITY": 1.8,
+    "SMOOTHING": 0.35,
+    "MAX_PLAYER_SPEED": 0.9,
+    "CATCH_RADIUS": 0.8
+}
+
+# ---------------- HELPERS ----------------
+def clamp(val, minv, maxv):
+    return max(minv, min(maxv, val))
+
+def detect_stroke(dx, dy, constants=CONSTANTS):
+    if dx is None or dy is None:
+        return False
+    return abs(dx) > constants["MOVE_THRESHOLD"] or abs(dy) > constants["MOVE_THRESHOLD"]
+
+# ---------------- HAND INPUT ----------------
+# cx, cy, dx, dy: HandTracker.get_hand_data() output
+# stroke: (dx, dy) to test for a hit this frame, or None (tracker.stroke_delta)
+def apply_hand_input(game, cx, cy, dx, dy, now, stroke, features=None, constants=CONSTANTS):
+    # -------- HAND POSITION --------
+    if cx is not None:
+        mapped_x = (cx - 0.5) * constants["HAND_SENSITIVITY"] + 0.5
+        mapped_x = clamp(mapped_x, 0, 1)
+        game.target_player_x = mapped_x * constants["COURT_WIDTH"]
+
+    # -------- PLAYER READY --------
+    if game.state == IDLE and not game.player_ready:
+        if dx is not None and dy is not None:
+            if abs(dx) < constants["NEUTRAL_THRESHOLD"] and abs(dy) < constants["NEUTRAL_THRESHOLD"]:
+                game.player_ready = True
+
+    # -------- PLAYER HIT --------
+    elif (
+        game.state == IDLE
+        and game.player_ready
+        and now - game.last_stroke_time > constants["COOLDOWN"]
+    ):
+        if stroke is not None and detect_stroke(*stroke, constants):
+            with PROFILER.stage("classify"):
+                shot = classify_shot(*stroke, features)
+            game.start_player_hit(now, shot if shot else "NORMAL")
+
+# ---------------- PLAYER 2 INPUT ----------------
+# Two-player mode (GameState(versus=True)): the same gestures drive the far
+# side, and a swing counts while the shuttle waits there (AI_WAIT)
+def apply_opponent_input(game, cx, cy, dx, dy, now, stroke, features=None, constants=CONSTANTS):
+    if cx is not None:
+        mapped_x = (cx - 0.5) * constants["HAND_SENSITIVITY"] + 0.5
+        mapped_x = clamp(mapped_x, 0, 1)
+        game.target_ai_x = mapped_x * constants["COURT_WIDTH"]
+
+    if not game.ai_ready:
+        if dx is not None and dy is not None:
+            if abs(dx) < constants["NEUTRAL_THRESHOLD"] and abs(dy) < constants["NEUTRAL_THRESHOLD"]:
+                game.ai_ready = True
+
+    elif game.state == AI_WAIT and now - game.last_ai_stroke_time > constants["COOLDOWN"]:
+        if stroke is not None and detect_stroke(*stroke, constants):
+            with PROFILER.stage("classify"):
+                shot = classify_shot(*stroke, features)
+            game.start_opponent_hit(now, shot if shot else "NORMAL")
+
+# ---------------- GAME STEP ----------------
+def step_game(game, now, constants=CONSTANTS):
+    # -------- PLAYER MOVEMENT --------
+    delta = clamp(
+        game.target_player_x - game.player_x,
+        -constants["MAX_PLAYER_SPEED"],
+        constants["MAX_PLAYER_SPEED"],
+    )
+    game.player_x += delta * constants["SMOOTHING"]
+
+    if game.versus:
+        delta = clamp(
+            game.target_ai_x - game.ai_x,
+            -constants["MAX_PLAYER_SPEED"],
+            constants["MAX_PLAYER_SPEED"],
+        )
+        game.ai_x += delta * constants["SMOOTHING"]
+
+    # -------- GAME UPDATE --------
+    # Checked inline: this also runs every tick of the headless simulators,
+    # where even a no-op stage shows up
+    if PROFILER.enabled:
+        with PROFILER.stage("update"):
+            game.update(now, constants)
+    else:
+        game.update(now, constants)
@@ -0,0 +1,267 @@
+# Drag-based shuttle flight from precomputed tables
+#
+# A shuttlecock decelerates with the square of its speed (terminal speed only
+# a few metres per second), so its flight is far from the parabola of
+# engine/physics.py and has no closed form. Instead of integrating every
+# shuttle every frame, all launches on a speed x angle grid are integrated
+# once (vectorized RK4) and stored as tables:
+#   landing distance, flight time and apex per (speed, angle)
+#   the path at fixed fractions of the flight time, for drawing
+#   flight time and launch speed per (angle, distance), the inverse lookup
+#     the game uses to send a shot a given distance
+# Every query is then a bilinear interpolation on a uniform grid: O(1),
+# no integration at run time. The tables are built on first use and cached
+# in an .npz file next to this module.
+#
+#   python -m engine.flight --rebuild      # rebuild the cache, print a summary
+import argparse
+import math
+import os
+
+import numpy as np
+
+from engine.physics import GRAVITY
+
+# ---------------- MODEL ----------------
+TERMINAL_SPEED = 10.0   # units / s; quadratic drag k = g / v_t²
+LAUNCH_HEIGHT = 1.5     # units above the floor the shuttle is struck at
+STEP = 1 / 240          # integration step, s
+MAX_FLIGHT = 8.0        # s; launches still airborne then are cut off
+
+# ---------------- GRID ----------------
+SPEEDS = (2.0, 100.0, 50)       # min, max, count (units / s)
+ANGLES = (-15.0, 75.0, 46)      # min, max, count (degrees above horizontal)
+DISTANCES = (0.0, 30.0, 121)    # inverse table, units
+SAMPLES = 33                    # path samples from launch to landing
+
+CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "flight_table.npz")
+
+# ---------------- GAME MAPPING ----------------
+# Launch angle per shot type; the speed follows from the distance to cover
+SHOT_ANGLES = {
+    "SMASH": -4.0,
+    "DROP": 25.0,
+    "CLEAR": 30.0,
+    "NORMAL": 8.0,
+}
+PX_PER_UNIT = 40        # screen rows per court unit of depth (2.5D view)
+
+
+def _params():
+    # Everything the tables depend on; a cache built with other values is stale
+    return np.array([-GRAVITY, TERMINAL_SPEED, LAUNCH_HEIGHT, STEP, MAX_FLIGHT,
+                     *SPEEDS, *ANGLES, *DISTANCES, SAMPLES])
+
+def _grid(spec):
+    lo, hi, n = spec
+    return np.linspace(lo, hi, int(n))
+
+def _cell(value, spec):
+    # Lower grid index and interpolation weight on a uniform grid, clamped
+    lo, hi, n = spec
+    f = (value - lo) / (hi - lo) * (n - 1)
+    if f <= 0:
+        return 0, 0.0
+    if f >= n - 1:
+        return n - 2, 1.0
+    i = int(f)
+    return i, f - i
+
+def _bilerp(table, i, u, j, v):
+    # table: nested lists
+    row0, row1 = table[i], table[i + 1]
+    a = row0[j] + (row0[j + 1] - row0[j]) * v
+    b = row1[j] + (row1[j + 1] - row1[j]) * v
+    return a + (b - a) * u
+
+
+# ---------------- BUILD ----------------
+def _accel(vx, vz, k, g):
+    speed = np.hypot(vx, vz)
+    return -k * speed * vx, -g - k * speed * vz
+
+def integrate(speeds, angles):
+    # Fly every (speed, angle) launch at once. Returns landing distance,
+    # flight time, apex height and the (x, z) path at SAMPLES fractions of
+    # each flight, all shaped like the broadcast inputs.
+    g = -GRAVITY
+    k = g / TERMINAL_SPEED ** 2
+    rad = np.radians(angles)
+    vx = (speeds * np.cos(rad)).ravel()
+    vz = (speeds * np.sin(rad)).ravel()
+    lanes = vx.size
+
+    x = np.zeros(lanes)
+    z = np.full(lanes, LAUNCH_HEIGHT)
+    apex = z.copy()
+    land_x = np.full(lanes, np.nan)
+    land_t = np.full(lanes, MAX_FLIGHT)
+    history = [np.stack([x, z]).astype(np.float32)]
+
+    h = STEP
+    for step in range(1, int(MAX_FLIGHT / h) + 1):
+        # -------- RK4 --------
+        ax1, az1 = _accel(vx, vz, k, g)
+        ax2, az2 = _accel(vx + 0.5 * h * ax1, vz + 0.5 * h * az1, k, g)
+        ax3, az3 = _accel(vx + 0.5 * h * ax2, vz + 0.5 * h * az2, k, g)
+        ax4, az4 = _accel(vx + h * ax3, vz + h * az3, k, g)
+        x_new = x + h * (vx + h / 6 * (ax1 + ax2 + ax3))
+        z_new = z + h * (vz + h / 6 * (az1 + az2 + az3))
+        vx = vx + h / 6 * (ax1 + 2 * ax2 + 2 * ax3 + ax4)
+        vz = vz + h / 6 * (az1 + 2 * az2 + 2 * az3 + az4)
+
+        # -------- LANDING --------
+        # First crossing of z = 0, linearly interpolated inside the step
+        landed = (z_new <= 0) & np.isnan(land_x)
+        if landed.any():
+            frac = z[landed] / (z[landed] - z_new[landed])
+            land_x[landed] = x[landed] + frac * (x_new[landed] - x[landed])
+            land_t[landed] = (step - 1 + frac) * h
+
+        x, z = x_new, z_new
+        np.maximum(apex, z, out=apex)
+        history.append(np.stack([x, z]).astype(np.float32))
+        if not np.isnan(land_x).any():
+            break
+
+    airborne = np.isnan(land_x)
+    land_x[airborne] = x[airborne]
+
+    # -------- PATH SAMPLES --------
+    # Positions at fractions of each flight, read off the step history
+    history = np.stack(history).transpose(0, 2, 1)  # (steps, lanes, 2)
+    fractions = np.linspace(0, 1, SAMPLES)[:, None]
+    pos = fractions * land_t / h
+    i0 = np.minimum(pos.astype(np.int64), len(history) - 2)
+    w = (pos - i0)[..., None]
+    lane = np.arange(lanes)
+    path = history[i0, lane] * (1 - w) + history[i0 + 1, lane] * w
+    path[-1, :, 0] = land_x
+    path[-1, :, 1] = 0.0
+    path = path.transpose(1, 0, 2)                  # (lanes, SAMPLES, 2)
+
+    shape = np.broadcast(speeds, angles).shape
+    return (land_x.reshape(shape), land_t.reshape(shape), apex.reshape(shape),
+            path.reshape(shape + (SAMPLES, 2)))
+
+
+def _invert(distance, time, speeds):
+    # Per angle: speed and flight time needed to cover each DISTANCES entry.
+    # Distance grows with speed; the running maximum guards against any
+    # flat spot before np.interp.
+    targets = _grid(DISTANCES)
+    speed_for = np.empty((distance.shape[1], len(targets)))
+    time_for = np.empty_like(speed_for)
+    for j in range(distance.shape[1]):
+        reach = np.maximum.accumulate(distance[:, j])
+        speed_for[j] = np.interp(targets, reach, speeds)
+        time_for[j] = np.interp(targets, reach, time[:, j])
+    return speed_for, time_for
+
+
+# ---------------- TABLE ----------------
+class FlightTable:
+    def __init__(self, distance, time, apex, path):
+        self.distance = distance        # (speed, angle)
+        self.time = time
+        self.apex = apex
+        self.path = path                # (speed, angle, SAMPLES, 2)
+        self.speed_for, self.time_for = _invert(distance, time, _grid(SPEEDS))
+
+        # Nested lists for the scalar queries: element access on lists is
+        # several times cheaper than indexing NumPy arrays one value at a time
+        self._distance = distance.tolist()
+        self._time = time.tolist()
+        self._speed_for = self.speed_for.tolist()
+        self._time_for = self.time_for.tolist()
+
+    @classmethod
+    def build(cls):
+        speeds, angles = np.meshgrid(_grid(SPEEDS), _grid(ANGLES), indexing="ij")
+        return cls(*integrate(speeds, angles))
+
+    @classmethod
+    def load(cls, path=CACHE):
+        # Cached tables if present and built with the current model, else
+        # built now and cached
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if np.array_equal(data["params"], _params()):
+                    return cls(data["distance"], data["time"], data["apex"], data["path"])
+        table = cls.build()
+        table.save(path)
+        return table
+
+    def save(self, path=CACHE):
+        np.savez(path, params=_params(), distance=self.distance, time=self.time,
+                 apex=self.apex, path=self.path)
+
+    # ---------------- QUERIES ----------------
+    def landing(self, speed, angle):
+        # (distance, flight time) for one launch
+        i, u = _cell(speed, SPEEDS)
+        j, v = _cell(angle, ANGLES)
+        return _bilerp(self._distance, i, u, j, v), _bilerp(self._time, i, u, j, v)
+
+    def launch_speed(self, angle, distance):
+        # Speed that lands `distance` away at this angle, and its flight time
+        i, u = _cell(angle, ANGLES)
+        j, v = _cell(distance, DISTANCES)
+        return _bilerp(self._speed_for, i, u, j, v), _bilerp(self._time_for, i, u, j, v)
+
+    def flight_time(self, angle, distance):
+        return self.launch_speed(angle, distance)[1]
+
+    def position(self, speed, angle, t):
+        # (x, z) t seconds into the flight, from the stored path samples
+        i, u = _cell(speed, SPEEDS)
+        j, v = _cell(angle, ANGLES)
+        duration = _bilerp(self._time, i, u, j, v)
+        f = min(max(t / duration, 0.0), 1.0) * (SAMPLES - 1)
+        s = min(int(f), SAMPLES - 2)
+        w = f - s
+
+        corners = self.path[i:i + 2, j:j + 2, s:s + 2]
+        weights = np.array([[(1 - u) * (1 - v), (1 - u) * v], [u * (1 - v), u * v]])
+        xz = np.tensordot(weights, corners, axes=([0, 1], [0, 1]))
+        return tuple((xz[0] + (xz[1] - xz[0]) * w).tolist())
+
+    def landings(self, speeds, angles):
+        # Vectorized landing() for arrays of launches
+        fi = (np.asarray(speeds, np.float64) - SPEEDS[0]) / (SPEEDS[1] - SPEEDS[0]) * (SPEEDS[2] - 1)
+        fj = (np.asarray(angles, np.float64) - ANGLES[0]) / (ANGLES[1] - ANGLES[0]) * (ANGLES[2] - 1)
+        fi = np.clip(fi, 0, SPEEDS[2] - 1)
+        fj = np.clip(fj, 0, ANGLES[2] - 1)
+        i = np.minimum(fi.astype(np.int64), SPEEDS[2] - 2)
+        j = np.minimum(fj.astype(np.int64), ANGLES[2] - 2)
+        u, v = fi - i, fj - j
+
+        def lerp(t):
+            a = t[i, j] + (t[i, j + 1] - t[i, j]) * v
+            b = t[i + 1, j] + (t[i + 1, j + 1] - t[i + 1, j]) * v
+            return a + (b - a) * u
+        return lerp(self.distance), lerp(self.time)
+
+    # ---------------- GAME ----------------
+    def shot_time(self, shot, dx_units, dy_px):
+        # Flight time of a shot type across dx court units sideways and dy
+        # screen rows of depth
+        distance = math.hypot(dx_units, dy_px / PX_PER_UNIT)
+        return self.flight_time(SHOT_ANGLES.get(shot, SHOT_ANGLES["NORMAL"]), distance)
+
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cache", default=CACHE)
+    parser.add_argument("--rebuild", action="store_true", help="ignore an existing cache")
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(args.cache):
+        os.remove(args.cache)
+    table = FlightTable.load(args.cache)
+
+    print(f"{'shot':<8}{'angle':>7}" + "".join(f"{d:>10.0f} u" for d in (6, 10, 14, 18)))
+    for shot, angle in SHOT_ANGLES.items():
+        cells = "".join(f"{table.flight_time(angle, d):>10.2f} s" for d in (6, 10, 14, 18))
+        print(f"{shot:<8}{angle:>7.0f}{cells}")
@@ -1,10 +1,84 @@
 import math
 import time
 
+import numpy as np
+
+# Shuttle flight in closed form
+#
+# With linear air drag (deceleration k * v) the flight has an exact solution,
+# so every position is evaluated straight from the time since launch instead
+# of being stepped per frame:
+#   D(t) = (1 - exp(-k t)) / k                    (= t without drag)
+#   x(t) = x0 + vx0 * D(t)
+#   z(t) = vz0 * D(t) - g * (t - D(t)) / k       (= vz0 t - g t² / 2 without drag)
+# The result is the same at any frame rate, and whole trajectories or many
+# shuttles evaluate as one NumPy expression.
+
 GRAVITY = -9.8   # units per second² (virtual)
+DRAG = 1.2       # linear drag rate, 1 / s; 0 = plain parabola
+LANDING_ITERATIONS = 8
+
+
+# ---------------- CLOSED FORM ----------------
+# All functions take scalars or broadcastable arrays; g is the gravity
+# magnitude (positive, pulling z down).
+def _decay(t, k):
+    if k == 0:
+        return t
+    return -np.expm1(-k * t) / k
+
+def _fall(t, k):
+    # (t - D(t)) / k, the distance gravity takes off per unit of g
+    if k == 0:
+        return 0.5 * t * t
+    return (t - _decay(t, k)) / k
+
+def trajectory(x0, vx0, vz0, g, t, drag=DRAG):
+    # (x, z) at time t after launch; z may go below 0 past the landing
+    d = _decay(t, drag)
+    return x0 + vx0 * d, vz0 * d - g * _fall(t, drag)
+
+def vertical_speed(vz0, g, t, drag=DRAG):
+    e = np.exp(-drag * t)
+    return vz0 * e - g * _decay(t, drag) if drag else vz0 - g * t
+
+def apex_time(vz0, g, drag=DRAG):
+    if drag == 0:
+        return vz0 / g
+    return np.log1p(drag * vz0 / g) / drag
+
+def landing_time(vz0, g, drag=DRAG, iterations=LANDING_ITERATIONS):
+    # When z returns to 0. No closed form with drag: Newton's method started
+    # from the drag-free flight time, which lies past the root; z is concave,
+    # so the iterates fall monotonically onto it.
+    vz0 = np.asarray(vz0, np.float64)
+    t = np.maximum(2 * vz0 / g, 0)
+    if drag == 0:
+        return t
+    for _ in range(iterations):
+        z = vz0 * _decay(t, drag) - g * _fall(t, drag)
+        t = t - z / np.minimum(vertical_speed(vz0, g, t, drag), -1e-9)
+    return t
 
+def solve_launch(dx, flight_time, arc_height=None, drag=DRAG):
+    # Launch velocities (vx0, vz0) and gravity that land dx further on after
+    # flight_time. Gravity is GRAVITY, or scaled so the apex reaches
+    # arc_height: z(t) is linear in g once the landing time is fixed.
+    d = _decay(flight_time, drag)
+    vx0 = dx / d
+    per_g = _fall(flight_time, drag) / d        # vz0 per unit of gravity
+
+    if arc_height is None:
+        g = -GRAVITY
+    else:
+        t_top = apex_time(per_g, 1.0, drag)
+        g = arc_height / (per_g * _decay(t_top, drag) - _fall(t_top, drag))
+    return float(vx0), float(per_g * g), float(g)
+
+
+# ---------------- SHUTTLE ----------------
 class ShuttlePhysics3D:
-    def __init__(self):
+    def __init__(self, drag=DRAG):
         self.x = 0
         self.y = 0
         self.z = 0
@@ -13,34 +87,75 @@ class ShuttlePhysics3D:
         self.vy = 0
         self.vz = 0
 
+        self.drag = drag
+        self.gravity = -GRAVITY
+        self.start_x = 0
         self.start_time = 0
+        self.flight_time = 0
         self.active = False
 
-    def launch(self, start_x, start_y, target_x, flight_time, arc_height):
-        self.x = start_x
-        self.y = start_y
-        self.z = 0
+    # The shuttle comes down on target_x exactly flight_time after launch;
+    # arc_height sets the apex (None: fall under GRAVITY).
+    # now: clock reading (seconds) the flight is timed from; defaults to
+    # wall-clock time
+    def launch(self, start_x, start_y, target_x, flight_time, arc_height=None, now=None):
+        self.vx, self.vz, self.gravity = solve_launch(
+            target_x - start_x, flight_time, arc_height, self.drag
+        )
+        self._start(start_x, start_y, flight_time, now)
 
-        self.vx = (target_x - start_x) / flight_time
-        self.vy = (start_y - start_y) / flight_time  # y handled externally
-        self.vz = (2 * arc_height) / flight_time
+    # Launch with explicit velocities; the flight ends where it lands
+    def launch_velocity(self, start_x, start_y, vx, vz, now=None):
+        self.vx, self.vz, self.gravity = vx, vz, -GRAVITY
+        self._start(start_x, start_y, float(landing_time(vz, self.gravity, self.drag)), now)
 
-        self.start_time = time.time()
+    def _start(self, start_x, start_y, flight_time, now):
+        self.x = self.start_x = start_x
+        self.y = start_y       # depth handled externally
+        self.z = 0
+        self.vy = 0
+        self.start_time = time.time() if now is None else now
         self.flight_time = flight_time
         self.active = True
 
-    def update(self):
+    # ---------------- EVALUATION ----------------
+    def update(self, now=None):
         if not self.active:
             return self.x, self.y, self.z, False
 
-        t = time.time() - self.start_time
-        if t > self.flight_time:
+        t = (time.time() if now is None else now) - self.start_time
+        if t >= self.flight_time:
+            self.x = self.landing()[0]
             self.z = 0
             self.active = False
             return self.x, self.y, self.z, False
 
-        self.x += self.vx * 0.016  # approx 60 FPS
-        self.z = self.vz * t + 0.5 * GRAVITY * t * t
-        self.z = max(self.z, 0)
+        # Scalar closed form: one exp per call, no NumPy overhead
+        k, g = self.drag, self.gravity
+        if k:
+            d = (1 - math.exp(-k * t)) / k
+            fall = (t - d) / k
+        else:
+            d, fall = t, 0.5 * t * t
+        self.x = self.start_x + self.vx * d
+        self.z = max(self.vz * d - g * fall, 0)
 
         return self.x, self.y, self.z, True
+
+    def positions(self, t):
+        # Array of times since launch -> (x, z) arrays, clamped to the ground
+        t = np.clip(np.asarray(t, np.float64), 0, self.flight_time)
+        x, z = trajectory(self.start_x, self.vx, self.vz, self.gravity, t, self.drag)
+        return x, np.maximum(z, 0)
+
+    def trail(self, now, duration=0.3, samples=16):
+        # The last `duration` seconds of flight up to now, oldest first, e.g.
+        # for drawing a motion trail
+        t = (now - self.start_time) - np.linspace(duration, 0, samples)
+        return self.positions(t)
+
+    def landing(self):
+        # (x, y, time) the shuttle comes down, without stepping the flight
+        t = self.flight_time
+        x = self.start_x + self.vx * float(_decay(t, self.drag))
+        return x, self.y, self.start_time + t
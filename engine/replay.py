@@ -0,0 +1,273 @@
+# Match replay files
+#
+#   python main.py --replay-out match.rpl               # record while playing
+#   python -m engine.replay match.rpl                   # summary
+#   python -m engine.replay match.rpl --play --speed 4 --rally 12
+#
+# A replay is one append-only file:
+#   header    MAGIC, format version, snapshot key interval
+#   entries   engine/snapshot.py stream entries (KEY / DELTA), one per tick,
+#             interleaved with EVENT entries from the game's event bus
+#   index     on close: one INDEX_DTYPE record per keyframe (tick, clock,
+#             exchange count, file offset), then TRAILER pointing at it
+#
+# The reader memory-maps the file, so opening costs nothing however long the
+# match, and views the index in place. Seeking to a time or an exchange is
+# a binary search over the keyframes plus decoding at most one key
+# interval. A file whose recording died before close() has no index; the
+# reader rebuilds it with one scan and ignores a torn last entry.
+import argparse
+import mmap
+import struct
+import threading
+import time
+
+import numpy as np
+
+from engine.rules import SHOT_NAMES, STATE_NAMES, shot_code
+from engine.snapshot import KEY, KEY_INTERVAL, Snapshot, SnapshotDecoder, SnapshotEncoder, capture
+from runtime.events import STATE, to_text
+
+MAGIC = b"BRPLAY01"
+HEADER = struct.Struct("<8sII")         # magic, version, key interval
+VERSION = 1
+
+EVENT = 2
+# type, kind, clock, a, b; a / b are shot or state codes, -1 for None
+EVENT_ENTRY = struct.Struct("<BBdbb")
+
+INDEX_DTYPE = np.dtype([("tick", "<u4"), ("t", "<f8"), ("rally", "<u4"), ("offset", "<u8")])
+TRAILER = struct.Struct("<QQ8s")        # index offset, keyframe count, magic
+INDEX_MAGIC = b"BRINDEX1"
+
+LATE = 1 / 60           # s behind schedule before playback skips drawing a tick
+
+
+# ---------------- EVENT CODES ----------------
+def _event_codes(kind, a, b):
+    if kind == STATE:
+        return STATE_NAMES.index(a), STATE_NAMES.index(b)
+    return (-1 if a is None else shot_code(a)), -1
+
+def _event_names(kind, a, b):
+    if kind == STATE:
+        return STATE_NAMES[a], STATE_NAMES[b]
+    return (None if a < 0 else SHOT_NAMES[a]), None
+
+
+# ---------------- RECORD ----------------
+class ReplayRecorder:
+    # record() once per tick from the game loop. Events arrive through the
+    # event bus (subscribe the recorder: it is an event sink), possibly on
+    # the bus's writer thread, so writes share a lock.
+    def __init__(self, path, key_interval=KEY_INTERVAL):
+        self.file = open(path, "wb")
+        self.lock = threading.Lock()
+        self.encoder = SnapshotEncoder(key_interval)
+        self.index = []
+        self.ticks = 0
+
+        header = HEADER.pack(MAGIC, VERSION, key_interval)
+        self.file.write(header)
+        self.offset = len(header)
+
+    def _write(self, data):
+        self.file.write(data)
+        self.offset += len(data)
+
+    def record(self, game, now):
+        values = capture(game, self.ticks, now)
+        entry = self.encoder.encode(values)
+        with self.lock:
+            if entry[0] == KEY:
+                self.index.append((self.ticks, now, game.rally_count, self.offset))
+            self._write(entry)
+        self.ticks += 1
+
+    def __call__(self, events):
+        data = b"".join(
+            EVENT_ENTRY.pack(EVENT, kind, t, *_event_codes(kind, a, b))
+            for kind, t, a, b in events
+        )
+        with self.lock:
+            self._write(data)
+
+    def close(self):
+        with self.lock:
+            index = np.array(self.index, INDEX_DTYPE)
+            index_offset = self.offset
+            self._write(index.tobytes())
+            self._write(TRAILER.pack(index_offset, len(index), INDEX_MAGIC))
+            self.file.close()
+
+
+# ---------------- READ ----------------
+class ReplayReader:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.key_interval = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} replay file")
+
+        self.start = HEADER.size
+        self.index, self.end = self._load_index()
+
+    def _load_index(self):
+        size = len(self.map)
+        if size >= self.start + TRAILER.size:
+            index_offset, count, magic = TRAILER.unpack_from(self.map, size - TRAILER.size)
+            if magic == INDEX_MAGIC:
+                # Viewed in place, not read
+                return np.frombuffer(self.map, INDEX_DTYPE, count, index_offset), index_offset
+        return self._scan()
+
+    def _scan(self):
+        # No index (recording interrupted): one pass over the entries,
+        # stopping at the first incomplete one
+        index = []
+        end = self.start
+        try:
+            for kind, item, offset, next_offset in self._entries(self.start, len(self.map)):
+                if kind == KEY:
+                    index.append((item[0], item[1], item[6], offset))
+                end = next_offset
+        except (struct.error, IndexError, ValueError):
+            pass
+        return np.array(index, INDEX_DTYPE), end
+
+    def _entries(self, offset, end):
+        # (entry type, snapshot values or event, offset, next offset);
+        # offset must be a keyframe or an event before the first one
+        view = self.map
+        decoder = SnapshotDecoder(view)
+        while offset < end:
+            kind = view[offset]
+            if kind == EVENT:
+                _, ev, t, a, b = EVENT_ENTRY.unpack_from(view, offset)
+                next_offset = offset + EVENT_ENTRY.size
+                yield kind, (ev, t, *_event_names(ev, a, b)), offset, next_offset
+            else:
+                values, next_offset = decoder.decode(None, offset)
+                yield kind, values, offset, next_offset
+            offset = next_offset
+
+    # ---------------- SEEK ----------------
+    def __len__(self):
+        # Keyframes
+        return len(self.index)
+
+    @property
+    def duration(self):
+        return float(self.index["t"][-1]) if len(self.index) else 0.0
+
+    def _keyframe(self, i):
+        return int(self.index["offset"][max(0, i)]) if len(self.index) else self.end
+
+    def seek_time(self, t):
+        # Keyframe at or before clock t: binary search on the sorted index
+        return self._keyframe(int(np.searchsorted(self.index["t"], t, "right")) - 1)
+
+    def seek_rally(self, rally):
+        # Keyframe at or before the start of exchange number `rally`
+        return self._keyframe(int(np.searchsorted(self.index["rally"], rally, "left")) - 1)
+
+    def ticks(self, t=None, rally=None):
+        # (Snapshot, events since the previous tick) for every tick from the
+        # first one at or after clock t / exchange `rally`
+        if rally is not None:
+            offset = self.seek_rally(rally)
+        elif t is not None:
+            offset = self.seek_time(t)
+        else:
+            offset = self.start
+
+        # Events reach the file through the event bus, a little after the
+        # tick they happened on: those from before the start are dropped by
+        # their clock, not by position
+        events = []
+        start = None
+        for kind, item, _, _ in self._entries(offset, self.end):
+            if kind == EVENT:
+                if start is None or item[1] >= start:
+                    events.append(item)
+                continue
+            if start is None:
+                if (t is not None and item[1] < t) or (rally is not None and item[6] < rally):
+                    continue
+                start = item[1]
+                events = [e for e in events if e[1] >= start]
+            yield Snapshot(item), events
+            events = []
+
+    def close(self):
+        # The index views the map: drop it before closing
+        self.index = None
+        self.map.close()
+        self.file.close()
+
+
+# ---------------- PLAY ----------------
+def play(reader, t=None, rally=None, speed=1.0, present=None):
+    # Re-renders the match through main.py's renderer. speed scales the
+    # clock (0: as fast as possible); when rendering cannot keep up, ticks
+    # more than a frame late are decoded but not drawn.
+    from engine.controls import CONSTANTS
+    from main import draw_scene, show
+
+    present = present or show
+    background = np.zeros((CONSTANTS["SCREEN_H"], CONSTANTS["SCREEN_W"], 3), np.uint8)
+    out = np.empty_like(background)
+
+    wall_start = clock_start = None
+    drawn = skipped = 0
+    for snap, events in reader.ticks(t, rally):
+        for event in events:
+            text = to_text(event)
+            if text is not None:
+                print(f"[{event[1]:8.2f}] {text}")
+
+        if speed > 0:
+            if wall_start is None:
+                wall_start, clock_start = time.perf_counter(), snap.t
+            due = wall_start + (snap.t - clock_start) / speed
+            delay = due - time.perf_counter()
+            if delay < -LATE:
+                skipped += 1
+                continue
+            if delay > 0:
+                time.sleep(delay)
+
+        drawn += 1
+        if not present(draw_scene(background, snap, out)):
+            break
+    return drawn, skipped
+
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--play", action="store_true", help="render the replay")
+    parser.add_argument("--time", type=float, help="start at this clock time (s)")
+    parser.add_argument("--rally", type=int, help="start at this exchange")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed (0: as fast as possible)")
+    parser.add_argument("--headless", action="store_true", help="decode and draw without a window")
+    args = parser.parse_args()
+
+    reader = ReplayReader(args.path)
+    print(f"{args.path}: {reader.duration:.1f} s, {len(reader)} keyframes, "
+          f"{reader.end / 1024:.0f} KiB of entries")
+
+    if args.play:
+        from main import no_display
+
+        start = time.perf_counter()
+        drawn, skipped = play(reader, args.time, args.rally, args.speed,
+                              no_display if args.headless else None)
+        print(f"{drawn} ticks drawn, {skipped} skipped, {time.perf_counter() - start:.2f} s")
+        if not args.headless:
+            import cv2
+            cv2.destroyAllWindows()
+    reader.close()
@@ -0,0 +1,69 @@
+# Rally rules as tables
+#
+# States and shot types are small integer codes. Everything that depends on
+# the shot type lives in per-shot tables, and Rules resolves them against a
+# constants dict once, so neither GameState nor engine/batch.py compares
+# strings or reads the constants per tick.
+#
+# Adding a state (serve, let, fault, ...) means a new code and name here
+# plus one update handler in GameState.UPDATE; shot behaviour is a new
+# column in the tables below.
+
+# ---------------- CODES ----------------
+IDLE, TO_AI, AI_WAIT, TO_PLAYER = range(4)
+STATE_NAMES = ["IDLE", "TO_AI", "AI_WAIT", "TO_PLAYER"]
+
+NORMAL, SMASH, CLEAR, DROP = range(4)
+SHOT_NAMES = ["NORMAL", "SMASH", "CLEAR", "DROP"]
+SHOT_CODES = {name: code for code, name in enumerate(SHOT_NAMES)}
+
+def shot_code(name):
+    # Unknown shot types play like NORMAL
+    return SHOT_CODES.get(name, NORMAL)
+
+
+# ---------------- PER-SHOT TABLES (by shot code) ----------------
+# Screen-row offset from each side's base line of the zone it plays from
+# after the shot: DROP -> net, CLEAR -> back
+PLAYER_ZONE = [0, 0, 40, -80]
+AI_ZONE = [0, 0, -40, 80]
+# AI_REACT_TIME multiplier for the AI answering this shot
+REACT_SCALE = [0.9, 1.4, 0.9, 0.6]
+# CATCH_RADIUS multiplier for the player receiving this shot
+CATCH_SCALE = [1.0, 0.65, 1.0, 1.25]
+# Shots the AI answers with, drawn uniformly (one option: no draw)
+AI_REPLIES = [("CLEAR",), ("CLEAR", "DROP"), ("SMASH", "CLEAR"), ("DROP", "CLEAR")]
+
+
+class ShotRules:
+    # One shot type resolved against the constants
+    __slots__ = ("code", "name", "time", "player_y", "ai_y", "to_ai_dy", "to_player_dy",
+                 "react_time", "catch_radius", "replies")
+
+    def __init__(self, code, constants):
+        player_y, ai_y = constants["PLAYER_Y"], constants["AI_Y"]
+        mods = constants.get("SHOT_TIME_MODIFIERS", {})
+
+        self.code = code
+        self.name = SHOT_NAMES[code]
+        self.time = constants["SHUTTLE_TIME"] * mods.get(self.name, 1.0)
+
+        # Zones, and the shuttle's row span from each to the far side
+        self.player_y = player_y + PLAYER_ZONE[code]
+        self.ai_y = ai_y + AI_ZONE[code]
+        self.to_ai_dy = self.player_y - ai_y
+        self.to_player_dy = player_y - self.ai_y
+
+        self.react_time = constants["AI_REACT_TIME"] * REACT_SCALE[code]
+        self.catch_radius = constants["CATCH_RADIUS"] * CATCH_SCALE[code]
+        self.replies = list(AI_REPLIES[code])
+
+
+class Rules:
+    def __init__(self, constants):
+        self.constants = constants
+        self.player_y = constants["PLAYER_Y"]
+        self.shots = [ShotRules(code, constants) for code in range(len(SHOT_NAMES))]
+
+    def shot(self, name):
+        return self.shots[shot_code(name)]
@@ -1,5 +1,7 @@
 import math
 
+from vision.filters import REFERENCE_DT
+
 # ---------------- TUNED FOR MEDIAPIPE ----------------
 
 SMASH_SPEED = 0.045      # lower than before
@@ -10,9 +12,30 @@ DROP_SPEED  = 0.015
 UPWARD_DY = -0.08       # much less strict
 DOWNWARD_DY = 0.08
 
-def classify_shot(dx, dy):
+# ---------------- LANDMARK FEATURES (opt-in) ----------------
+# Off unless enabled (main.py --landmark-shots); python -m bench.filter_rates
+# compares accuracy with and without them.
+LANDMARK_RULES = False
+# Fingertips lead the palm centre on a wrist snap, so a fast tip with a
+# downward palm motion reads as a smash even when the centroid is slower.
+# Image units per REFERENCE_DT, like filtered dx / dy.
+SMASH_TIP_SPEED = 0.09
+# Palm turned past this (radians from upright) on an upward swing = CLEAR
+CLEAR_PALM_ANGLE = 0.6
+
+def classify_shot(dx, dy, features=None):
     speed = math.sqrt(dx * dx + dy * dy)
 
+    # features: vision.landmarks.HandFeatures for the same detection; all
+    # values are precomputed so this adds no per-landmark work. Only timed
+    # features (per-second velocities) are used, so the tip rule does not
+    # depend on the frame rate.
+    if LANDMARK_RULES and features is not None and features.timed:
+        if dy > DOWNWARD_DY * 0.5 and features.tip_speed * REFERENCE_DT > SMASH_TIP_SPEED:
+            return "SMASH"
+        if dy < UPWARD_DY * 0.5 and abs(features.palm_angle) > CLEAR_PALM_ANGLE:
+            return "CLEAR"
+
     # Debug (keep for now)
     '''print(f"dx={dx:.4f}, dy={dy:.4f}, speed={speed:.4f}")'''
 
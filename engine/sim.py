@@ -0,0 +1,230 @@
+# Headless fixed-timestep simulation of GameState
+#
+# Drives the same input handling and game update as main.py from a virtual
+# clock, with no camera, MediaPipe or OpenCV window, so rallies run as fast
+# as the CPU allows.
+#
+#   python -m engine.sim --exchanges 10000 --seed 1
+#   python -m engine.sim --trace session.npy --out outcomes.jsonl
+import argparse
+import json
+import random
+import time
+
+from engine.controls import CONSTANTS, apply_hand_input, step_game
+from engine.rules import IDLE, TO_AI, TO_PLAYER
+from engine.state import GameState
+
+# ---------------- CLOCK ----------------
+class VirtualClock:
+    def __init__(self, dt=1 / 60, start=0.0):
+        self.dt = dt
+        self.start = start
+        self.ticks = 0
+        self.now = start
+
+    def tick(self):
+        # Multiply instead of accumulating to avoid float drift on long runs
+        self.ticks += 1
+        self.now = self.start + self.ticks * self.dt
+
+
+# ---------------- PLAYERS ----------------
+# A player turns the game state into hand samples for one tick:
+#   samples(game, now) -> iterable of (cx, cy, dx, dy, stroke, features)
+# exactly what main.py feeds apply_hand_input from the tracker.
+
+# Per-frame deltas that classify_shot maps to each shot
+SHOT_STROKES = {
+    "SMASH": (0.0, 0.12),
+    "CLEAR": (0.0, -0.12),
+    "DROP": (0.05, 0.0),
+}
+
+class ScriptedPlayer:
+    # Moves its hand toward where the AI's shot is going after a reaction
+    # delay (with aim noise) and swings as soon as the game allows it.
+    def __init__(self, constants=CONSTANTS, reaction=0.25, aim_noise=0.5,
+                 shots=("SMASH", "CLEAR", "DROP"), seed=None):
+        self.constants = constants
+        self.reaction = reaction
+        self.aim_noise = aim_noise
+        self.shots = shots
+        self.rng = random.Random(seed)
+
+        self.cx = 0.5
+        self.target_cx = 0.5
+        self.incoming_time = None
+
+    def hand_x_for(self, court_x):
+        # Inverse of the HAND_SENSITIVITY mapping in apply_hand_input
+        c = self.constants
+        return (court_x / c["COURT_WIDTH"] - 0.5) / c["HAND_SENSITIVITY"] + 0.5
+
+    def samples(self, game, now):
+        c = self.constants
+
+        # -------- MOVEMENT --------
+        if game.state == TO_PLAYER:
+            if self.incoming_time != game.state_time:
+                self.incoming_time = game.state_time
+                aim = game.to_player_x + self.rng.gauss(0, self.aim_noise)
+                self.target_cx = self.hand_x_for(aim)
+            if now - game.state_time >= self.reaction:
+                self.cx = self.target_cx
+
+        # -------- SWING --------
+        if (
+            game.state == IDLE
+            and game.player_ready
+            and now - game.last_stroke_time > c["COOLDOWN"]
+        ):
+            stroke = SHOT_STROKES[self.rng.choice(self.shots)]
+            return ((self.cx, 0.5, stroke[0], stroke[1], stroke, None),)
+
+        # Hand held still: also what makes the player "ready" again
+        return ((self.cx, 0.5, 0.0, 0.0, (0.0, 0.0), None),)
+
+
+class TracePlayer:
+    # Replays a recorded landmark trace (vision/trace.py) on the virtual
+    # clock: every record whose timestamp has been reached is applied in
+    # order, so any simulation dt reproduces the recorded input.
+    def __init__(self, trace, motion_filter=None):
+        # Imported here so scripted simulation needs no vision modules
+        from vision.trace import TraceTracker
+
+        self.tracker = TraceTracker(trace, motion_filter)
+        records = self.tracker.records
+        self.t0 = float(records["t"][0]) if len(records) else 0.0
+        self.times = records["t"]
+
+    @property
+    def done(self):
+        return self.tracker.done
+
+    def samples(self, game, now):
+        tracker = self.tracker
+        out = []
+        while not tracker.done and self.times[tracker.index] - self.t0 <= now:
+            cx, cy, dx, dy = tracker.get_hand_data()
+            out.append((cx, cy, dx, dy, tracker.stroke_delta, tracker.features))
+        return out
+
+
+# ---------------- SIMULATOR ----------------
+class Simulator:
+    # seed seeds the game's own random.Random; the process-wide `random`
+    # module is left alone
+    def __init__(self, player, constants=CONSTANTS, dt=1 / 60, seed=None, flight=None, ai=None):
+        self.player = player
+        self.constants = constants
+        self.clock = VirtualClock(dt)
+        self.game = GameState(verbose=False, rng=random.Random(seed), flight=flight, ai=ai,
+                              constants=constants)
+
+        self.outcomes = []
+        self.player_shot = None
+        self.prev_state = self.game.state
+        self.seen_rallies = 0
+
+    def step(self):
+        game = self.game
+        now = self.clock.now
+
+        for cx, cy, dx, dy, stroke, features in self.player.samples(game, now):
+            apply_hand_input(game, cx, cy, dx, dy, now, stroke, features, self.constants)
+        step_game(game, now, self.constants)
+
+        if self.prev_state == IDLE and game.state == TO_AI:
+            self.player_shot = game.shot_type
+        self.prev_state = game.state
+
+        if game.rally_count != self.seen_rallies:
+            self.seen_rallies = game.rally_count
+            self.outcomes.append({
+                "index": len(self.outcomes),
+                "time": round(now, 6),
+                "result": game.rally_result,
+                "player_shot": self.player_shot,
+                "ai_shot": game.shot_type,
+                "player_x": round(game.player_x, 4),
+                "shuttle_x": round(game.shuttle_x, 4),
+            })
+
+        self.clock.tick()
+
+    def run(self, exchanges=None, duration=None):
+        while True:
+            if exchanges is not None and len(self.outcomes) >= exchanges:
+                break
+            if duration is not None and self.clock.now >= duration:
+                break
+            if getattr(self.player, "done", False):
+                break
+            self.step()
+        return self.outcomes
+
+
+def summarize(outcomes):
+    won = sum(1 for o in outcomes if o["result"] == "WON")
+    lost = len(outcomes) - won
+    return {
+        "exchanges": len(outcomes),
+        "won": won,
+        "lost": lost,
+        "win_rate": won / len(outcomes) if outcomes else 0.0,
+        # exchanges per rally, a rally ending on each loss
+        "rally_length": len(outcomes) / lost if lost else float(len(outcomes)),
+    }
+
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--exchanges", type=int, default=1000)
+    parser.add_argument("--duration", type=float, help="stop after this many simulated seconds")
+    parser.add_argument("--dt", type=float, default=1 / 60, help="fixed timestep, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", help="drive the player from a landmark trace instead of the script")
+    parser.add_argument("--filter", default="none", help="motion filter for trace input")
+    parser.add_argument("--reaction", type=float, default=0.25)
+    parser.add_argument("--aim-noise", type=float, default=0.5)
+    parser.add_argument("--flight", action="store_true", help="drag flight model for shot timing")
+    parser.add_argument("--ai", action="store_true", help="AI that predicts landings and runs at limited speed")
+    parser.add_argument("--out", help="write one JSON outcome per line")
+    args = parser.parse_args()
+
+    if args.trace:
+        player = TracePlayer(args.trace, args.filter)
+        exchanges = None
+    else:
+        player = ScriptedPlayer(reaction=args.reaction, aim_noise=args.aim_noise, seed=args.seed)
+        exchanges = args.exchanges
+
+    flight = None
+    if args.flight:
+        from engine.flight import FlightTable
+        flight = FlightTable.load()
+
+    ai = None
+    if args.ai:
+        from engine.ai import AIOpponent
+        ai = AIOpponent()
+
+    sim = Simulator(player, dt=args.dt, seed=args.seed, flight=flight, ai=ai)
+
+    start = time.perf_counter()
+    outcomes = sim.run(exchanges, args.duration)
+    elapsed = time.perf_counter() - start
+
+    if args.out:
+        with open(args.out, "w") as f:
+            for o in outcomes:
+                f.write(json.dumps(o) + "\n")
+
+    print(json.dumps(summarize(outcomes), indent=2))
+    print(
+        f"{sim.clock.ticks} ticks, {sim.clock.now:.1f} s simulated in {elapsed:.2f} s "
+        f"({sim.clock.now / elapsed:.0f}x real time)"
+    )
@@ -0,0 +1,214 @@
+import struct
+
+import numpy as np
+
+from engine.rules import SHOT_NAMES, shot_code
+
+# Binary GameState snapshots
+#
+# One snapshot is a fixed little-endian record (FIELDS below): the same
+# layout as a struct for single records and as the NumPy dtype SNAPSHOT_DTYPE
+# for arrays of them, so a buffer of full records is read with
+# np.frombuffer() without copying.
+#
+# A stream of snapshots (replay file, network sync) is a sequence of
+# entries, each one type byte followed by
+#   KEY     a full record
+#   DELTA   a u32 mask of the fields that changed since the previous entry,
+#           then those fields' values in field order
+# SnapshotEncoder writes a KEY every key_interval entries so a reader can
+# start there; between keys an idle rally costs a handful of bytes per tick.
+# SnapshotDecoder reads entries straight out of any buffer (bytes, mmap)
+# through a memoryview, without slicing.
+#
+# A snapshot holds what the game shows and what its timers need to resume
+# (restore()); the random generator's state is not part of it.
+
+# ---------------- LAYOUT ----------------
+# (field, struct code); flags bit 0: player_ready, bit 1: ai_ready
+FIELDS = [
+    ("tick", "I"),
+    ("t", "d"),
+    ("state", "B"),
+    ("shot", "B"),
+    ("result", "b"),
+    ("flags", "B"),
+    ("rally_count", "I"),
+    ("player_x", "f"),
+    ("player_y", "f"),
+    ("target_player_x", "f"),
+    ("target_player_y", "f"),
+    ("ai_x", "f"),
+    ("ai_y", "f"),
+    ("target_ai_x", "f"),
+    ("target_ai_y", "f"),
+    ("shuttle_x", "f"),
+    ("shuttle_y", "f"),
+    ("to_ai_x", "f"),
+    ("to_player_x", "f"),
+    ("duration", "f"),
+    ("state_time", "d"),
+    ("last_stroke_time", "d"),
+    ("last_ai_stroke_time", "d"),
+]
+FIELD_NAMES = [name for name, _ in FIELDS]
+RECORD = struct.Struct("<" + "".join(code for _, code in FIELDS))
+SNAPSHOT_DTYPE = np.dtype([(name, "<" + code) for name, code in FIELDS])
+
+RESULT_CODES = {None: 0, "WON": 1, "LOST": -1}
+RESULT_NAMES = {code: name for name, code in RESULT_CODES.items()}
+
+KEY, DELTA = 0, 1
+KEY_INTERVAL = 120      # entries between keyframes
+MASK = struct.Struct("<BI")     # entry type + changed-field mask
+
+def capture(game, tick=0, now=0.0):
+    # The snapshot tuple of a game, in FIELDS order
+    flags = (1 if game.player_ready else 0) | (2 if game.ai_ready else 0)
+    return (
+        tick, now, game.state, shot_code(game.shot_type), RESULT_CODES[game.rally_result], flags,
+        game.rally_count,
+        game.player_x, game.player_y, game.target_player_x, game.target_player_y,
+        game.ai_x, game.ai_y, game.target_ai_x, game.target_ai_y,
+        game.shuttle_x, game.shuttle_y, game.to_ai_x, game.to_player_x,
+        game.duration, game.state_time, game.last_stroke_time, game.last_ai_stroke_time,
+    )
+
+def restore(game, values):
+    # Puts a game back in the snapshot's state (rewind); returns the
+    # snapshot's clock
+    (_, now, state, shot, result, flags, game.rally_count,
+     game.player_x, game.player_y, game.target_player_x, game.target_player_y,
+     game.ai_x, game.ai_y, game.target_ai_x, game.target_ai_y,
+     game.shuttle_x, game.shuttle_y, game.to_ai_x, game.to_player_x,
+     duration, game.state_time, game.last_stroke_time, game.last_ai_stroke_time) = values
+    game.state = state
+    game.shot_type = SHOT_NAMES[shot]
+    game.shot = game.rules.shot(game.shot_type)
+    game.duration = duration
+    game.rally_result = RESULT_NAMES[result]
+    game.player_ready = bool(flags & 1)
+    game.ai_ready = bool(flags & 2)
+    return now
+
+
+class Snapshot:
+    # Attribute access to one snapshot; the codecs work on plain tuples
+    __slots__ = tuple(FIELD_NAMES)
+
+    def __init__(self, values):
+        for name, value in zip(FIELD_NAMES, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def of(cls, game, tick=0, now=0.0):
+        return cls(capture(game, tick, now))
+
+    @classmethod
+    def unpack_from(cls, buffer, offset=0):
+        return cls(RECORD.unpack_from(buffer, offset))
+
+    def values(self):
+        return tuple(getattr(self, name) for name in FIELD_NAMES)
+
+    def pack(self):
+        return RECORD.pack(*self.values())
+
+    def restore(self, game):
+        return restore(game, self.values())
+
+
+# ---------------- DELTA STRUCTS ----------------
+# One struct per changed-field mask, built on first use; a game only ever
+# produces a few dozen distinct masks
+_DELTA_STRUCTS = {}
+
+def _delta_struct(mask):
+    s = _DELTA_STRUCTS.get(mask)
+    if s is None:
+        codes = "".join(code for i, (_, code) in enumerate(FIELDS) if mask >> i & 1)
+        s = _DELTA_STRUCTS[mask] = struct.Struct("<" + codes)
+    return s
+
+
+# ---------------- ENCODE ----------------
+class SnapshotEncoder:
+    def __init__(self, key_interval=KEY_INTERVAL):
+        self.key_interval = key_interval
+        self.prev = None
+        self.count = 0
+
+    def reset(self):
+        # The next entry is a KEY: call when the reader missed an entry
+        # (e.g. a network send was skipped)
+        self.prev = None
+        self.count = 0
+
+    def encode(self, values):
+        # One stream entry (bytes) for a capture() tuple. Values are compared
+        # as stored (floats rounded to float32), so movement below that
+        # precision is not a change.
+        record = RECORD.pack(*values)
+        values = RECORD.unpack(record)
+        prev = self.prev
+        self.prev = values
+        self.count += 1
+
+        if prev is None or (self.count - 1) % self.key_interval == 0:
+            return bytes((KEY,)) + record
+
+        mask = 0
+        changed = []
+        for i in range(len(values)):
+            if values[i] != prev[i]:
+                mask |= 1 << i
+                changed.append(values[i])
+        return MASK.pack(DELTA, mask) + _delta_struct(mask).pack(*changed)
+
+
+# ---------------- DECODE ----------------
+class SnapshotDecoder:
+    # Entries are decoded from a memoryview of the buffer: struct reads in
+    # place, nothing is sliced or copied
+    def __init__(self, buffer=None):
+        self.view = memoryview(buffer) if buffer is not None else None
+        self.values = None
+
+    def decode(self, buffer=None, offset=0):
+        # (values, offset of the next entry). A DELTA needs the entry before
+        # it to have been decoded by this decoder.
+        view = self.view if buffer is None else memoryview(buffer)
+        kind = view[offset]
+        if kind == KEY:
+            self.values = RECORD.unpack_from(view, offset + 1)
+            return self.values, offset + 1 + RECORD.size
+
+        if self.values is None:
+            raise ValueError("delta entry without a preceding keyframe")
+        _, mask = MASK.unpack_from(view, offset)
+        delta = _delta_struct(mask)
+        changed = delta.unpack_from(view, offset + MASK.size)
+
+        values = list(self.values)
+        j = 0
+        for i in range(len(values)):
+            if mask >> i & 1:
+                values[i] = changed[j]
+                j += 1
+        self.values = tuple(values)
+        return self.values, offset + MASK.size + delta.size
+
+    def entries(self, offset=0, end=None):
+        # Every (values, offset) from offset, which must be a keyframe
+        view = self.view
+        end = len(view) if end is None else end
+        while offset < end:
+            values, next_offset = self.decode(None, offset)
+            yield values, offset
+            offset = next_offset
+
+
+def records(buffer, offset=0, count=-1):
+    # A run of bare records (no type bytes, e.g. Snapshot.pack() output back
+    # to back) as a NumPy record array viewing the buffer without a copy
+    return np.frombuffer(buffer, SNAPSHOT_DTYPE, count, offset)
@@ -1,18 +1,74 @@
 import time
 import random
 
+from engine.rules import AI_WAIT, IDLE, STATE_NAMES, TO_AI, TO_PLAYER, Rules
+from runtime.events import AI_LATE, AI_RETURN, EVENTS, HIT, P2_HIT, P2_LATE, RALLY_LOST, RALLY_WON, STATE
+
+Y_SMOOTHING = 0.15  # adjust 0.1–0.2 if needed
+RETURN_WINDOW = 1.5  # s player 2 has to swing once the shuttle reaches them
+
 
 class GameState:
-    def __init__(self):
-        self.state = "IDLE"
+    # Rally state machine. The state is an integer code (engine/rules.py);
+    # update() dispatches through the UPDATE table, one handler per state.
+    # Shot-dependent values are resolved into self.shot when a shot starts,
+    # so a tick only does the flight arithmetic of its state.
+    def __init__(self, verbose=True, rng=None, flight=None, ai=None, constants=None, events=None,
+                 versus=False):
+        # Hits, catches and state changes go to an event bus
+        # (runtime/events.py), the process-wide EVENTS unless one is given;
+        # verbose=False emits nothing (headless simulation)
+        self.verbose = verbose
+        self.events = events if events is not None else (EVENTS if verbose else None)
+
+        # Source of uniform() / choice(); the `random` module by default.
+        # engine/batch.py passes a LaneRandom to replay a batch lane exactly.
+        self.rng = random if rng is None else rng
+
+        # Optional engine.flight.FlightTable: shot flight times then follow
+        # the drag model and the distance covered, looked up once per hit,
+        # instead of SHUTTLE_TIME scaled per shot type
+        self.flight = flight
+        self.flight_time = None
+
+        # Optional engine.ai.AIOpponent: the AI then runs to its predicted
+        # landing point under a speed limit (and can be too late) and picks
+        # shots from the player's position
+        self.ai = ai
+
+        # Two-player mode: a second player controls the far side instead of
+        # the AI (engine.controls.apply_opponent_input). Only the TO_AI and
+        # AI_WAIT handlers differ, so the instance gets its own table.
+        self.versus = versus
+        if versus:
+            self.UPDATE = self.VERSUS_UPDATE
+
+        # Rules resolved from the constants; update() re-resolves them if it
+        # is handed a different constants dict. It only compares identity:
+        # after editing the dict in place, call reload_rules()
+        if constants is None:
+            from engine.controls import CONSTANTS
+            constants = CONSTANTS
+        self.rules = Rules(constants)
+
+        # Transition hooks: hooks[state] callbacks run as hook(game, prev, now)
+        # whenever that state is entered
+        self.hooks = [[] for _ in STATE_NAMES]
+
+        self.state = IDLE
         self.state_time = 0
         self.last_stroke_time = 0
         self.player_ready = True
 
+        # Far side's swing state (two-player mode)
+        self.last_ai_stroke_time = 0
+        self.ai_ready = True
+
         # X positions (court width = 10 units)
         self.player_x = 5
         self.ai_x = 5
         self.target_player_x = 5
+        self.target_ai_x = 5
 
         # Y positions (2.5D)
         self.player_y = 650
@@ -29,180 +85,225 @@ class GameState:
         self.to_ai_x = 5
         self.to_player_x = 5
 
+        # Shot in play: its name, its resolved rules and its flight time
         self.shot_type = "NORMAL"
+        self.shot = self.rules.shot(self.shot_type)
+        self.duration = self.shot.time
+
+        # Outcome of the last exchange: "WON" (player reached the shuttle) or
+        # "LOST" (player 1's view in two-player mode); rally_count increments
+        # every time one is decided
+        self.rally_result = None
+        self.rally_count = 0
+
+    @property
+    def state_name(self):
+        return STATE_NAMES[self.state]
+
+    # ---------------- TRANSITIONS ----------------
+    def on_enter(self, state, hook):
+        self.hooks[state].append(hook)
+
+    def _enter(self, state, now):
+        prev = self.state
+        self.state = state
+        self.state_time = now
+        if self.events is not None:
+            self.events.emit(STATE, now, STATE_NAMES[prev], STATE_NAMES[state])
+        for hook in self.hooks[state]:
+            hook(self, prev, now)
+
+    def _set_shot(self, shot_type, dx, dy):
+        # Resolve everything the shot's flight needs, once; dx / dy: court
+        # units and screen rows the shuttle travels
+        self.shot_type = shot_type
+        self.shot = self.rules.shot(shot_type)
+        if self.flight is not None:
+            self.flight_time = self.flight.shot_time(shot_type, dx, dy)
+            self.duration = self.flight_time
+        else:
+            self.duration = self.shot.time
+
+    def _use(self, constants):
+        self.rules = Rules(constants)
+        self.shot = self.rules.shot(self.shot_type)
+        if self.flight is None:
+            self.duration = self.shot.time
+
+    def reload_rules(self, constants=None):
+        # Re-resolve the rules from `constants`, or from the current dict
+        # after it was edited in place (e.g. live tuning). A shot already in
+        # flight switches to the new timing from the next tick.
+        self._use(self.rules.constants if constants is None else constants)
 
     # ---------------- UTIL ----------------
     def random_target(self):
-        return random.uniform(1.5, 8.5)
+        return self.rng.uniform(1.5, 8.5)
 
     # ---------------- PLAYER HIT ----------------
     def start_player_hit(self, now, shot_type="NORMAL"):
-        self.shot_type = shot_type
-
         if shot_type == "DROP":
             self.to_ai_x = self.player_x + (self.random_target() - self.player_x) * 0.4
         else:
             self.to_ai_x = self.random_target()
 
-        self.state = "TO_AI"
-        self.state_time = now
+        self._set_shot(shot_type, self.to_ai_x - self.player_x, self.player_y - self.ai_y)
+        if self.ai is not None:
+            self.ai.plan(self, now)
+
         self.last_stroke_time = now
         self.player_ready = False
+        if self.events is not None:
+            self.events.emit(HIT, now, shot_type)
+        self._enter(TO_AI, now)
+
+    # ---------------- PLAYER 2 HIT ----------------
+    def start_opponent_hit(self, now, shot_type="NORMAL"):
+        # Two-player mode: the far side swings while the shuttle is theirs
+        if shot_type == "DROP":
+            self.to_player_x = self.ai_x + (self.random_target() - self.ai_x) * 0.4
+        else:
+            self.to_player_x = self.random_target()
+
+        self._set_shot(shot_type, self.to_player_x - self.ai_x, self.player_y - self.ai_y)
+        self.target_ai_y = self.shot.ai_y
 
-        print(f"🏸 Player hits ({shot_type})")
+        self.last_ai_stroke_time = now
+        self.ai_ready = False
+        if self.events is not None:
+            self.events.emit(P2_HIT, now, shot_type)
+        self._enter(TO_PLAYER, now)
 
     # ---------------- AI SHOT CHOICE ----------------
     def choose_ai_shot(self, incoming_shot):
-        if incoming_shot == "SMASH":
-            return random.choice(["CLEAR", "DROP"])
-        if incoming_shot == "DROP":
-            return random.choice(["DROP", "CLEAR"])
-        if incoming_shot == "CLEAR":
-            return random.choice(["SMASH", "CLEAR"])
-        return "CLEAR"
+        replies = self.rules.shot(incoming_shot).replies
+        if len(replies) == 1:
+            return replies[0]
+        return self.rng.choice(replies)
 
     # ---------------- UPDATE LOOP ----------------
     def update(self, now, constants):
-        PLAYER_Y = constants["PLAYER_Y"]
-        AI_Y = constants["AI_Y"]
-
-        # ---- 2.5D COURT ZONES ----
-        PLAYER_BASE_Y = PLAYER_Y
-        PLAYER_NET_Y = PLAYER_Y - 80
-        PLAYER_BACK_Y = PLAYER_Y + 40
-
-        AI_BASE_Y = AI_Y
-        AI_NET_Y = AI_Y + 80
-        AI_BACK_Y = AI_Y - 40
-
-        # ---- Timing ----
-        BASE_SHUTTLE_TIME = constants["SHUTTLE_TIME"]
-        AI_REACT_TIME = constants["AI_REACT_TIME"]
-        CATCH_RADIUS = constants["CATCH_RADIUS"]
-
-        shot = getattr(self, "shot_type", "NORMAL")
-        SHOT_TIME_MODIFIERS = constants.get("SHOT_TIME_MODIFIERS", {})
-        SHUTTLE_TIME = BASE_SHUTTLE_TIME * SHOT_TIME_MODIFIERS.get(shot, 1.0)
-
-        # ---------------- PLAYER → AI ----------------
-        if self.state == "TO_AI":
-            t = min((now - self.state_time) / SHUTTLE_TIME, 1)
-
-            if shot == "DROP":
-                start_y = PLAYER_NET_Y
-                self.target_player_y = PLAYER_NET_Y
-            elif shot == "CLEAR":
-                start_y = PLAYER_BACK_Y
-                self.target_player_y = PLAYER_BACK_Y
-            else:
-                start_y = PLAYER_BASE_Y
-                self.target_player_y = PLAYER_BASE_Y
-
-            self.shuttle_x = self.player_x + t * (self.to_ai_x - self.player_x)
-            self.shuttle_y = start_y - t * (start_y - AI_Y)
-
-            if t >= 1:
-                if shot == "DROP":
-                    self.target_ai_y = AI_NET_Y
-                elif shot == "CLEAR":
-                    self.target_ai_y = AI_BACK_Y
-                else:
-                    self.target_ai_y = AI_BASE_Y
-
-                self.ai_x = self.to_ai_x
-                self.shuttle_x, self.shuttle_y = self.ai_x, self.ai_y
-                self.state = "AI_WAIT"
-                self.state_time = now
+        # Identity check only, one comparison per tick; see reload_rules()
+        if constants is not self.rules.constants:
+            self._use(constants)
 
-        # ---------------- AI WAIT ----------------
-        elif self.state == "AI_WAIT":
-            incoming = shot
+        self.UPDATE[self.state](self, now)
 
-            if incoming == "SMASH":
-                react_time = AI_REACT_TIME * 1.4
-            elif incoming == "DROP":
-                react_time = AI_REACT_TIME * 0.6
-            else:
-                react_time = AI_REACT_TIME * 0.9
-
-            if now - self.state_time > react_time:
-                ai_shot = self.choose_ai_shot(incoming)
-                self.shot_type = ai_shot
-
-                if ai_shot == "DROP":
-                    self.to_player_x = self.ai_x + (self.player_x - self.ai_x) * 0.6
-                    self.target_ai_y = AI_NET_Y
-                elif ai_shot == "CLEAR":
-                    self.to_player_x = self.random_target()
-                    self.target_ai_y = AI_BACK_Y
-                else:
-                    self.to_player_x = self.random_target()
-                    self.target_ai_y = AI_BASE_Y
-
-                self.state = "TO_PLAYER"
-                self.state_time = now
-
-                print(f"🤖 AI hits back ({ai_shot})")
-
-        # ---------------- AI → PLAYER ----------------
-        elif self.state == "TO_PLAYER":
-            t = min((now - self.state_time) / SHUTTLE_TIME, 1)
-
-            if shot == "DROP":
-                ai_start_y = AI_NET_Y
-            elif shot == "CLEAR":
-                ai_start_y = AI_BACK_Y
-            else:
-                ai_start_y = AI_BASE_Y
-
-            self.shuttle_x = self.ai_x + t * (self.to_player_x - self.ai_x)
-            self.shuttle_y = ai_start_y + t * (PLAYER_Y - ai_start_y)
-
-            # ---------- EARLY CATCH CHECK (NO CROSSING) ----------
-            # Dynamic catch radius
-            dynamic_radius = CATCH_RADIUS
-
-            if shot == "SMASH":
-                dynamic_radius *= 0.65
-            elif shot == "DROP":
-                dynamic_radius *= 1.25
-
-            movement_speed = abs(self.target_player_x - self.player_x)
-            dynamic_radius -= movement_speed * 0.4
-            dynamic_radius = max(0.3, dynamic_radius)
-
-
-            # Distance to player
-            dist_x = abs(self.shuttle_x - self.player_x)
-            dist_y = abs(self.shuttle_y - self.player_y)
+        # ---------------- SMOOTH ZONE TRANSITION ----------------
+        self.player_y += (self.target_player_y - self.player_y) * Y_SMOOTHING
+        self.ai_y += (self.target_ai_y - self.ai_y) * Y_SMOOTHING
 
-            # If shuttle is close enough → CATCH EARLY
-            if dist_x < dynamic_radius and dist_y < 35:
-                # Snap shuttle to player (stick effect)
-                self.shuttle_x = self.player_x
-                self.shuttle_y = self.player_y
+    def _update_idle(self, now):
+        pass
 
-                print("🏆 Rally WON")
+    # ---------------- PLAYER → AI ----------------
+    def _update_to_ai(self, now):
+        shot = self.shot
+        if self.ai is not None:
+            self.ai_x = self.ai.position(now)
+        t = min((now - self.state_time) / self.duration, 1)
 
-                if shot == "DROP":
-                    self.target_player_y = PLAYER_NET_Y
-                elif shot == "CLEAR":
-                    self.target_player_y = PLAYER_BACK_Y
-                else:
-                    self.target_player_y = PLAYER_BASE_Y
+        self.target_player_y = shot.player_y
+        self.shuttle_x = self.player_x + t * (self.to_ai_x - self.player_x)
+        self.shuttle_y = shot.player_y - t * shot.to_ai_dy
 
-                self.state = "IDLE"
-                self.player_ready = False
+        if t >= 1:
+            self.target_ai_y = shot.ai_y
 
-            # Else, allow shuttle to continue and possibly miss
-            elif t >= 1:
-                print("❌ Rally LOST")
+            if self.ai is not None and not self.ai.reachable:
+                # The AI could not get to the shuttle in time
+                self.shuttle_x, self.shuttle_y = self.to_ai_x, self.rules.constants["AI_Y"]
+                self._end_rally("WON", now, AI_LATE)
+            else:
+                if self.ai is None:
+                    self.ai_x = self.to_ai_x
+                self.shuttle_x, self.shuttle_y = self.ai_x, self.ai_y
+                self._enter(AI_WAIT, now)
 
-                self.state = "IDLE"
-                self.player_ready = False
+    # ---------------- AI WAIT ----------------
+    def _update_ai_wait(self, now):
+        if now - self.state_time <= self.shot.react_time:
+            return
 
-        # ---------------- SMOOTH ZONE TRANSITION ----------------
-        Y_SMOOTHING = 0.15  # adjust 0.1–0.2 if needed
+        incoming = self.shot_type
+        if self.ai is not None:
+            ai_shot, self.to_player_x = self.ai.choose_shot(self, incoming)
+        else:
+            ai_shot = self.choose_ai_shot(incoming)
+            if ai_shot == "DROP":
+                self.to_player_x = self.ai_x + (self.player_x - self.ai_x) * 0.6
+            else:
+                self.to_player_x = self.random_target()
+
+        self._set_shot(ai_shot, self.to_player_x - self.ai_x, self.player_y - self.ai_y)
+        self.target_ai_y = self.shot.ai_y
+        if self.events is not None:
+            self.events.emit(AI_RETURN, now, ai_shot)
+        self._enter(TO_PLAYER, now)
+
+    # ---------------- AI → PLAYER ----------------
+    def _update_to_player(self, now):
+        shot = self.shot
+        t = min((now - self.state_time) / self.duration, 1)
+
+        self.shuttle_x = self.ai_x + t * (self.to_player_x - self.ai_x)
+        self.shuttle_y = shot.ai_y + t * shot.to_player_dy
+
+        # ---------- EARLY CATCH CHECK (NO CROSSING) ----------
+        # Catch radius shrinks while the player is still running
+        movement_speed = abs(self.target_player_x - self.player_x)
+        dynamic_radius = max(0.3, shot.catch_radius - movement_speed * 0.4)
+
+        # If shuttle is close enough → CATCH EARLY
+        if abs(self.shuttle_x - self.player_x) < dynamic_radius and abs(self.shuttle_y - self.player_y) < 35:
+            # Snap shuttle to player (stick effect)
+            self.shuttle_x = self.player_x
+            self.shuttle_y = self.player_y
+
+            self.target_player_y = shot.player_y
+            self._end_rally("WON", now, RALLY_WON)
+
+        # Else, allow shuttle to continue and possibly miss
+        elif t >= 1:
+            self._end_rally("LOST", now, RALLY_LOST)
+
+    # ---------------- PLAYER 1 → PLAYER 2 ----------------
+    def _update_to_p2(self, now):
+        shot = self.shot
+        t = min((now - self.state_time) / self.duration, 1)
+
+        self.target_player_y = shot.player_y
+        self.shuttle_x = self.player_x + t * (self.to_ai_x - self.player_x)
+        self.shuttle_y = shot.player_y - t * shot.to_ai_dy
+
+        if t >= 1:
+            self.target_ai_y = shot.ai_y
+
+            # The player's catch rule, applied where the shuttle lands
+            movement_speed = abs(self.target_ai_x - self.ai_x)
+            dynamic_radius = max(0.3, shot.catch_radius - movement_speed * 0.4)
+            if abs(self.to_ai_x - self.ai_x) < dynamic_radius:
+                self.shuttle_x, self.shuttle_y = self.ai_x, self.ai_y
+                self._enter(AI_WAIT, now)
+            else:
+                self.shuttle_x, self.shuttle_y = self.to_ai_x, self.rules.constants["AI_Y"]
+                self._end_rally("WON", now, P2_LATE)
+
+    # ---------------- PLAYER 2 WAIT ----------------
+    def _update_p2_wait(self, now):
+        # start_opponent_hit() leaves this state; no swing in time loses
+        self.shuttle_x, self.shuttle_y = self.ai_x, self.ai_y
+        if now - self.state_time > RETURN_WINDOW:
+            self._end_rally("WON", now, P2_LATE)
+
+    def _end_rally(self, result, now, event):
+        self.rally_result = result
+        self.rally_count += 1
+        self.player_ready = False
+        if self.events is not None:
+            self.events.emit(event, now)
+        self._enter(IDLE, now)
 
-        self.player_y += (self.target_player_y - self.player_y) * Y_SMOOTHING
-        self.ai_y += (self.target_ai_y - self.ai_y) * Y_SMOOTHING
+    # Update handler per state code
+    UPDATE = [_update_idle, _update_to_ai, _update_ai_wait, _update_to_player]
+    VERSUS_UPDATE = [_update_idle, _update_to_p2, _update_p2_wait, _update_to_player]
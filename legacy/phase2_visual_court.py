@@ -1,10 +1,15 @@
+# Run from the repo root: python -m legacy.phase2_visual_court
 import cv2
+import numpy as np
 import time
 import random
 import mediapipe as mp
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 
+from render.projection import GroundProjection
+from vision.landmarks import landmarks_to_array
+
 # ---------------- CONSTANTS ----------------
 COURT_WIDTH = 10
 SCREEN_W, SCREEN_H = 600, 800
@@ -55,10 +60,13 @@ detector = vision.HandLandmarker.create_from_options(options)
 cap = cv2.VideoCapture(0)
 
 prev_x, prev_y = None, None
+points = np.empty((21, 3), np.float32)
 
 # ---------------- HELPERS ----------------
-def to_px(x_unit):
-    return int(50 + x_unit * ((SCREEN_W - 100) / COURT_WIDTH))
+# Court -> screen x from the shared projection model
+to_px = GroundProjection(
+    {"COURT_WIDTH": COURT_WIDTH, "SCREEN_W": SCREEN_W, "SCREEN_H": SCREEN_H}
+).to_px
 
 def clamp(val, minv, maxv):
     return max(minv, min(maxv, val))
@@ -87,8 +95,7 @@ while True:
     # ---------- HAND INPUT ----------
     if result.hand_landmarks:
         hand = result.hand_landmarks[0]
-        cx = sum(lm.x for lm in hand) / len(hand)
-        cy = sum(lm.y for lm in hand) / len(hand)
+        cx, cy, _ = landmarks_to_array(hand, points).mean(axis=0)
 
         mapped_x = (cx - 0.5) * HAND_SENSITIVITY + 0.5
         mapped_x = clamp(mapped_x, 0, 1)
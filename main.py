@@ -1,61 +1,18 @@
+import argparse
 import cv2
 import time
-import numpy as np
 
-from engine.shots import classify_shot
-from vision.hand_tracking import HandTracker
+from engine import shots
+from engine.controls import CONSTANTS, apply_hand_input, apply_opponent_input, step_game
 from engine.state import GameState
-
-# ---------------- CONSTANTS ----------------
-CONSTANTS = {
-    "COURT_WIDTH": 10,
-    "SCREEN_W": 600,
-    "SCREEN_H": 800,
-    "PLAYER_Y": 680,
-    "AI_Y": 200,
-    "SHUTTLE_TIME": 0.65,
-    "AI_REACT_TIME": 0.4,
-    "COOLDOWN": 0.8,
-    "MOVE_THRESHOLD": 0.035,
-    "NEUTRAL_THRESHOLD": 0.012,
-    "HAND_SENSITIVITY": 1.8,
-    "SMOOTHING": 0.35,
-    "MAX_PLAYER_SPEED": 0.9,
-    "CATCH_RADIUS": 0.8
-}
-
-# ---------------- INIT ----------------
-cap = cv2.VideoCapture(0)
-tracker = HandTracker()
-game = GameState()
-
-# ---------------- HELPERS ----------------
-def clamp(val, minv, maxv):
-    return max(minv, min(maxv, val))
-
-def detect_stroke(dx, dy):
-    if dx is None or dy is None:
-        return False
-    return abs(dx) > CONSTANTS["MOVE_THRESHOLD"] or abs(dy) > CONSTANTS["MOVE_THRESHOLD"]
-
-def to_px(x_unit):
-    return int(
-        50 + x_unit * ((CONSTANTS["SCREEN_W"] - 100) / CONSTANTS["COURT_WIDTH"])
-    )
-
-# ---------------- GROUND VIEW PROJECTION ----------------
-def project_to_ground_view(x_unit, y_px):
-    depth = (y_px - 100) / (CONSTANTS["SCREEN_H"] - 200)
-    depth = max(0, min(1, depth))
-
-    scale = 0.45 + depth * 0.75
-    center_x = CONSTANTS["SCREEN_W"] // 2
-    flat_x = to_px(x_unit)
-
-    proj_x = int(center_x + (flat_x - center_x) * scale)
-    proj_y = int(y_px * (0.8 + depth * 0.2))
-
-    return proj_x, proj_y, scale
+from render.court import CourtLayer
+from render.projection import PROJECTION
+from runtime.buffers import FramePool
+from runtime.events import EVENTS, ConsoleSink, JsonlSink, SocketSink
+from runtime.pipeline import Pipeline
+from runtime.profiler import PROFILER
+from vision.sources import RecordingSource, SessionRecorder, open_source
+from vision.trace import TraceTracker, TraceWriter
 
 # ---------------- AVATAR DRAW ----------------
 def draw_avatar(vis, x, y, scale, color, facing="up"):
@@ -80,145 +37,370 @@ def draw_avatar(vis, x, y, scale, color, facing="up"):
     # Reach (yellow)
     cv2.circle(vis, (x, y), int(60 * scale), (0, 255, 255), 2)
 
-print("🎮 Badminton Game — Ground View Camera")
-
-# ---------------- MAIN LOOP ----------------
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    frame = cv2.flip(frame, 1)
-    cx, cy, dx, dy = tracker.get_hand_data(frame)
-    now = time.time()
-
-    # -------- HAND INPUT --------
-    if cx is not None:
-        mapped_x = (cx - 0.5) * CONSTANTS["HAND_SENSITIVITY"] + 0.5
-        mapped_x = clamp(mapped_x, 0, 1)
-        game.target_player_x = mapped_x * CONSTANTS["COURT_WIDTH"]
-
-    # -------- PLAYER READY --------
-    if game.state == "IDLE" and not game.player_ready:
-        if dx is not None and dy is not None:
-            if abs(dx) < CONSTANTS["NEUTRAL_THRESHOLD"] and abs(dy) < CONSTANTS["NEUTRAL_THRESHOLD"]:
-                game.player_ready = True
-
-    # -------- PLAYER HIT --------
-    elif (
-        game.state == "IDLE"
-        and game.player_ready
-        and now - game.last_stroke_time > CONSTANTS["COOLDOWN"]
-    ):
-        if detect_stroke(dx, dy):
-            shot = classify_shot(dx, dy)
-            game.start_player_hit(now, shot if shot else "NORMAL")
-
-    # -------- PLAYER MOVEMENT --------
-    delta = clamp(
-        game.target_player_x - game.player_x,
-        -CONSTANTS["MAX_PLAYER_SPEED"],
-        CONSTANTS["MAX_PLAYER_SPEED"],
-    )
-    game.player_x += delta * CONSTANTS["SMOOTHING"]
-
-    # -------- GAME UPDATE --------
-    game.update(now, CONSTANTS)
-
-    # -------- DRAW --------
-    vis = frame.copy()
-
-    # -------- COURT (GROUND VIEW TRAPEZOID) --------
-    # Near side (player side) – MUCH wider
-    near_left  = (20, 740)
-    near_right = (580, 740)
-
-    # Far side (AI side) – wider but still narrow for perspective
-    far_left   = (170, 180)
-    far_right  = (430, 180)
-
-    court = np.array([near_left, near_right, far_right, far_left], np.int32)
-    cv2.polylines(vis, [court], True, (0, 200, 0), 2)
-
-    # -------- NET (HEIGHT ILLUSION) --------
-
-    # -------- NET (FULL WIDTH + HEIGHT + MESH) --------
-
-    # Net depth (slightly toward AI side for ground view)
-    net_y = 365
-
-    # Net must match court width at this depth
-    net_left_x  = far_left[0] 
-    net_right_x = far_right[0] 
-
-    # Net visual height
-    net_height = 32
-
-    # Mesh spacing (smaller = finer mesh)
-    mesh_step = 6
-
-    # -------- Bottom tape / shadow (ground contact) --------
-    cv2.line(
-        vis,
-        (net_left_x, net_y + 3),
-        (net_right_x, net_y + 3),
-        (110, 110, 110),
-        2,
-    )
-
-    # -------- Vertical mesh lines --------
-    for x in range(net_left_x, net_right_x, mesh_step):
-        # Perspective tilt: lines converge upward
-        tilt = int((x - net_left_x) * 0.04)
-        cv2.line(
-            vis,
-            (x, net_y),
-            (x + tilt, net_y - net_height),
-            (170, 170, 170),
-            1,
-        )
-
-    # -------- Horizontal mesh lines --------
-    for i in range(0, net_height, mesh_step):
-        shade = 190 - i * 2
-        left = net_left_x + i // 3
-        right = net_right_x - i // 3
-        cv2.line(
-            vis,
-            (left, net_y - i),
-            (right, net_y - i),
-            (shade, shade, shade),
-            1,
-        )
-
-    # -------- Top tape (white, crisp) --------
-    cv2.line(
-        vis,
-        (net_left_x + net_height // 3, net_y - net_height),
-        (net_right_x - net_height // 3, net_y - net_height),
-        (255, 255, 255),
-        2,
-    )
-
+# ---------------- DRAW ----------------
+# Court and net come from a cached layer; only the moving parts are drawn
+COURT = CourtLayer()
 
+def draw_scene(frame, game, out=None):
+    vis = COURT.composite(frame, out)
 
     # -------- PLAYERS --------
     player_y = getattr(game, "player_y", CONSTANTS["PLAYER_Y"])
     ai_y = getattr(game, "ai_y", CONSTANTS["AI_Y"])
 
-    px, py, ps = project_to_ground_view(game.player_x, player_y)
+    px, py, ps = PROJECTION.project_point(game.player_x, player_y)
     draw_avatar(vis, px, py, ps, (255, 0, 0), "up")
 
-    ax, ay, as_ = project_to_ground_view(game.ai_x, ai_y)
+    ax, ay, as_ = PROJECTION.project_point(game.ai_x, ai_y)
     draw_avatar(vis, ax, ay, as_, (0, 0, 255), "down")
 
     # -------- SHUTTLE --------
-    sx, sy, ss = project_to_ground_view(game.shuttle_x, game.shuttle_y)
+    sx, sy, ss = PROJECTION.project_point(game.shuttle_x, game.shuttle_y)
     cv2.circle(vis, (sx, sy), max(3, int(8 * ss)), (255, 255, 255), -1)
 
-    cv2.imshow("Badminton Game — Ground View", vis)
-    if cv2.waitKey(1) & 0xFF == ord("q"):
-        break
+    return vis
 
-cap.release()
-cv2.destroyAllWindows()
+def show(vis):
+    cv2.imshow("Badminton Game — Ground View", vis)
+    return cv2.waitKey(1) & 0xFF != ord("q")
+
+def no_display(vis):
+    return True
+
+# ---------------- PLAYER INPUT ----------------
+# (data, stroke, features) per player: one for a single-hand tracker, one
+# per slot for vision.hand_tracking.MultiHandTracker. Features are copied
+# when the input crosses threads.
+def player_inputs(tracker, data, copy=False):
+    slots = getattr(tracker, "slots", None)
+    if slots is None:
+        features = tracker.features.copy() if copy else tracker.features
+        return [(data, tracker.stroke_delta, features)]
+    return [
+        (slot.data, slot.stroke_delta, slot.features.copy() if copy else slot.features)
+        for slot in slots
+    ]
+
+def apply_inputs(game, inputs, now):
+    data, stroke, features = inputs[0]
+    apply_hand_input(game, *data, now, stroke, features)
+    if game.versus and len(inputs) > 1:
+        data, stroke, features = inputs[1]
+        apply_opponent_input(game, *data, now, stroke, features)
+
+# The game clock is the source timestamp of the frame being played, so
+# recorded sessions replay identically at any speed.
+#
+# replay: optional engine.replay.ReplayRecorder, handed every tick's state.
+#
+# Frames go through reused buffers: the capture buffer is read into again
+# every frame, flipped and drawn frames come from FramePools and are released
+# once drawn / shown, so the steady state loop allocates no images
+# (bench/frame_alloc.py).
+
+# ---------------- SERIAL LOOP ----------------
+# Original single-thread behaviour: capture, inference and render in lockstep.
+def run_serial(cap, tracker, game, present=show, replay=None):
+    frames = 0
+    start = time.perf_counter()
+    pool = FramePool()
+    raw = None
+
+    while True:
+        frame_start = PROFILER.start()
+        with PROFILER.stage("capture"):
+            ret, raw = cap.read(raw)
+        if not ret:
+            break
+
+        now = cap.timestamp
+        with PROFILER.stage("flip"):
+            frame = pool.acquire(raw.shape)
+            cv2.flip(raw, 1, dst=frame)
+        with PROFILER.stage("hand"):
+            data = tracker.get_hand_data(frame, now * 1000)
+
+        with PROFILER.stage("game"):
+            apply_inputs(game, player_inputs(tracker, data), now)
+            step_game(game, now)
+            if replay is not None:
+                replay.record(game, now)
+
+        frames += 1
+        with PROFILER.stage("draw"):
+            out = pool.acquire(frame.shape)
+            vis = PROFILER.draw_hud(draw_scene(frame, game, out))
+        pool.release(frame)
+        keep_going = present(vis)
+        pool.release(out)
+        PROFILER.stop("frame", frame_start)
+        if not keep_going:
+            break
+
+    elapsed = time.perf_counter() - start
+    if frames and elapsed > 0:
+        print(f"serial: {frames} frames, {frames / elapsed:.1f} fps, {1000 * elapsed / frames:.1f} ms/frame")
+
+# ---------------- PIPELINED LOOP ----------------
+# Capture, hand inference and render/game run as separate stages joined by
+# latest-frame-wins queues, so slow inference never stalls rendering.
+def run_pipeline(cap, tracker, game, present=show, replay=None):
+    # Flipped frames are read by both the inference and the render stage,
+    # each of which releases them (Pipeline release=)
+    capture_pool = FramePool()
+    render_pool = FramePool()
+    raw = None
+
+    def read_frame():
+        nonlocal raw
+        with PROFILER.stage("capture"):
+            ret, raw = cap.read(raw)
+        if not ret:
+            return None
+        with PROFILER.stage("flip"):
+            frame = capture_pool.acquire(raw.shape, holders=2)
+            cv2.flip(raw, 1, dst=frame)
+            return frame, cap.timestamp
+
+    # Features are snapshotted because the tracker keeps mutating them on
+    # the inference thread
+    def infer(packet):
+        frame, ts = packet
+        with PROFILER.stage("hand"):
+            data = tracker.get_hand_data(frame, ts * 1000)
+        return player_inputs(tracker, data, copy=True)
+
+    def render(packet, hand, _):
+        frame, now = packet
+        with PROFILER.stage("game"):
+            if hand is not None:
+                apply_inputs(game, hand, now)
+            step_game(game, now)
+            if replay is not None:
+                replay.record(game, now)
+        with PROFILER.stage("draw"):
+            out = render_pool.acquire(frame.shape)
+            vis = PROFILER.draw_hud(draw_scene(frame, game, out))
+        keep_going = present(vis)
+        render_pool.release(out)
+        return keep_going
+
+    pipeline = Pipeline(read_frame, infer, render, release=lambda packet: capture_pool.release(packet[0]))
+    pipeline.run()
+    print(pipeline.report())
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--mode",
+        choices=["pipeline", "serial"],
+        default="pipeline",
+        help="pipeline: threaded capture/inference/render, serial: single thread",
+    )
+    parser.add_argument(
+        "--source",
+        default="0",
+        help="camera index, recorded session directory or video file",
+    )
+    parser.add_argument(
+        "--cameras",
+        nargs="+",
+        metavar="SOURCE",
+        help="more sources of the same court, tracked in parallel and fused with --source (runtime/cameras.py)",
+    )
+    parser.add_argument(
+        "--camera-weights",
+        nargs="+",
+        type=float,
+        metavar="W",
+        help="trust per camera for --cameras fusion, --source first (e.g. from calibration error; 0 ignores one)",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="replay recorded sources as fast as possible instead of native speed",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        help="record the session (frames + timestamps) into DIR",
+    )
+    parser.add_argument(
+        "--record-format",
+        choices=["raw", "video"],
+        default="raw",
+        help="raw: memory-mappable frame dump, video: MJPG file",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="no window; for offline benchmarking of replays",
+    )
+    parser.add_argument(
+        "--hand-mode",
+        choices=["image", "video", "live_stream"],
+        default="image",
+        help="MediaPipe running mode used by the hand tracker; video / live_stream track hands "
+        "across frames and expect a fixed framing, so --roi needs image",
+    )
+    parser.add_argument(
+        "--roi",
+        action="store_true",
+        help="crop + downscale inference around the last hand position",
+    )
+    parser.add_argument(
+        "--filter",
+        choices=["none", "one_euro", "kalman"],
+        default="none",
+        help="temporal filter for frame-rate independent hand motion",
+    )
+    parser.add_argument(
+        "--landmark-shots",
+        action="store_true",
+        help="also classify shots from fingertip speed and palm angle (engine/shots.py LANDMARK_RULES)",
+    )
+    parser.add_argument(
+        "--trace-out",
+        metavar="FILE",
+        help="write every hand detection to a landmark trace (.npy)",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="replay hand input from a landmark trace instead of running MediaPipe",
+    )
+    parser.add_argument(
+        "--flight",
+        action="store_true",
+        help="time shots with the drag flight model (engine/flight.py)",
+    )
+    parser.add_argument(
+        "--ai",
+        action="store_true",
+        help="AI opponent that predicts landings and moves at limited speed (engine/ai.py)",
+    )
+    parser.add_argument(
+        "--players",
+        type=int,
+        choices=[1, 2],
+        default=1,
+        help="2: a second player in front of the same camera controls the far side",
+    )
+    parser.add_argument(
+        "--replay-out",
+        metavar="FILE",
+        help="record a match replay (per-tick snapshots + events) for python -m engine.replay",
+    )
+    parser.add_argument(
+        "--events-out",
+        metavar="FILE",
+        help="write game events (hits, rallies, state changes) as JSON lines",
+    )
+    parser.add_argument(
+        "--events-socket",
+        metavar="HOST:PORT",
+        help="stream game events as JSON lines over TCP",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time every stage and print p50/p95/p99 at exit",
+    )
+    parser.add_argument(
+        "--profile-hud",
+        action="store_true",
+        help="draw live stage timings on screen (implies --profile)",
+    )
+    parser.add_argument(
+        "--profile-out",
+        metavar="FILE",
+        help="write stage timings as a Chrome trace (.json) or JSON lines (.jsonl) (implies --profile)",
+    )
+    args = parser.parse_args()
+
+    if args.players > 1 and args.trace:
+        parser.error("--trace holds one hand; two-player mode needs the live tracker")
+    if args.cameras and (args.trace or args.trace_out or args.players > 1):
+        parser.error("--cameras runs one single-hand live tracker per camera")
+    if args.camera_weights and len(args.camera_weights) != 1 + len(args.cameras or []):
+        parser.error("--camera-weights takes one weight per camera, --source first")
+    if args.roi and args.hand_mode != "image":
+        parser.error("--roi needs --hand-mode image (video / live_stream track across frames)")
+
+    if args.landmark_shots:
+        shots.LANDMARK_RULES = True
+
+    if args.profile or args.profile_hud or args.profile_out:
+        PROFILER.enable(args.profile_out, hud=args.profile_hud)
+
+    # Game events are written by a background thread, never by the loop
+    EVENTS.subscribe(ConsoleSink())
+    if args.events_out:
+        EVENTS.subscribe(JsonlSink(args.events_out))
+    if args.events_socket:
+        EVENTS.subscribe(SocketSink(args.events_socket))
+    replay = None
+    if args.replay_out:
+        from engine.replay import ReplayRecorder
+        replay = EVENTS.subscribe(ReplayRecorder(args.replay_out))
+    EVENTS.start()
+
+    cameras = None
+    if args.cameras:
+        from runtime.cameras import MultiCamera
+        from vision.hand_tracking import HandTracker
+
+        cameras = MultiCamera(
+            [args.source] + args.cameras,
+            lambda: HandTracker(args.hand_mode, roi=args.roi, motion_filter=args.filter),
+            realtime=not args.fast,
+            weights=args.camera_weights,
+        )
+        cap = cameras
+    else:
+        cap = open_source(args.source, realtime=not args.fast)
+    if args.record:
+        cap = RecordingSource(cap, SessionRecorder(args.record, args.record_format))
+    if cameras is not None:
+        tracker = cameras.fusion
+    elif args.trace:
+        tracker = TraceTracker(args.trace, motion_filter=args.filter)
+    else:
+        # Imported here so replaying a trace (and importing this module from
+        # the benchmarks) does not need MediaPipe
+        from vision.hand_tracking import HandTracker, MultiHandTracker
+
+        trace = TraceWriter(args.trace_out) if args.trace_out else None
+        if args.players > 1:
+            tracker = MultiHandTracker(args.players, args.hand_mode, motion_filter=args.filter, trace=trace)
+        else:
+            tracker = HandTracker(args.hand_mode, roi=args.roi, motion_filter=args.filter, trace=trace)
+    flight = None
+    if args.flight:
+        from engine.flight import FlightTable
+        flight = FlightTable.load()
+    ai = None
+    if args.ai:
+        from engine.ai import AIOpponent
+        ai = AIOpponent()
+    game = GameState(flight=flight, ai=ai, versus=args.players > 1)
+    present = no_display if args.headless else show
+
+    print("🎮 Badminton Game — Ground View Camera")
+
+    if args.mode == "serial":
+        run_serial(cap, tracker, game, present, replay)
+    else:
+        run_pipeline(cap, tracker, game, present, replay)
+
+    if cameras is not None:
+        print(cameras.report())
+    if PROFILER.enabled:
+        print(PROFILER.report())
+    PROFILER.close()
+    EVENTS.close()
+    tracker.close()
+    cap.release()
+    if not args.headless:
+        cv2.destroyAllWindows()
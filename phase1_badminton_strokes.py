@@ -1,9 +1,14 @@
 import cv2
+import sys
+import numpy as np
 import mediapipe as mp
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 import time
 
+from vision.landmarks import landmarks_to_array
+from vision.sources import open_source
+
 # Load hand model
 base_options = python.BaseOptions(
     model_asset_path="models/hand_landmarker.task"
@@ -16,9 +21,11 @@ options = vision.HandLandmarkerOptions(
 
 detector = vision.HandLandmarker.create_from_options(options)
 
-cap = cv2.VideoCapture(0)
+# Camera index, recorded session directory or video file (vision/sources.py)
+cap = open_source(sys.argv[1] if len(sys.argv) > 1 else 0)
 
 prev_x, prev_y = None, None
+points = np.empty((21, 3), np.float32)
 MOVE_THRESHOLD = 0.03
 COOLDOWN = 1.0  # seconds
 last_stroke_time = 0
@@ -52,8 +59,7 @@ while True:
 
     if result.hand_landmarks:
         hand = result.hand_landmarks[0]
-        cx = sum(lm.x for lm in hand) / len(hand)
-        cy = sum(lm.y for lm in hand) / len(hand)
+        cx, cy, _ = landmarks_to_array(hand, points).mean(axis=0)
 
         if prev_x is not None:
             dx = cx - prev_x
@@ -1,8 +1,11 @@
 import cv2
+import sys
 import mediapipe as mp
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 
+from vision.sources import open_source
+
 # Create hand landmarker
 base_options = python.BaseOptions(
     model_asset_path="models/hand_landmarker.task"
@@ -15,7 +18,8 @@ options = vision.HandLandmarkerOptions(
 
 detector = vision.HandLandmarker.create_from_options(options)
 
-cap = cv2.VideoCapture(1)
+# Camera index, recorded session directory or video file (vision/sources.py)
+cap = open_source(sys.argv[1] if len(sys.argv) > 1 else 1)
 print("Camera started. Press 'q' to quit.")
 
 while True:
@@ -1,10 +1,15 @@
 import cv2
+import sys
+import numpy as np
 import time
 import random
 import mediapipe as mp
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 
+from vision.landmarks import landmarks_to_array
+from vision.sources import open_source
+
 # ---------------- GAME CONSTANTS ----------------
 COURT_WIDTH = 10
 SHUTTLE_TIME = 0.8      # shuttle flight time (seconds)
@@ -28,9 +33,11 @@ options = vision.HandLandmarkerOptions(
 )
 
 detector = vision.HandLandmarker.create_from_options(options)
-cap = cv2.VideoCapture(0)
+# Camera index, recorded session directory or video file (vision/sources.py)
+cap = open_source(sys.argv[1] if len(sys.argv) > 1 else 0)
 
 prev_x, prev_y = None, None
+points = np.empty((21, 3), np.float32)
 
 # ---------------- GAME LOGIC FUNCTIONS ----------------
 def detect_stroke(dx, dy):
@@ -87,8 +94,7 @@ while True:
     # ---------------- HAND PROCESSING ----------------
     if result.hand_landmarks:
         hand = result.hand_landmarks[0]
-        cx = sum(lm.x for lm in hand) / len(hand)
-        cy = sum(lm.y for lm in hand) / len(hand)
+        cx, cy, _ = landmarks_to_array(hand, points).mean(axis=0)
 
         if prev_x is not None:
             dx = cx - prev_x
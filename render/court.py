@@ -0,0 +1,105 @@
+# Static court + net layer for the ground-view renderer
+#
+# The court trapezoid and the net mesh never move, so they are drawn once
+# into a layer with an alpha mask and composited onto every camera frame;
+# only avatars, shuttle and HUD are drawn per frame. The layer is rebuilt
+# when the frame size or COURT_LAYOUT changes.
+import cv2
+import numpy as np
+
+# ---------------- GEOMETRY (screen pixels) ----------------
+COURT_LAYOUT = {
+    # Near side (player side) – MUCH wider
+    "near_left": (20, 740),
+    "near_right": (580, 740),
+    # Far side (AI side) – wider but still narrow for perspective
+    "far_left": (170, 180),
+    "far_right": (430, 180),
+    # Net depth (slightly toward AI side for ground view)
+    "net_y": 365,
+    # Net visual height
+    "net_height": 32,
+    # Mesh spacing (smaller = finer mesh)
+    "mesh_step": 6,
+}
+
+# ---------------- DRAW ----------------
+def draw_court(vis, layout=COURT_LAYOUT):
+    near_left, near_right = layout["near_left"], layout["near_right"]
+    far_left, far_right = layout["far_left"], layout["far_right"]
+
+    # -------- COURT (GROUND VIEW TRAPEZOID) --------
+    court = np.array([near_left, near_right, far_right, far_left], np.int32)
+    cv2.polylines(vis, [court], True, (0, 200, 0), 2)
+
+    # -------- NET (FULL WIDTH + HEIGHT + MESH) --------
+    net_y = layout["net_y"]
+    # Net must match court width at this depth
+    net_left_x = far_left[0]
+    net_right_x = far_right[0]
+    net_height = layout["net_height"]
+    mesh_step = layout["mesh_step"]
+
+    # -------- Bottom tape / shadow (ground contact) --------
+    cv2.line(vis, (net_left_x, net_y + 3), (net_right_x, net_y + 3), (110, 110, 110), 2)
+
+    # -------- Vertical mesh lines --------
+    for x in range(net_left_x, net_right_x, mesh_step):
+        # Perspective tilt: lines converge upward
+        tilt = int((x - net_left_x) * 0.04)
+        cv2.line(vis, (x, net_y), (x + tilt, net_y - net_height), (170, 170, 170), 1)
+
+    # -------- Horizontal mesh lines --------
+    for i in range(0, net_height, mesh_step):
+        shade = 190 - i * 2
+        left = net_left_x + i // 3
+        right = net_right_x - i // 3
+        cv2.line(vis, (left, net_y - i), (right, net_y - i), (shade, shade, shade), 1)
+
+    # -------- Top tape (white, crisp) --------
+    cv2.line(
+        vis,
+        (net_left_x + net_height // 3, net_y - net_height),
+        (net_right_x - net_height // 3, net_y - net_height),
+        (255, 255, 255),
+        2,
+    )
+
+
+# ---------------- CACHED LAYER ----------------
+class CourtLayer:
+    def __init__(self, layout=COURT_LAYOUT):
+        self.layout = layout
+        self.key = None
+        self.layer = None
+        self.alpha = None
+
+    def _build(self, shape):
+        # Lines are opaque and drawn without anti-aliasing, so drawing them
+        # onto black gives the exact final colours and a binary alpha
+        self.layer = np.zeros(shape, np.uint8)
+        draw_court(self.layer, self.layout)
+        self.alpha = self.layer.any(axis=2).astype(np.uint8) * 255
+
+        # The court covers a few percent of the frame: compositing scatters
+        # just those bytes (flat indices, one per channel) instead of
+        # blending the whole image
+        pixels = np.flatnonzero(self.alpha)
+        channels = shape[2]
+        self.index = (pixels[:, None] * channels + np.arange(channels)).ravel()
+        self.values = self.layer.reshape(-1)[self.index]
+
+    def composite(self, frame, out=None):
+        # Returns frame with the court on top, in `out` if given (contiguous,
+        # same shape and dtype as frame) or a new array
+        key = (frame.shape, tuple(sorted(self.layout.items())))
+        if key != self.key:
+            self._build(frame.shape)
+            self.key = key
+
+        if out is None:
+            out = np.array(frame, order="C")
+        else:
+            np.copyto(out, frame)
+        out.reshape(-1)[self.index] = self.values
+        return out
@@ -0,0 +1,95 @@
+# Ground-view projection shared by the renderers
+#
+# Court position (x in court units, y in flat screen pixels) -> ground-view
+# pixel, as main.py always drew it:
+#   flat_x = int(50 + x * (SCREEN_W - 100) / COURT_WIDTH)
+#   depth  = clamp((y - 100) / (SCREEN_H - 200), 0, 1)
+#   scale  = 0.45 + 0.75 * depth
+#   proj   = (int(cx + (flat_x - cx) * scale), int(y * (0.8 + 0.2 * depth)))
+# The row mapping is quadratic in y, so this is not a homography; the model
+# keeps its coefficients precomputed instead and evaluates whole arrays of
+# points per call. unproject() inverts it.
+import numpy as np
+
+from engine.controls import CONSTANTS
+
+MARGIN_PX = 50          # court inset from the screen edge
+HORIZON_PX = 100        # depth 0 row; depth 1 is SCREEN_H - HORIZON_PX
+# scale and row factor at depth 0 and how much they grow to depth 1
+FAR_SCALE, SCALE_RANGE = 0.45, 0.75
+FAR_ROW, ROW_RANGE = 0.8, 0.2
+
+
+def _ints(a):
+    # int() semantics (truncate toward zero); plain int for scalar input so
+    # results go straight into cv2 calls
+    a = np.trunc(a)
+    return int(a) if a.ndim == 0 else a.astype(np.int64)
+
+
+class GroundProjection:
+    def __init__(self, constants=CONSTANTS):
+        screen_w = constants["SCREEN_W"]
+        screen_h = constants["SCREEN_H"]
+
+        self.px_per_unit = (screen_w - 2 * MARGIN_PX) / constants["COURT_WIDTH"]
+        self.center_x = screen_w // 2
+        self.depth_rows = screen_h - 2 * HORIZON_PX
+
+    # ---------------- FORWARD ----------------
+    def to_px(self, x_unit):
+        return _ints(MARGIN_PX + np.asarray(x_unit, np.float64) * self.px_per_unit)
+
+    def depth(self, y_px):
+        return np.clip((np.asarray(y_px, np.float64) - HORIZON_PX) / self.depth_rows, 0, 1)
+
+    def project(self, x_unit, y_px):
+        # Arrays (or scalars) of court points -> (proj_x, proj_y, scale)
+        y_px = np.asarray(y_px, np.float64)
+        depth = self.depth(y_px)
+        scale = FAR_SCALE + depth * SCALE_RANGE
+        flat_x = self.to_px(x_unit)
+
+        proj_x = _ints(self.center_x + (flat_x - self.center_x) * scale)
+        proj_y = _ints(y_px * (FAR_ROW + depth * ROW_RANGE))
+        return proj_x, proj_y, scale
+
+    def project_point(self, x_unit, y_px):
+        # Scalar project() for a handful of entities per frame, where NumPy
+        # call overhead would dominate; same expressions, same results
+        depth = (y_px - HORIZON_PX) / self.depth_rows
+        depth = max(0, min(1, depth))
+        scale = FAR_SCALE + depth * SCALE_RANGE
+        flat_x = int(MARGIN_PX + x_unit * self.px_per_unit)
+
+        proj_x = int(self.center_x + (flat_x - self.center_x) * scale)
+        proj_y = int(y_px * (FAR_ROW + depth * ROW_RANGE))
+        return proj_x, proj_y, scale
+
+    # ---------------- INVERSE ----------------
+    def unproject_y(self, proj_y):
+        # Solve proj_y = y * (FAR_ROW + ROW_RANGE * depth(y)):
+        # linear above the horizon and below the near row, quadratic between
+        proj_y = np.asarray(proj_y, np.float64)
+        near_start = HORIZON_PX + self.depth_rows
+
+        k = ROW_RANGE / self.depth_rows
+        b = FAR_ROW - k * HORIZON_PX
+        y = (-b + np.sqrt(b * b + 4 * k * np.maximum(proj_y, 0))) / (2 * k)
+
+        y = np.where(proj_y < HORIZON_PX * FAR_ROW, proj_y / FAR_ROW, y)
+        return np.where(proj_y > near_start * (FAR_ROW + ROW_RANGE), proj_y / (FAR_ROW + ROW_RANGE), y)
+
+    def unproject(self, proj_x, proj_y):
+        # Ground-view pixel -> (x in court units, y in flat screen pixels),
+        # up to the integer rounding of the forward mapping
+        y_px = self.unproject_y(proj_y)
+        depth = self.depth(y_px)
+        scale = FAR_SCALE + depth * SCALE_RANGE
+
+        flat_x = self.center_x + (np.asarray(proj_x, np.float64) - self.center_x) / scale
+        return (flat_x - MARGIN_PX) / self.px_per_unit, y_px
+
+
+# Default model for CONSTANTS
+PROJECTION = GroundProjection()
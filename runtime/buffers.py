@@ -0,0 +1,75 @@
+import math
+import threading
+
+import numpy as np
+
+# ---------------- FRAME POOL ----------------
+class FramePool:
+    # Reusable image buffers for cv2 dst= / out= arguments.
+    #
+    # acquire() lends a view into a pooled byte buffer; release() gives it
+    # back. A frame read by several consumers (e.g. the inference and render
+    # stages of runtime/pipeline.py) is acquired with holders=N and returns
+    # to the pool after N releases, whichever threads they come from. In
+    # steady state the pool stops growing and the frame loop allocates
+    # nothing large.
+    #
+    # At most `limit` buffers are pooled. When all of them are lent out,
+    # acquire() still succeeds with a fresh unpooled frame and counts it in
+    # `overflow`: a loop that forgets a release shows up there instead of
+    # growing memory forever.
+    def __init__(self, limit=16):
+        self.limit = limit
+        self.pooled = 0         # buffers owned by the pool
+        self.free = []          # pooled buffers nobody holds
+        self.lent = {}          # id(frame) -> [frame, pooled buffer or None, holders]
+        self.allocated = 0      # buffers created so far
+        self.overflow = 0       # frames handed out beyond the limit
+        self.lock = threading.Lock()
+
+    def acquire(self, shape, dtype=np.uint8, holders=1):
+        dtype = np.dtype(dtype)
+        nbytes = math.prod(shape) * dtype.itemsize
+
+        with self.lock:
+            buf = None
+            for i in range(len(self.free)):
+                if self.free[i].nbytes >= nbytes:
+                    buf = self.free.pop(i)
+                    break
+
+            pooled = buf is not None
+            if buf is None:
+                # Nothing free is large enough: replace a free but too small
+                # buffer (frame size changed), or grow the pool up to its limit
+                if self.pooled >= self.limit and self.free:
+                    self.free.pop(0)
+                    self.pooled -= 1
+                buf = np.empty(nbytes, np.uint8)
+                self.allocated += 1
+                pooled = self.pooled < self.limit
+                if pooled:
+                    self.pooled += 1
+                else:
+                    self.overflow += 1
+
+            frame = buf[:nbytes].view(dtype).reshape(shape)
+            # The lease keeps the frame alive, so its id stays unique
+            self.lent[id(frame)] = [frame, buf if pooled else None, holders]
+        return frame
+
+    def release(self, frame):
+        with self.lock:
+            lease = self.lent.get(id(frame))
+            if lease is None or lease[0] is not frame:
+                raise ValueError("frame was not acquired from this pool (or is already released)")
+            lease[2] -= 1
+            if lease[2] == 0:
+                del self.lent[id(frame)]
+                if lease[1] is not None:
+                    self.free.append(lease[1])
+
+    @property
+    def in_use(self):
+        # Frames lent out and not yet fully released
+        return len(self.lent)
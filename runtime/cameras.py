@@ -0,0 +1,290 @@
+import math
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from runtime.buffers import FramePool
+from runtime.pipeline import LatestQueue, StageStats
+from vision.landmarks import HandFeatures
+from vision.sources import CameraSource, open_source
+
+# Several cameras on one court
+#
+#   cap = MultiCamera(["0", "1"], lambda: HandTracker("VIDEO"))
+#   run_serial(cap, cap.fusion, game)
+#
+# Every camera gets a worker thread that captures, flips and runs its own
+# tracker. cv2 and MediaPipe release the GIL while they work, so the
+# workers run in parallel and throughput grows with cores; frames never
+# have to be copied between processes. Each result is stamped with its
+# frame's capture time on a clock shared by all cameras.
+#
+# MultiCamera stands in for the frame source (the first camera's frames, for
+# display) and MultiCamera.fusion for the hand tracker: for the timestamp of
+# the frame being played it takes each camera's result closest in time and
+# fuses them into one get_hand_data() stream for GameState. The cameras are
+# assumed to frame the court the same way; a per-camera weight (e.g. from
+# calibration error) says how far each one is trusted.
+#
+# Replayed sessions stay aligned only at native speed (no --fast): every
+# worker reads as fast as its source allows.
+
+SYNC_WINDOW = 0.05      # s; results further than this from the fused tick are ignored
+HISTORY = 8             # results kept per camera for alignment
+TRACK_FRAMES = 3        # consecutive detections before a camera's hand gets full weight
+
+class CameraResult:
+    __slots__ = ("seq", "t", "data", "stroke", "features", "weight")
+
+    def __init__(self, seq, t, data, stroke, features, weight):
+        self.seq = seq
+        self.t = t
+        self.data = data
+        self.stroke = stroke
+        self.features = features
+        self.weight = weight
+
+
+# ---------------- WORKER ----------------
+class CameraWorker:
+    def __init__(self, name, source, tracker, publish=False, weight=1.0):
+        self.name = name
+        self.source = source
+        self.tracker = tracker
+        self.weight = weight
+        self.streak = 0         # consecutive frames with a hand
+
+        # Latest results, appended by the worker thread only
+        self.history = deque(maxlen=HISTORY)
+        self.seq = 0            # frames processed
+        self.used = 0           # results that made it into a fused tick
+        self.last_used = -1
+
+        # Raw frames are pooled: the worker reads into them and the display
+        # side releases them (MultiCamera.read, or a drop from the queue)
+        self.raw_pool = FramePool(limit=8)
+
+        # Display frames (first camera only): (raw, timestamp, pooled frame
+        # or None), as a source would return
+        self.frames = LatestQueue(1, self.release) if publish else None
+
+        self.stats = StageStats(name)
+        self.running = False
+        self.thread = None
+
+    @property
+    def dropped(self):
+        # Frames captured and tracked but never fused
+        return self.seq - self.used
+
+    def _weight(self, data):
+        # Presence times tracking confidence: no hand weighs nothing, a hand
+        # seen once (possibly a false detection) a third, one followed for
+        # TRACK_FRAMES frames the camera's full weight
+        if data[0] is None:
+            self.streak = 0
+            return 0.0
+        self.streak += 1
+        return self.weight * min(1.0, self.streak / TRACK_FRAMES)
+
+    def release(self, item):
+        if item[2] is not None:
+            self.raw_pool.release(item[2])
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        flip_pool = FramePool(limit=2)
+        shape = None
+
+        while self.running:
+            dst = self.raw_pool.acquire(shape) if shape else None
+            ret, raw = self.source.read(dst)
+            if dst is not None and raw is not dst:
+                # Not read in place (end of stream, size change)
+                self.raw_pool.release(dst)
+                dst = None
+            if not ret:
+                break
+            shape = raw.shape
+            ts = self.source.timestamp
+
+            # Timed from the end of capture: busy time is flip + tracking
+            start = time.perf_counter()
+            frame = flip_pool.acquire(raw.shape)
+            cv2.flip(raw, 1, dst=frame)
+            data = self.tracker.get_hand_data(frame, ts * 1000)
+            flip_pool.release(frame)
+            self.history.append(CameraResult(
+                self.seq, ts, data, self.tracker.stroke_delta, self.tracker.features.copy(),
+                self._weight(data),
+            ))
+            self.seq += 1
+
+            # Published after inference, so the fused tick for this frame
+            # always has this camera's result
+            if self.frames is not None:
+                self.frames.put((raw, ts, dst))
+            elif dst is not None:
+                self.raw_pool.release(dst)
+            self.stats.record(start, time.perf_counter())
+
+        self.running = False
+        if self.frames is not None:
+            self.frames.close()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+# ---------------- FUSION ----------------
+class CameraFusion:
+    # The get_hand_data() contract over all cameras: position and motion are
+    # the mean of the cameras that see the hand, weighted by their result's
+    # weight (presence, tracking confidence, camera weight); a stroke is
+    # taken once, from the camera that saw it strongest, along with that
+    # camera's features.
+    def __init__(self, workers, window=SYNC_WINDOW):
+        self.workers = workers
+        self.window = window
+        self.stroke_delta = None
+        self.features = HandFeatures()
+
+    def _aligned(self, worker, t):
+        # tuple() copies the deque in one step under the GIL, safe while
+        # the worker appends
+        best = None
+        for r in tuple(worker.history):
+            d = abs(r.t - t)
+            if d <= self.window and (best is None or d < abs(best.t - t)):
+                best = r
+        return best
+
+    def get_hand_data(self, frame=None, timestamp_ms=None):
+        # frame is unused: the workers already ran inference
+        if timestamp_ms is None:
+            history = self.workers[0].history
+            if not history:
+                self.stroke_delta = None
+                return None, None, None, None
+            t = history[-1].t
+        else:
+            t = timestamp_ms / 1000.0
+
+        wsum = sx = sy = 0.0
+        msum = mx = my = 0.0
+        stroke, stroke_size = None, 0.0
+        features, features_score = None, -1.0
+
+        for worker in self.workers:
+            r = self._aligned(worker, t)
+            if r is None:
+                continue
+
+            # A result's stroke counts once, however often it is aligned
+            fresh = r.seq > worker.last_used
+            if fresh:
+                worker.last_used = r.seq
+                worker.used += 1
+
+            cx, cy, dx, dy = r.data
+            weight = r.weight
+            if cx is None or weight <= 0:
+                continue
+            wsum += weight
+            sx += weight * cx
+            sy += weight * cy
+            if dx is not None:
+                msum += weight
+                mx += weight * dx
+                my += weight * dy
+
+            if fresh and r.stroke is not None:
+                size = math.hypot(*r.stroke)
+                if size > stroke_size:
+                    stroke, stroke_size = r.stroke, size
+                    features, features_score = r.features, math.inf
+            if weight > features_score:
+                features, features_score = r.features, weight
+
+        self.stroke_delta = stroke
+        if features is not None:
+            self.features = features
+        if not wsum:
+            return None, None, None, None
+        if not msum:
+            return sx / wsum, sy / wsum, None, None
+        return sx / wsum, sy / wsum, mx / msum, my / msum
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+            worker.tracker.close()
+
+
+# ---------------- MANAGER ----------------
+class MultiCamera:
+    # specs: anything open_source() takes; make_tracker() builds one tracker
+    # per camera; weights: optional trust per camera (default 1 each).
+    # Workers start on the first read().
+    def __init__(self, specs, make_tracker, realtime=True, window=SYNC_WINDOW, weights=None):
+        sources = [open_source(spec, realtime) for spec in specs]
+
+        # Live cameras share one clock origin so their timestamps compare;
+        # recorded sessions already start at 0 together
+        start = time.perf_counter()
+        for source in sources:
+            if isinstance(source, CameraSource):
+                source.start = start
+
+        weights = weights or [1.0] * len(specs)
+        self.workers = [
+            CameraWorker(str(spec), source, make_tracker(), publish=i == 0, weight=weight)
+            for i, (spec, source, weight) in enumerate(zip(specs, sources, weights))
+        ]
+        self.fusion = CameraFusion(self.workers, window)
+        self.timestamp = None
+        self.started = False
+        self.shown = None       # frame returned by the last read()
+
+    def isOpened(self):
+        return all(worker.source.isOpened() for worker in self.workers)
+
+    def read(self, dst=None):
+        # The first camera's next tracked frame, valid until the next read().
+        # dst is ignored: the frame comes from that worker's pool.
+        primary = self.workers[0]
+        if not self.started:
+            self.started = True
+            for worker in self.workers:
+                worker.start()
+
+        if self.shown is not None:
+            primary.release(self.shown)
+            self.shown = None
+        item = primary.frames.get()
+        if item is None:
+            return False, None
+        self.shown = item
+        raw, self.timestamp, _ = item
+        return True, raw
+
+    def report(self):
+        return "\n".join(
+            f"{w.name}: {w.stats.fps():5.1f} fps ({w.stats.busy_ms():.1f} ms) | "
+            f"{w.seq} frames, fused {w.used}, dropped {w.dropped}"
+            for w in self.workers
+        )
+
+    def release(self):
+        for worker in self.workers:
+            worker.stop()
+            worker.source.release()
@@ -0,0 +1,199 @@
+import json
+import socket
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+# Game events, off the real-time path
+#
+#   EVENTS.emit(HIT, now, "SMASH")
+#
+# emit() appends one tuple to a bounded deque and returns. deque appends
+# and pops are atomic under the GIL, so producers take no lock and never
+# wait on I/O; when the ring is full the oldest event is dropped (and
+# counted). Once start() is called a background thread drains the ring
+# every few milliseconds and hands each batch to the subscribers: sinks
+# (console, JSON lines, socket) and consumers such as a HUD or scoring.
+# A subscriber that raises is reported on stderr (traceback the first time,
+# then counted in `errors`) and keeps receiving later batches; the others
+# are not affected.
+
+RING = 4096             # events held before the oldest are dropped
+INTERVAL = 0.02         # s between drains
+RECONNECT = 1.0         # s before a failed socket sink retries
+
+# ---------------- EVENT TYPES ----------------
+# An event is a tuple (kind, t, a, b): t is the game clock in seconds,
+# a / b depend on the kind:
+#   HIT, AI_RETURN, P2_HIT   a = shot type
+#   STATE                    a = previous state name, b = new state name
+# P2_HIT / P2_LATE replace AI_RETURN / AI_LATE in two-player mode.
+HIT, AI_RETURN, RALLY_WON, RALLY_LOST, AI_LATE, STATE, P2_HIT, P2_LATE = range(8)
+EVENT_NAMES = ["hit", "ai_return", "rally_won", "rally_lost", "ai_late", "state", "p2_hit", "p2_late"]
+
+def to_dict(event):
+    kind, t, a, b = event
+    out = {"event": EVENT_NAMES[kind], "t": t}
+    if kind == STATE:
+        out["from"], out["to"] = a, b
+    elif a is not None:
+        out["shot"] = a
+    return out
+
+def to_text(event):
+    # The console lines the game always printed; None for silent kinds
+    kind, _, a, _ = event
+    if kind == HIT:
+        return f"🏸 Player hits ({a})"
+    if kind == AI_RETURN:
+        return f"🤖 AI hits back ({a})"
+    if kind == P2_HIT:
+        return f"🏸 Player 2 hits back ({a})"
+    if kind == RALLY_WON:
+        return "🏆 Rally WON"
+    if kind == AI_LATE:
+        return "🏆 Rally WON (AI too late)"
+    if kind == P2_LATE:
+        return "🏆 Rally WON (player 2 missed)"
+    if kind == RALLY_LOST:
+        return "❌ Rally LOST"
+    return None
+
+
+# ---------------- SINKS ----------------
+# A subscriber is any callable taking a list of events; close() is called
+# on shutdown when present.
+class ConsoleSink:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def __call__(self, events):
+        lines = [text for text in map(to_text, events) if text is not None]
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.file = open(path, "w")
+
+    def __call__(self, events):
+        self.file.write("".join(json.dumps(to_dict(e)) + "\n" for e in events))
+
+    def close(self):
+        self.file.close()
+
+
+class SocketSink:
+    # JSON lines over TCP; events are dropped (and counted) while the peer
+    # is unreachable
+    def __init__(self, address):
+        host, port = address.rsplit(":", 1)
+        self.address = (host, int(port))
+        self.sock = None
+        self.retry_at = 0.0
+        self.dropped = 0
+
+    def __call__(self, events):
+        if self.sock is None:
+            if time.monotonic() < self.retry_at:
+                self.dropped += len(events)
+                return
+            try:
+                self.sock = socket.create_connection(self.address, timeout=1.0)
+            except OSError:
+                self.retry_at = time.monotonic() + RECONNECT
+                self.dropped += len(events)
+                return
+        try:
+            self.sock.sendall("".join(json.dumps(to_dict(e)) + "\n" for e in events).encode())
+        except OSError:
+            self.sock.close()
+            self.sock = None
+            self.retry_at = time.monotonic() + RECONNECT
+            self.dropped += len(events)
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+
+
+# ---------------- BUS ----------------
+class EventBus:
+    def __init__(self, capacity=RING):
+        self.ring = deque(maxlen=capacity)
+        self.dropped = 0
+        self.errors = 0         # subscriber calls that raised
+        self.failing = set()    # ids of subscribers already reported
+        self.subscribers = []
+        self.thread = None
+        self.running = False
+
+    def emit(self, kind, t, a=None, b=None):
+        ring = self.ring
+        if len(ring) == ring.maxlen:
+            self.dropped += 1
+        ring.append((kind, t, a, b))
+
+    def subscribe(self, subscriber):
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def drain(self):
+        # Everything emitted so far, oldest first. One consumer at a time:
+        # the writer thread once started, otherwise the caller.
+        ring = self.ring
+        events = []
+        try:
+            while True:
+                events.append(ring.popleft())
+        except IndexError:
+            return events
+
+    def _call(self, subscriber, fn, *args):
+        try:
+            fn(*args)
+        except Exception:
+            self.errors += 1
+            if id(subscriber) not in self.failing:
+                self.failing.add(id(subscriber))
+                sys.stderr.write(f"event subscriber {subscriber!r} failed (further errors only counted):\n")
+                traceback.print_exc(file=sys.stderr)
+
+    def _dispatch(self, events):
+        for subscriber in self.subscribers:
+            self._call(subscriber, subscriber, events)
+
+    # ---------------- WRITER ----------------
+    def start(self, interval=INTERVAL):
+        self.running = True
+        self.thread = threading.Thread(target=self._writer, args=(interval,), daemon=True)
+        self.thread.start()
+
+    def _writer(self, interval):
+        while self.running:
+            time.sleep(interval)
+            events = self.drain()
+            if events:
+                self._dispatch(events)
+
+    def close(self):
+        # Stops the writer after a final drain and closes the sinks
+        if self.thread is not None:
+            self.running = False
+            self.thread.join()
+            self.thread = None
+        events = self.drain()
+        if events:
+            self._dispatch(events)
+        for subscriber in self.subscribers:
+            close = getattr(subscriber, "close", None)
+            if close is not None:
+                self._call(subscriber, close)
+
+
+# Process-wide bus the game emits to
+EVENTS = EventBus()
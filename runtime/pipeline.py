@@ -0,0 +1,264 @@
+import threading
+import time
+from collections import deque
+
+# ---------------- LATEST-FRAME-WINS QUEUE ----------------
+class LatestQueue:
+    # Bounded queue where put() never blocks: when full, the oldest item is
+    # dropped so consumers always see the freshest data. on_drop(item) is
+    # called for every dropped item (e.g. to release a pooled frame).
+    def __init__(self, maxsize=1, on_drop=None):
+        self.items = deque(maxlen=maxsize)
+        self.on_drop = on_drop
+        self.cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        dropped = None
+        with self.cond:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+                dropped = self.items[0]
+            self.items.append(item)
+            self.cond.notify()
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+
+    def get(self, timeout=None):
+        with self.cond:
+            if not self.items and not self.closed:
+                self.cond.wait(timeout)
+            if not self.items:
+                return None
+            return self.items.popleft()
+
+    def get_nowait(self):
+        with self.cond:
+            if not self.items:
+                return None
+            return self.items.popleft()
+
+    def close(self):
+        # Producers are done: get() returns what is left, then None without
+        # waiting
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    @property
+    def finished(self):
+        # Closed and drained
+        with self.cond:
+            return self.closed and not self.items
+
+
+# ---------------- STAGE STATS ----------------
+class StageStats:
+    def __init__(self, name, window=120):
+        self.name = name
+        self.count = 0
+        self.stamps = deque(maxlen=window)
+        self.busy = deque(maxlen=window)
+
+    def record(self, start, end):
+        self.count += 1
+        self.stamps.append(end)
+        self.busy.append(end - start)
+
+    def fps(self):
+        if len(self.stamps) < 2:
+            return 0.0
+        span = self.stamps[-1] - self.stamps[0]
+        return (len(self.stamps) - 1) / span if span > 0 else 0.0
+
+    def busy_ms(self):
+        if not self.busy:
+            return 0.0
+        return 1000 * sum(self.busy) / len(self.busy)
+
+
+class LatencyStats:
+    def __init__(self, window=240):
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, int(p / 100 * len(ordered)))
+        return 1000 * ordered[idx]
+
+
+# ---------------- PACKETS ----------------
+class FramePacket:
+    __slots__ = ("frame_id", "t_capture", "frame")
+
+    def __init__(self, frame_id, t_capture, frame):
+        self.frame_id = frame_id
+        self.t_capture = t_capture
+        self.frame = frame
+
+
+class HandPacket:
+    __slots__ = ("frame_id", "t_capture", "data")
+
+    def __init__(self, frame_id, t_capture, data):
+        self.frame_id = frame_id
+        self.t_capture = t_capture
+        self.data = data
+
+
+# ---------------- PIPELINE ----------------
+class Pipeline:
+    # capture -> inference -> render, each on its own thread (render stays on
+    # the caller's thread because cv2.imshow must run there).
+    #
+    #   read_frame()              -> frame or None (end of stream)
+    #   infer(frame)              -> hand data tuple
+    #   render(frame, hand, now)  -> False to stop; hand is None when no new
+    #                                inference result arrived since last tick
+    #   release(frame)            -> optional; called once by each of the two
+    #                                consumers (inference, render) when it is
+    #                                done with a frame or has dropped it
+    #
+    # At end of stream the capture stage closes the queues and the other two
+    # drain them before exiting, so a recorded source plays to its last
+    # frame. An exception in a worker stage stops the pipeline and is raised
+    # again from run() once the threads are joined.
+    def __init__(self, read_frame, infer, render, report_every=2.0, release=None):
+        self.read_frame = read_frame
+        self.infer = infer
+        self.render = render
+        self.report_every = report_every
+        self.release = release or (lambda frame: None)
+
+        drop = lambda packet: self.release(packet.frame)
+        self.infer_q = LatestQueue(1, drop)
+        self.render_q = LatestQueue(1, drop)
+        self.hand_q = LatestQueue(1)
+
+        self.capture_stats = StageStats("capture")
+        self.infer_stats = StageStats("hand")
+        self.render_stats = StageStats("render")
+        self.latency = LatencyStats()
+
+        self.running = False
+        self.failures = []      # (stage, exception) raised in worker stages
+
+    # ---------------- WORKERS ----------------
+    def _guard(self, stage, loop):
+        # Thread target: a failing stage is recorded and shuts the others
+        # down instead of leaving them waiting on its queue
+        def target():
+            try:
+                loop()
+            except Exception as exc:
+                self.failures.append((stage, exc))
+                self.running = False
+                self.infer_q.close()
+                self.render_q.close()
+        return target
+
+    def _capture_loop(self):
+        frame_id = 0
+        while self.running:
+            start = time.perf_counter()
+            frame = self.read_frame()
+            end = time.perf_counter()
+            if frame is None:
+                break
+
+            packet = FramePacket(frame_id, end, frame)
+            self.infer_q.put(packet)
+            self.render_q.put(packet)
+            self.capture_stats.record(start, end)
+            frame_id += 1
+
+        self.infer_q.close()
+        self.render_q.close()
+
+    def _infer_loop(self):
+        while self.running:
+            packet = self.infer_q.get(timeout=0.1)
+            if packet is None:
+                if self.infer_q.finished:
+                    break
+                continue
+
+            start = time.perf_counter()
+            data = self.infer(packet.frame)
+            end = time.perf_counter()
+            self.release(packet.frame)
+
+            self.hand_q.put(HandPacket(packet.frame_id, packet.t_capture, data))
+            self.infer_stats.record(start, end)
+
+    # ---------------- REPORT ----------------
+    def report(self):
+        return (
+            f"capture {self.capture_stats.fps():5.1f} fps | "
+            f"hand {self.infer_stats.fps():5.1f} fps ({self.infer_stats.busy_ms():.1f} ms) | "
+            f"render {self.render_stats.fps():5.1f} fps ({self.render_stats.busy_ms():.1f} ms) | "
+            f"latency p50 {self.latency.percentile(50):.1f} ms "
+            f"p95 {self.latency.percentile(95):.1f} ms | "
+            f"dropped hand {self.infer_q.dropped} / render {self.render_q.dropped}"
+        )
+
+    # ---------------- RUN ----------------
+    def run(self):
+        self.running = True
+        workers = [
+            threading.Thread(target=self._guard("capture", self._capture_loop), daemon=True),
+            threading.Thread(target=self._guard("hand", self._infer_loop), daemon=True),
+        ]
+        for w in workers:
+            w.start()
+
+        last_report = time.perf_counter()
+
+        try:
+            while self.running:
+                packet = self.render_q.get(timeout=0.1)
+                if packet is None:
+                    if self.render_q.finished:
+                        break
+                    continue
+
+                hand = self.hand_q.get_nowait()
+
+                start = time.perf_counter()
+                keep_going = self.render(packet.frame, None if hand is None else hand.data, time.time())
+                end = time.perf_counter()
+                self.release(packet.frame)
+                self.render_stats.record(start, end)
+
+                # End-to-end: from capture of the frame the hand result came
+                # from to the moment it is on screen.
+                if hand is not None:
+                    self.latency.add(end - hand.t_capture)
+
+                if keep_going is False:
+                    break
+
+                if self.report_every and end - last_report > self.report_every:
+                    print(self.report())
+                    last_report = end
+        finally:
+            self.running = False
+            self.infer_q.close()
+            self.render_q.close()
+            for w in workers:
+                w.join(timeout=1.0)
+            # Frames still queued when rendering stopped
+            for q in (self.infer_q, self.render_q):
+                packet = q.get_nowait()
+                while packet is not None:
+                    self.release(packet.frame)
+                    packet = q.get_nowait()
+
+        if self.failures:
+            raise self.failures[0][1]
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Per-stage frame-time instrumentation.
+#
+#   with PROFILER.stage("detect"):
+#       result = detector.detect(image)
+#
+# PROFILER is disabled until enable() is called: stage() then hands back a
+# shared no-op context manager, so instrumented code costs one method call
+# per stage. Enabled, every stage keeps a rolling window of durations for
+# p50 / p95 / p99 and can stream every timing to a trace file.
+
+WINDOW = 512            # durations kept per stage for percentiles
+FLUSH_EVENTS = 4096     # buffered trace events per file write
+
+
+# ---------------- STAGES ----------------
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+class StageTimes:
+    def __init__(self, window=WINDOW):
+        self.ms = np.zeros(window)
+        self.count = 0
+
+    def add(self, ms):
+        self.ms[self.count % len(self.ms)] = ms
+        self.count += 1
+
+    def percentiles(self, ps=(50, 95, 99)):
+        n = min(self.count, len(self.ms))
+        if not n:
+            return [0.0] * len(ps)
+        return np.percentile(self.ms[:n], ps).tolist()
+
+
+# ---------------- TRACE EXPORT ----------------
+class TraceExporter:
+    # path ending in .jsonl: one {"name", "ts", "dur", "tid"} object per line
+    # (microseconds); anything else: Chrome trace event format, loadable in
+    # chrome://tracing or Perfetto.
+    def __init__(self, path):
+        self.path = path
+        self.lines = path.endswith(".jsonl")
+        self.file = open(path, "w")
+        self.first = True
+        self.pid = os.getpid()
+        if not self.lines:
+            self.file.write('{"traceEvents": [\n')
+
+    def write(self, events):
+        out = []
+        for name, start_ns, dur_ns, tid in events:
+            if self.lines:
+                event = {"name": name, "ts": start_ns / 1000, "dur": dur_ns / 1000, "tid": tid}
+            else:
+                event = {"name": name, "ph": "X", "ts": start_ns / 1000, "dur": dur_ns / 1000,
+                         "pid": self.pid, "tid": tid}
+            out.append(json.dumps(event))
+
+        if self.lines:
+            self.file.write("".join(line + "\n" for line in out))
+        elif out:
+            self.file.write(("" if self.first else ",\n") + ",\n".join(out))
+            self.first = False
+
+    def close(self):
+        if not self.lines:
+            self.file.write("\n]}\n")
+        self.file.close()
+
+
+# ---------------- PROFILER ----------------
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.hud = False
+        self.stages = {}
+        self.exporter = None
+        self.events = []
+        self.lock = threading.Lock()
+
+        # HUD text is refreshed at most every hud_every seconds
+        self.hud_every = 0.5
+        self.hud_lines = []
+        self.hud_time = 0.0
+
+    def enable(self, trace_path=None, hud=False):
+        self.enabled = True
+        self.hud = hud
+        if trace_path:
+            self.exporter = TraceExporter(trace_path)
+
+    def stage(self, name):
+        if not self.enabled:
+            return NULL_STAGE
+        return _Stage(self, name)
+
+    # start() / stop() for spans that do not fit a with block
+    def start(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def stop(self, name, start_ns):
+        if self.enabled:
+            self.record(name, start_ns, time.perf_counter_ns())
+
+    def record(self, name, start_ns, end_ns):
+        times = self.stages.get(name)
+        if times is None:
+            times = self.stages.setdefault(name, StageTimes())
+        times.add((end_ns - start_ns) / 1e6)
+
+        if self.exporter is not None:
+            with self.lock:
+                if self.exporter is None:      # closed meanwhile
+                    return
+                self.events.append((name, start_ns, end_ns - start_ns, threading.get_ident()))
+                if len(self.events) >= FLUSH_EVENTS:
+                    self._flush()
+
+    def _flush(self):
+        self.exporter.write(self.events)
+        self.events = []
+
+    # ---------------- REPORT ----------------
+    def summary(self):
+        return {
+            name: dict(zip(("p50", "p95", "p99"), times.percentiles()), count=times.count)
+            # other threads may add stages while this iterates
+            for name, times in list(self.stages.items())
+        }
+
+    def report(self):
+        lines = [f"{'stage':<12}{'count':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:<12}{s['count']:>8}{s['p50']:>9.2f}{s['p95']:>9.2f}{s['p99']:>9.2f}")
+        return "\n".join(lines)
+
+    def draw_hud(self, vis):
+        if not self.hud:
+            return vis
+        now = time.perf_counter()
+        if now - self.hud_time > self.hud_every:
+            self.hud_time = now
+            self.hud_lines = [
+                f"{name:<9} {s['p50']:5.1f} {s['p95']:5.1f} {s['p99']:5.1f} ms"
+                for name, s in self.summary().items()
+            ]
+        for i, line in enumerate(self.hud_lines):
+            cv2.putText(vis, line, (10, 20 + 16 * i), cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 255, 255), 1)
+        return vis
+
+    def close(self):
+        if self.exporter is not None:
+            with self.lock:
+                self._flush()
+                self.exporter.close()
+                self.exporter = None
+
+
+# Process-wide profiler the instrumented modules import
+PROFILER = Profiler()
@@ -0,0 +1,252 @@
+# Multi-session game server
+#
+# Hosts many independent rallies (one GameState each) in one process: a
+# kiosk connects, joins a session and streams its hand input, the server
+# ticks every session from one asyncio scheduler and pushes a snapshot of
+# each game back after every tick.
+#
+#   python -m runtime.server --port 8765
+#   python -m runtime.server --unix /tmp/badminton.sock
+#   python -m bench.server_load --sessions 200      # load test
+#
+# The tick is plain Python over all sessions. Input and game work are a few
+# microseconds per session; the snapshot send (one syscall per client)
+# costs several times that and sets how many sessions a core carries. A
+# client that stops reading only loses its own snapshots (see SEND_LIMIT);
+# it never stalls the tick.
+import argparse
+import asyncio
+import math
+import struct
+import time
+from collections import deque
+
+import numpy as np
+
+from engine.controls import CONSTANTS, apply_hand_input, step_game
+from engine.snapshot import SnapshotEncoder, capture
+from engine.state import GameState
+from vision.landmarks import NUM_LANDMARKS
+from vision.tracker_base import TrackerBase
+
+TICK_HZ = 60
+SEND_LIMIT = 64 * 1024  # bytes queued for a client before its snapshots are skipped
+STATS_WINDOW = 600      # ticks the latency percentiles cover
+
+# ---------------- PROTOCOL ----------------
+# Every message is one type byte and a little-endian body, in both
+# directions. Bodies are fixed-size except SNAPSHOT. NaN stands for None in
+# float fields.
+#   client: JOIN, then INPUT (hand sample) or LANDMARKS (raw detection) at
+#           any rate; STATS at any time
+#   server: WELCOME (session id) after JOIN, SNAPSHOT every tick,
+#           STATS_REPLY after STATS
+# A SNAPSHOT body is a u16 length and one engine/snapshot.py stream entry
+# (the same format as replay files): a KEY first and after every skipped
+# send, otherwise a DELTA against the previous SNAPSHOT. Clients read it
+# with SnapshotDecoder.
+JOIN, WELCOME, INPUT, LANDMARKS, SNAPSHOT, STATS, STATS_REPLY = range(7)
+BODIES = {
+    JOIN: struct.Struct("<"),
+    WELCOME: struct.Struct("<I"),
+    # cx, cy, dx, dy, stroke dx, stroke dy
+    INPUT: struct.Struct("<6f"),
+    # t, present, handedness (vision/landmarks.py code, signed), score,
+    # points (x, y, z per landmark)
+    LANDMARKS: struct.Struct(f"<dBbf{NUM_LANDMARKS * 3}f"),
+    # entry length; the entry follows
+    SNAPSHOT: struct.Struct("<H"),
+    STATS: struct.Struct("<"),
+    # sessions, ticks, skipped snapshots, tick mean / p50 / p99 / max ms,
+    # lateness p99 ms
+    STATS_REPLY: struct.Struct("<III5f"),
+}
+# SNAPSHOT message header: type byte + entry length
+SNAPSHOT_HEADER = struct.Struct("<BH")
+
+def encode(kind, *values):
+    return bytes((kind,)) + BODIES[kind].pack(*values)
+
+async def read_message(reader):
+    # (kind, values); raises IncompleteReadError at end of stream and
+    # KeyError on an unknown type. A SNAPSHOT's values are (entry bytes,).
+    kind = (await reader.readexactly(1))[0]
+    body = BODIES[kind]
+    if not body.size:
+        return kind, ()
+    values = body.unpack(await reader.readexactly(body.size))
+    if kind == SNAPSHOT:
+        return kind, (await reader.readexactly(values[0]),)
+    return kind, values
+
+def _none(v):
+    return None if math.isnan(v) else v
+
+
+# ---------------- SESSION ----------------
+class Session:
+    def __init__(self, sid, writer, constants=CONSTANTS, motion_filter=None):
+        self.sid = sid
+        self.writer = writer
+        self.constants = constants
+        self.game = GameState(verbose=False, constants=constants)
+
+        # LANDMARKS go through the usual tracker state (filter, stroke_delta)
+        self.hand = TrackerBase(motion_filter)
+
+        # (data, stroke, features) received since the last tick, applied in
+        # order on the next one so no stroke is lost between ticks
+        self.inputs = []
+        self.skipped = 0
+        self.encoder = SnapshotEncoder()
+
+    def on_input(self, cx, cy, dx, dy, sdx, sdy):
+        stroke = None if math.isnan(sdx) else (sdx, sdy)
+        self.inputs.append(((_none(cx), _none(cy), _none(dx), _none(dy)), stroke, None))
+
+    def on_landmarks(self, values):
+        t, present, handedness, score = values[:4]
+        hand = self.hand
+        if not present:
+            self.inputs.append((hand._lost(t * 1000), None, None))
+            return
+        points = np.array(values[4:], np.float32).reshape(NUM_LANDMARKS, 3)
+        hand.features.load(points, handedness, score, t)
+        data = hand._found(t * 1000)
+        stroke = hand.stroke_delta
+        # The features only matter to classify a stroke; copied because the
+        # next message overwrites them
+        self.inputs.append((data, stroke, hand.features.copy() if stroke is not None else None))
+
+    def step(self, now, tick):
+        game = self.game
+        for data, stroke, features in self.inputs:
+            apply_hand_input(game, *data, now, stroke, features, self.constants)
+        self.inputs.clear()
+        step_game(game, now, self.constants)
+
+        if self.writer.transport.get_write_buffer_size() > SEND_LIMIT:
+            # The client misses this entry: restart its stream with a KEY
+            self.skipped += 1
+            self.encoder.reset()
+            return
+        entry = self.encoder.encode(capture(game, tick, now))
+        self.writer.write(SNAPSHOT_HEADER.pack(SNAPSHOT, len(entry)) + entry)
+
+
+# ---------------- SERVER ----------------
+class GameServer:
+    def __init__(self, hz=TICK_HZ, constants=CONSTANTS, motion_filter=None):
+        self.dt = 1.0 / hz
+        self.constants = constants
+        self.motion_filter = motion_filter
+        self.sessions = {}
+        self.next_id = 1
+
+        self.ticks = 0
+        self.skipped = 0        # snapshots of closed sessions included
+        self.tick_ms = deque(maxlen=STATS_WINDOW)
+        self.late_ms = deque(maxlen=STATS_WINDOW)
+
+    # ---------------- CLIENTS ----------------
+    async def handle(self, reader, writer):
+        session = None
+        try:
+            while True:
+                kind, values = await read_message(reader)
+                if kind == JOIN and session is None:
+                    session = Session(self.next_id, writer, self.constants, self.motion_filter)
+                    self.next_id += 1
+                    self.sessions[session.sid] = session
+                    writer.write(encode(WELCOME, session.sid))
+                elif kind == INPUT and session is not None:
+                    session.on_input(*values)
+                elif kind == LANDMARKS and session is not None:
+                    session.on_landmarks(values)
+                elif kind == STATS:
+                    writer.write(encode(STATS_REPLY, *self.stats()))
+        except (asyncio.IncompleteReadError, ConnectionError, KeyError):
+            pass
+        finally:
+            if session is not None:
+                self.skipped += session.skipped
+                del self.sessions[session.sid]
+            writer.close()
+
+    # ---------------- SCHEDULER ----------------
+    async def run(self):
+        # Fixed-rate ticks on the loop clock; after an overrun the schedule
+        # restarts from now instead of bursting to catch up
+        loop = asyncio.get_running_loop()
+        start = deadline = loop.time()
+        while True:
+            deadline += self.dt
+            delay = deadline - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+                deadline = loop.time()
+
+            t0 = time.perf_counter()
+            self.late_ms.append(1000 * max(0.0, loop.time() - deadline))
+            self.tick(deadline - start)
+            self.tick_ms.append(1000 * (time.perf_counter() - t0))
+
+    def tick(self, now):
+        tick = self.ticks & 0xFFFFFFFF
+        for session in self.sessions.values():
+            session.step(now, tick)
+        self.ticks += 1
+
+    # ---------------- STATS ----------------
+    def stats(self):
+        ticks = np.array(self.tick_ms) if self.tick_ms else np.zeros(1)
+        late = np.array(self.late_ms) if self.late_ms else np.zeros(1)
+        skipped = self.skipped + sum(s.skipped for s in self.sessions.values())
+        return (
+            len(self.sessions), self.ticks & 0xFFFFFFFF, skipped,
+            ticks.mean(), np.percentile(ticks, 50), np.percentile(ticks, 99), ticks.max(),
+            np.percentile(late, 99),
+        )
+
+    def report(self):
+        sessions, ticks, skipped, mean, p50, p99, worst, late = self.stats()
+        return (
+            f"{sessions} sessions | tick {mean:.2f} ms mean, p50 {p50:.2f} p99 {p99:.2f} max {worst:.2f} | "
+            f"late p99 {late:.2f} ms | skipped {skipped}"
+        )
+
+
+async def serve(server, host="127.0.0.1", port=8765, unix=None, report_every=0):
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, unix)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+    ticker = asyncio.create_task(server.run())
+    try:
+        async with listener:
+            while True:
+                await asyncio.sleep(report_every or 3600)
+                if report_every:
+                    print(server.report(), flush=True)
+    finally:
+        ticker.cancel()
+
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a unix socket instead of TCP")
+    parser.add_argument("--hz", type=float, default=TICK_HZ, help="ticks per second")
+    parser.add_argument("--filter", default="none", help="motion filter for LANDMARKS input")
+    parser.add_argument("--report", type=float, default=5.0, help="seconds between stats lines (0: off)")
+    args = parser.parse_args()
+
+    server = GameServer(args.hz, motion_filter=args.filter)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix, args.report))
+    except KeyboardInterrupt:
+        pass
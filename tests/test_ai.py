@@ -0,0 +1,57 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from engine.ai import AIOpponent
+from engine.state import GameState
+
+
+def hit(ai, seed, shot="SMASH"):
+    game = GameState(verbose=False, rng=random.Random(seed), ai=ai)
+    game.start_player_hit(0.0, shot)
+    return game
+
+
+@pytest.mark.parametrize("shot", ["SMASH", "CLEAR", "DROP", "NORMAL"])
+def test_exact_read_predicts_the_real_landing(shot):
+    ai = AIOpponent(read_error=0)
+    game = hit(ai, 3, shot)
+    assert ai.predicted_x == pytest.approx(game.to_ai_x, abs=1e-6)
+    assert ai.predicted_time == pytest.approx(game.duration, abs=1e-6)
+
+
+def test_read_error_moves_the_prediction_not_the_shuttle():
+    errors = []
+    for seed in range(200):
+        ai = AIOpponent(read_error=0.06)
+        game = hit(ai, seed)
+        assert ai.landing_x == game.to_ai_x
+        errors.append(abs(ai.predicted_x - game.to_ai_x))
+    assert 0 < sum(errors) / len(errors) < 0.5
+    assert max(errors) > 0.05
+
+
+def test_run_is_speed_limited():
+    ai = AIOpponent(read_error=0, speed=1.0, reaction=0.0)
+    game = hit(ai, 0)
+    assert abs(ai.x1 - ai.x0) <= 1.0 * game.duration + 1e-9
+
+
+class MaxError:
+    # rng whose every draw is the top of its range
+    def uniform(self, a, b):
+        return b
+
+
+def test_reach_is_judged_at_the_real_landing():
+    # The read overestimates the launch by 30%, so the run is paced for a
+    # late landing and the AI is still far away when the shuttle really
+    # comes down, even though its run ends within reach
+    ai = AIOpponent(speed=5.0, reaction=0.12, reach=0.8, read_error=0.3)
+    game = SimpleNamespace(player_x=5.0, to_ai_x=5.0, ai_x=1.0, duration=0.65, rng=MaxError())
+    ai.plan(game, 0.0)
+    assert ai.predicted_time > ai.intercept_time + 0.1
+    assert abs(ai.x1 - ai.landing_x) <= ai.reach
+    assert abs(ai.position(ai.intercept_time) - ai.landing_x) > ai.reach
+    assert not ai.reachable
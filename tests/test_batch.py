@@ -0,0 +1,11 @@
+from engine.batch import check, run_batch
+
+
+def test_batch_matches_scalar_game_state():
+    assert check(16, ticks=900) == 0
+
+
+def test_run_batch_reaches_the_exchange_count():
+    game, ticks = run_batch(32, exchanges=2)
+    assert (game.won + game.lost).min() >= 2
+    assert ticks > 0
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from runtime.buffers import FramePool
+from runtime.pipeline import LatestQueue, Pipeline
+
+
+def test_released_buffer_is_reused():
+    pool = FramePool()
+    a = pool.acquire((48, 64, 3))
+    pool.release(a)
+    b = pool.acquire((48, 64, 3))
+    assert np.shares_memory(a, b)
+    assert pool.allocated == 1 and pool.in_use == 1
+
+
+def test_held_buffer_is_not_handed_out_twice():
+    pool = FramePool()
+    a = pool.acquire((48, 64, 3))
+    b = pool.acquire((48, 64, 3))
+    assert not np.shares_memory(a, b)
+    assert pool.allocated == 2
+
+
+def test_smaller_frame_reuses_larger_buffer():
+    pool = FramePool()
+    pool.release(pool.acquire((48, 64, 3)))
+    small = pool.acquire((10, 10), np.float32)
+    assert small.shape == (10, 10) and small.dtype == np.float32
+    assert pool.allocated == 1
+
+
+def test_frame_returns_after_every_holder_released():
+    pool = FramePool()
+    a = pool.acquire((8, 8, 3), holders=2)
+    pool.release(a)
+    assert not np.shares_memory(pool.acquire((8, 8, 3)), a)
+    pool.release(a)
+    assert np.shares_memory(pool.acquire((8, 8, 3)), a)
+
+
+def test_exhausted_pool_overflows_without_growing():
+    pool = FramePool(limit=2)
+    held = [pool.acquire((8, 8, 3)) for _ in range(2)]
+    extra = pool.acquire((8, 8, 3))
+    assert pool.pooled == 2 and pool.overflow == 1
+
+    # An overflow frame is released like any other but never pooled
+    pool.release(extra)
+    pool.release(held[0])
+    assert np.shares_memory(pool.acquire((8, 8, 3)), held[0])
+    assert pool.pooled == 2
+
+
+def test_size_change_replaces_free_buffer_at_limit():
+    pool = FramePool(limit=1)
+    pool.release(pool.acquire((8, 8, 3)))
+    big = pool.acquire((16, 16, 3))
+    assert pool.pooled == 1 and pool.overflow == 0
+    pool.release(big)
+    assert np.shares_memory(pool.acquire((16, 16, 3)), big)
+
+
+def test_release_errors():
+    pool = FramePool()
+    a = pool.acquire((8, 8, 3))
+    pool.release(a)
+    with pytest.raises(ValueError):
+        pool.release(a)
+    with pytest.raises(ValueError):
+        pool.release(np.zeros((8, 8, 3), np.uint8))
+
+
+def test_latest_queue_releases_dropped_frames():
+    pool = FramePool()
+    q = LatestQueue(1, pool.release)
+    first = pool.acquire((8, 8, 3))
+    q.put(first)
+    q.put(pool.acquire((8, 8, 3)))
+    assert q.dropped == 1 and pool.in_use == 1
+
+
+def test_pipeline_returns_every_frame_to_the_pool():
+    pool = FramePool(limit=8)
+    left = [50]
+
+    def read_frame():
+        if not left[0]:
+            return None
+        left[0] -= 1
+        return pool.acquire((8, 8, 3), holders=2)
+
+    Pipeline(read_frame, lambda frame: None, lambda frame, hand, now: None,
+             report_every=0, release=pool.release).run()
+    assert pool.in_use == 0
+    assert pool.overflow == 0
@@ -0,0 +1,55 @@
+from collections import deque
+
+import pytest
+
+from runtime.cameras import TRACK_FRAMES, CameraFusion, CameraResult, CameraWorker
+from vision.landmarks import HandFeatures
+
+
+def worker(weight=1.0):
+    return CameraWorker("test", None, None, weight=weight)
+
+
+def result(w, seq, data, stroke=None, t=0.0):
+    r = CameraResult(seq, t, data, stroke, HandFeatures(), w._weight(data))
+    w.history.append(r)
+    return r
+
+
+def test_weight_grows_with_tracking_and_drops_on_loss():
+    w = worker(2.0)
+    weights = [w._weight((0.5, 0.5, 0.0, 0.0)) for _ in range(TRACK_FRAMES + 1)]
+    assert weights[0] == pytest.approx(2.0 / TRACK_FRAMES)
+    assert weights[-2:] == [2.0, 2.0]
+    assert w._weight((None, None, None, None)) == 0.0
+    assert w._weight((0.5, 0.5, 0.0, 0.0)) == pytest.approx(2.0 / TRACK_FRAMES)
+
+
+def test_fusion_weights_cameras_by_their_results():
+    tracked, fresh = worker(), worker()
+    for seq in range(TRACK_FRAMES):
+        result(tracked, seq, (0.2, 0.4, 0.01, 0.0), t=(seq + 1 - TRACK_FRAMES) * 0.01)
+    result(fresh, 0, (0.8, 0.4, 0.03, 0.0))
+
+    cx, cy, dx, dy = CameraFusion([tracked, fresh]).get_hand_data(None, 0)
+    # Full weight against a third of one
+    assert cx == pytest.approx((0.2 * 3 + 0.8) / 4)
+    assert cy == pytest.approx(0.4)
+    assert dx == pytest.approx((0.01 * 3 + 0.03) / 4)
+
+
+def test_zero_weight_camera_is_ignored():
+    seen, ignored = worker(), worker(0.0)
+    result(seen, 0, (0.3, 0.5, 0.0, 0.0))
+    result(ignored, 0, (0.9, 0.5, 0.0, 0.0), stroke=(0.0, 0.2))
+
+    fusion = CameraFusion([seen, ignored])
+    assert fusion.get_hand_data(None, 0)[0] == pytest.approx(0.3)
+    assert fusion.stroke_delta is None
+
+
+def test_no_hand_anywhere():
+    a, b = worker(), worker()
+    result(a, 0, (None, None, None, None))
+    b.history = deque()
+    assert CameraFusion([a, b]).get_hand_data(None, 0) == (None, None, None, None)
@@ -0,0 +1,33 @@
+from runtime.events import HIT, RALLY_WON, EventBus
+
+
+class Failing:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, events):
+        self.calls += 1
+        raise RuntimeError("sink down")
+
+    def close(self):
+        raise OSError("close failed")
+
+
+def test_failing_subscriber_does_not_stop_the_bus(capsys):
+    bus = EventBus()
+    bad = bus.subscribe(Failing())
+    received = []
+    bus.subscribe(received.extend)
+
+    bus.start(0.001)
+    bus.emit(HIT, 1.0, "SMASH")
+    bus.close()
+    bus.emit(RALLY_WON, 2.0)
+    bus._dispatch(bus.drain())
+
+    assert [e[0] for e in received] == [HIT, RALLY_WON]
+    assert bad.calls == 2
+    assert bus.errors == 3          # two batches and close()
+    err = capsys.readouterr().err
+    assert err.count("failed (further errors only counted)") == 1
+    assert "sink down" in err
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+from vision.landmarks import NUM_LANDMARKS
+from vision.multi_hand import PlayerSlots, assign
+
+
+def tracked_slots():
+    slots = PlayerSlots(2)
+    slots[0].last = (0.25, 0.5)
+    slots[1].last = (0.75, 0.5)
+    return slots.slots
+
+
+def test_assign_keeps_tracked_match_whatever_the_detection_order():
+    # The far detection is out of every slot's reach; the near one must
+    # still go to the left player, whichever index it has
+    near, far = (0.26, 0.5), (0.5, 0.05)
+    assert assign(tracked_slots(), [far, near]) == [1, None]
+    assert assign(tracked_slots(), [near, far]) == [0, None]
+
+
+def test_assign_matches_both_tracked_hands():
+    assert assign(tracked_slots(), [(0.7, 0.5), (0.3, 0.5)]) == [1, 0]
+
+
+def test_assign_nothing_in_reach():
+    assert assign(tracked_slots(), [(0.5, 0.0)]) == [None, None]
+    assert assign(tracked_slots(), []) == [None, None]
+
+
+def test_assign_new_hands_go_to_their_home_side():
+    slots = PlayerSlots(2).slots
+    assert assign(slots, [(0.8, 0.5), (0.2, 0.5)]) == [1, 0]
+    assert assign(slots, [(0.8, 0.5)]) == [None, 0]
+
+
+def test_new_hand_does_not_steal_a_tracked_slot():
+    slots = PlayerSlots(2).slots
+    slots[0].last = (0.3, 0.5)
+    # Both detections are on player 1's side: player 1 keeps the one it
+    # was following, player 2 gets the other
+    assert assign(slots, [(0.45, 0.5), (0.25, 0.5)]) == [1, 0]
+
+
+def fake_hand(x, y):
+    return [SimpleNamespace(x=x, y=y, z=0.0) for _ in range(NUM_LANDMARKS)]
+
+
+def test_update_follows_hands_and_maps_crops():
+    slots = PlayerSlots(2)
+    # Player 2's hand comes from a crop of the right half of a 640x480 frame
+    slots.update([(fake_hand(0.5, 0.5), None, (320, 0, 640, 480, 640, 480)),
+                  (fake_hand(0.25, 0.5), None, None)], 0)
+    assert slots[0].last == pytest.approx((0.25, 0.5))
+    assert slots[1].last == pytest.approx((0.75, 0.5))
+    assert slots[1].features.centroid[0] == pytest.approx(0.75)
+
+    slots.update([(fake_hand(0.3, 0.5), None, None)], 33)
+    assert slots[0].data[0] == pytest.approx(0.6)
+    assert slots[1].missed == 1 and slots[1].data == (None, None, None, None)
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from runtime.pipeline import Pipeline
+
+
+def frames(n, delay=0.0):
+    left = list(range(n))
+
+    def read_frame():
+        time.sleep(delay)
+        return left.pop(0) if left else None
+    return read_frame
+
+
+def test_recorded_source_renders_its_last_frame():
+    rendered = []
+
+    def render(frame, hand, now):
+        time.sleep(0.002)
+        rendered.append(frame)
+
+    Pipeline(frames(30), lambda frame: frame, render, report_every=0).run()
+    assert rendered[-1] == 29
+    assert rendered == sorted(rendered)
+
+
+def test_render_can_stop_the_pipeline():
+    rendered = []
+
+    def render(frame, hand, now):
+        rendered.append(frame)
+        return len(rendered) < 5
+
+    Pipeline(frames(10 ** 6), lambda frame: frame, render, report_every=0).run()
+    assert len(rendered) == 5
+
+
+def test_infer_failure_is_raised_from_run():
+    def infer(frame):
+        if frame == 3:
+            raise RuntimeError("detector crashed")
+        return frame
+
+    pipeline = Pipeline(frames(10 ** 6, 0.001), infer, lambda frame, hand, now: None,
+                        report_every=0)
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="detector crashed"):
+        pipeline.run()
+    assert time.perf_counter() - start < 2.0
+    assert [stage for stage, _ in pipeline.failures] == ["hand"]
+
+
+def test_capture_failure_is_raised_from_run():
+    def read_frame():
+        raise OSError("camera unplugged")
+
+    with pytest.raises(OSError, match="camera unplugged"):
+        Pipeline(read_frame, lambda frame: frame, lambda frame, hand, now: None,
+                 report_every=0).run()
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from engine.replay import INDEX_MAGIC, TRAILER, ReplayReader, ReplayRecorder
+from engine.sim import ScriptedPlayer, Simulator
+from runtime.events import HIT, STATE
+
+
+def record(path, ticks=1200, key_interval=60):
+    sim = Simulator(ScriptedPlayer(seed=2), seed=2)
+    recorder = ReplayRecorder(path, key_interval)
+    rallies = []
+    for _ in range(ticks):
+        now = sim.clock.now
+        sim.step()
+        if len(rallies) % 100 == 99:
+            recorder([(HIT, now, "SMASH", None), (STATE, now, "IDLE", "TO_AI")])
+        recorder.record(sim.game, now)
+        rallies.append(sim.game.rally_count)
+    return recorder, rallies
+
+
+def test_seek_by_time_and_exchange(tmp_path):
+    path = tmp_path / "match.rpl"
+    recorder, rallies = record(path)
+    recorder.close()
+
+    reader = ReplayReader(path)
+    try:
+        assert len(reader) == 1200 // 60
+        ticks = list(reader.ticks())
+        assert [s.tick for s, _ in ticks] == list(range(1200))
+        # Events come out with the tick they were written before
+        assert [s.tick for s, events in ticks if events] == list(range(99, 1200, 100))
+        assert ticks[99][1] == [(HIT, ticks[99][0].t, "SMASH", None), (STATE, ticks[99][0].t, "IDLE", "TO_AI")]
+
+        first, _ = next(reader.ticks(t=7.5))
+        assert first.t >= 7.5 and first.t - 7.5 < 1 / 60
+
+        target = rallies[-1] // 2
+        first, _ = next(reader.ticks(rally=target))
+        assert first.rally_count == target
+        assert rallies.index(target) == first.tick
+    finally:
+        reader.close()
+
+
+def test_torn_file_is_rescanned(tmp_path):
+    path = tmp_path / "match.rpl"
+    recorder, _ = record(path)
+    recorder.close()
+
+    # Cut off the index and trailer and half of the last entry, as if the
+    # recording had died mid-write
+    reader = ReplayReader(path)
+    end = reader.end
+    reader.close()
+    with open(path, "r+b") as f:
+        f.truncate(end - 3)
+    with open(path, "rb") as f:
+        f.seek(-TRAILER.size, os.SEEK_END)
+        assert INDEX_MAGIC not in f.read()
+
+    reader = ReplayReader(path)
+    try:
+        assert reader.end < end - 3
+        assert len(reader) == 1200 // 60
+        ticks = [s.tick for s, _ in reader.ticks()]
+        assert ticks == list(range(len(ticks)))
+        assert len(ticks) == 1199         # all but the torn one
+        assert reader.seek_time(reader.duration) == int(reader.index["offset"][-1])
+    finally:
+        reader.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.rpl"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        ReplayReader(path)
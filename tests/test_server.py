@@ -0,0 +1,90 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from engine.snapshot import KEY, RECORD, SnapshotDecoder, capture
+from runtime.server import LANDMARKS, SNAPSHOT, SNAPSHOT_HEADER, SEND_LIMIT, Session, encode, read_message
+from vision.landmarks import LEFT, NUM_LANDMARKS, RIGHT
+
+
+class FakeTransport:
+    def __init__(self):
+        self.buffered = 0
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+
+class FakeWriter:
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.messages = []
+
+    def write(self, data):
+        self.messages.append(data)
+
+
+def entries(writer):
+    for message in writer.messages:
+        kind, size = SNAPSHOT_HEADER.unpack_from(message)
+        assert kind == SNAPSHOT and len(message) == SNAPSHOT_HEADER.size + size
+        yield message[SNAPSHOT_HEADER.size:]
+
+
+def test_snapshots_decode_to_the_game_state():
+    writer = FakeWriter()
+    session = Session(1, writer)
+    decoder = SnapshotDecoder()
+    for tick in range(300):
+        now = tick / 60
+        if tick % 90 == 10:
+            session.on_input(0.5, 0.5, 0.0, 0.12, 0.0, 0.12)
+        else:
+            session.on_input(0.5, 0.5, 0.0, 0.0, float("nan"), float("nan"))
+        session.step(now, tick)
+
+        entry = list(entries(writer))[-1]
+        values, end = decoder.decode(entry)
+        assert end == len(entry)
+        assert values == RECORD.unpack(RECORD.pack(*capture(session.game, tick, now)))
+    assert session.game.rally_count > 0
+
+
+def test_skipped_send_restarts_with_a_keyframe():
+    writer = FakeWriter()
+    session = Session(1, writer)
+    session.step(0.0, 0)
+    session.step(1 / 60, 1)
+    writer.transport.buffered = SEND_LIMIT + 1
+    session.step(2 / 60, 2)
+    writer.transport.buffered = 0
+    session.step(3 / 60, 3)
+
+    kinds = [entry[0] for entry in entries(writer)]
+    assert len(kinds) == 3 and session.skipped == 1
+    assert kinds[0] == KEY and kinds[1] != KEY and kinds[2] == KEY
+
+
+def decode(message):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(message)
+        reader.feed_eof()
+        return await read_message(reader)
+    return asyncio.run(read())
+
+
+@pytest.mark.parametrize("handedness", [LEFT, RIGHT])
+def test_landmarks_round_trip(handedness):
+    points = np.linspace(0.0, 1.0, NUM_LANDMARKS * 3, dtype=np.float32)
+    kind, values = decode(encode(LANDMARKS, 1.5, 1, handedness, 0.875, *points))
+    assert kind == LANDMARKS
+    assert values[:4] == (1.5, 1, handedness, 0.875)
+    assert np.array(values[4:], np.float32) == pytest.approx(points)
+
+    session = Session(1, FakeWriter())
+    session.on_landmarks(values)
+    features = session.hand.features
+    assert features.handedness == handedness and features.score == 0.875
+    assert features.points.reshape(-1) == pytest.approx(points)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from engine import shots
+from engine.shots import classify_shot
+from vision.filters import REFERENCE_DT
+from vision.landmarks import NUM_LANDMARKS, HandFeatures
+
+from bench.filter_rates import hand_template
+
+
+@pytest.fixture
+def landmark_rules(monkeypatch):
+    monkeypatch.setattr(shots, "LANDMARK_RULES", True)
+
+
+def moving_hand(step, fps, tilt=0.0):
+    # Two timed detections of a hand moving by `step` per REFERENCE_DT
+    features = HandFeatures()
+    points = hand_template(tilt) + np.float32(0.5)
+    features.load(points, t=0.0)
+    points[:, 1] += step / REFERENCE_DT / fps
+    features.load(points, t=1.0 / fps)
+    return features
+
+
+def test_base_rules():
+    assert classify_shot(0.0, 0.12) == "SMASH"
+    assert classify_shot(0.0, -0.12) == "CLEAR"
+    assert classify_shot(0.05, 0.0) == "DROP"
+    assert classify_shot(0.005, 0.005) is None
+
+
+def test_landmark_rules_are_opt_in():
+    features = moving_hand(0.2, 30)
+    assert classify_shot(0.01, 0.05, features) == "DROP"
+
+
+@pytest.mark.parametrize("fps", [15, 30, 60, 90])
+def test_tip_rule_does_not_depend_on_frame_rate(landmark_rules, fps):
+    # dy below the base SMASH rule; the fingertips carry it at any rate
+    assert classify_shot(0.01, 0.05, moving_hand(0.2, fps)) == "SMASH"
+    assert classify_shot(0.01, 0.05, moving_hand(0.05, fps)) == "DROP"
+
+
+def test_palm_angle_clear(landmark_rules):
+    assert classify_shot(0.0, -0.05, moving_hand(-0.05, 30, tilt=0.8)) == "CLEAR"
+    assert classify_shot(0.0, -0.05, moving_hand(-0.05, 30)) == "DROP"
+
+
+def test_untimed_features_are_ignored(landmark_rules):
+    features = HandFeatures()
+    points = np.zeros((NUM_LANDMARKS, 3), np.float32)
+    features.load(points)
+    points[:, 1] += 0.5
+    features.load(points)
+    assert features.has_prev and not features.timed
+    assert classify_shot(0.01, 0.05, features) == "DROP"
@@ -0,0 +1,21 @@
+import random
+
+from engine.sim import ScriptedPlayer, Simulator, summarize
+
+
+def run(seed):
+    return Simulator(ScriptedPlayer(seed=seed), seed=seed).run(exchanges=20)
+
+
+def test_same_seed_same_outcomes():
+    assert run(4) == run(4)
+    assert run(4) != run(5)
+
+
+def test_global_random_is_left_alone():
+    random.seed(11)
+    expected = [random.random() for _ in range(3)]
+
+    random.seed(11)
+    assert summarize(run(4))["exchanges"] == 20
+    assert [random.random() for _ in range(3)] == expected
@@ -0,0 +1,81 @@
+import pytest
+
+from engine.snapshot import (DELTA, FIELD_NAMES, KEY, RECORD, Snapshot, SnapshotDecoder,
+                             SnapshotEncoder, capture, records)
+from engine.sim import ScriptedPlayer, Simulator
+
+
+def game_ticks(n):
+    # capture() tuples of n ticks of a simulated rally
+    sim = Simulator(ScriptedPlayer(seed=3), seed=3)
+    out = []
+    for tick in range(n):
+        now = sim.clock.now
+        sim.step()
+        out.append(capture(sim.game, tick, now))
+    return out
+
+
+def test_stream_round_trip():
+    ticks = game_ticks(300)
+    encoder = SnapshotEncoder(key_interval=50)
+    entries = [encoder.encode(values) for values in ticks]
+    assert [i for i, e in enumerate(entries) if e[0] == KEY] == list(range(0, 300, 50))
+    assert all(e[0] == DELTA for i, e in enumerate(entries) if i % 50)
+
+    stream = b"".join(entries)
+    assert len(stream) < len(ticks) * RECORD.size / 2
+    decoded = [values for values, _ in SnapshotDecoder(stream).entries()]
+    # Floats come back as stored, i.e. rounded to float32
+    assert decoded == [RECORD.unpack(RECORD.pack(*values)) for values in ticks]
+
+
+def test_decoding_can_start_at_any_key():
+    encoder = SnapshotEncoder(key_interval=10)
+    ticks = game_ticks(40)
+    entries = [encoder.encode(values) for values in ticks]
+    start = sum(len(e) for e in entries[:20])
+    decoded = list(SnapshotDecoder(b"".join(entries)).entries(start))
+    assert len(decoded) == 20
+    assert decoded[0][0][0] == 20
+
+
+def test_delta_without_key_is_rejected():
+    encoder = SnapshotEncoder()
+    ticks = game_ticks(2)
+    encoder.encode(ticks[0])
+    with pytest.raises(ValueError):
+        SnapshotDecoder().decode(encoder.encode(ticks[1]))
+
+
+def test_reset_forces_a_key():
+    encoder = SnapshotEncoder()
+    ticks = game_ticks(3)
+    encoder.encode(ticks[0])
+    assert encoder.encode(ticks[1])[0] == DELTA
+    encoder.reset()
+    assert encoder.encode(ticks[2])[0] == KEY
+
+
+def test_records_view_packed_snapshots():
+    ticks = game_ticks(5)
+    buffer = b"".join(Snapshot(values).pack() for values in ticks)
+    array = records(buffer)
+    assert len(array) == 5
+    assert list(array["tick"]) == [0, 1, 2, 3, 4]
+    assert array["state"][4] == ticks[4][FIELD_NAMES.index("state")]
+
+
+def test_restore_puts_the_game_back():
+    sim = Simulator(ScriptedPlayer(seed=5), seed=5)
+    for _ in range(90):
+        sim.step()
+    saved = Snapshot.of(sim.game, 90, sim.clock.now)
+    expected = capture(sim.game, 90, sim.clock.now)
+
+    for _ in range(45):
+        sim.step()
+    assert capture(sim.game, 90, saved.t) != expected
+
+    assert saved.restore(sim.game) == saved.t
+    assert Snapshot.of(sim.game, 90, saved.t).pack() == saved.pack()
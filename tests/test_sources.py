@@ -0,0 +1,47 @@
+import cv2
+import numpy as np
+import pytest
+
+from vision.sources import VideoFileSource
+
+
+def write_video(path, count=10, fps=20.0):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (32, 24))
+    for i in range(count):
+        writer.write(np.full((24, 32, 3), i * 20, np.uint8))
+    writer.release()
+    return str(path)
+
+
+def read_all(source):
+    times = []
+    while True:
+        ret, _ = source.read()
+        if not ret:
+            return times
+        times.append(source.timestamp)
+
+
+def test_reads_every_frame(tmp_path):
+    source = VideoFileSource(write_video(tmp_path / "clip.avi"), realtime=False)
+    assert read_all(source) == pytest.approx(np.arange(10) / 20.0)
+
+
+def test_frame_count_is_only_a_hint(tmp_path, monkeypatch):
+    path = write_video(tmp_path / "clip.avi")
+    # Containers and streams that report no frame count
+    get = cv2.VideoCapture.get
+    monkeypatch.setattr(cv2.VideoCapture, "get",
+                        lambda cap, prop: 0.0 if prop == cv2.CAP_PROP_FRAME_COUNT else get(cap, prop))
+    source = VideoFileSource(path, realtime=False)
+    assert len(source) == 0
+    assert read_all(source) == pytest.approx(np.arange(10) / 20.0)
+
+
+def test_recorded_timestamps_run_out(tmp_path):
+    path = write_video(tmp_path / "clip.avi")
+    source = VideoFileSource(path, realtime=False, timestamps=np.array([0.0, 0.04, 0.1]))
+    times = read_all(source)
+    assert len(times) == 10
+    assert times[:3] == [0.0, 0.04, 0.1]
+    assert times[3:] == pytest.approx(0.1 + np.arange(1, 8) / 20.0)
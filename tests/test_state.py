@@ -0,0 +1,24 @@
+from engine.controls import CONSTANTS
+from engine.state import GameState
+
+
+def test_new_constants_dict_is_picked_up_by_update():
+    game = GameState(verbose=False, constants=dict(CONSTANTS))
+    faster = dict(CONSTANTS, SHUTTLE_TIME=CONSTANTS["SHUTTLE_TIME"] / 2)
+    game.update(0.0, faster)
+    assert game.rules.constants is faster
+    assert game.duration == faster["SHUTTLE_TIME"]
+
+
+def test_in_place_edit_needs_reload_rules():
+    constants = dict(CONSTANTS)
+    game = GameState(verbose=False, constants=constants)
+    before = game.duration
+
+    constants["SHUTTLE_TIME"] = before * 2
+    game.update(0.0, constants)
+    assert game.duration == before      # same dict: not re-resolved
+
+    game.reload_rules()
+    assert game.duration == before * 2
+    assert game.rules.shot("SMASH").time == before * 2
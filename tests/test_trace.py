@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from vision.landmarks import NUM_LANDMARKS, RIGHT, HandFeatures
+from vision.trace import ABSENT, CHUNK, PRESENT, STALE, TraceTracker, TraceWriter, load_trace
+from vision.tracker_base import TrackerBase
+
+
+def features(x):
+    f = HandFeatures()
+    points = np.zeros((NUM_LANDMARKS, 3), np.float32)
+    points[:, 0] = x
+    points[:, 1] = 0.5
+    f.load(points, RIGHT, 0.9)
+    return f
+
+
+def test_rows_reach_the_file_before_close(tmp_path):
+    path = tmp_path / "session.npy"
+    writer = TraceWriter(path)
+    for i in range(CHUNK + 10):
+        writer.append(i / 60, features(0.5))
+
+    # As if the process died here: every full chunk is readable
+    records = load_trace(str(path), mmap=False)
+    assert len(records) == CHUNK
+    assert records["t"][-1] == pytest.approx((CHUNK - 1) / 60)
+
+    writer.close()
+    records = load_trace(str(path))
+    assert len(records) == len(writer) == CHUNK + 10
+    assert (records["present"] == PRESENT).all()
+
+
+def test_suffix_is_added_like_np_save(tmp_path):
+    writer = TraceWriter(tmp_path / "session")
+    writer.close()
+    assert len(load_trace(str(tmp_path / "session.npy"))) == 0
+
+
+def test_stale_frames_keep_the_trace_in_step(tmp_path):
+    path = tmp_path / "session.npy"
+    writer = TraceWriter(path)
+    writer.append(0.0, features(0.4))
+    writer.append_stale(1 / 60)
+    writer.append(2 / 60, None)
+    writer.close()
+
+    records = load_trace(str(path))
+    assert list(records["present"]) == [PRESENT, STALE, ABSENT]
+
+    tracker = TraceTracker(records)
+    cx, cy, _, _ = tracker.get_hand_data()
+    assert cx == pytest.approx(0.4)
+    # A stale row keeps the last position without a motion sample
+    assert tracker.get_hand_data() == (cx, cy, None, None)
+    assert tracker.stroke_delta is None and tracker.timestamp == pytest.approx(1 / 60)
+    assert tracker.get_hand_data() == (None, None, None, None)
+    assert tracker.done
+
+
+def test_tracker_records_stale_frames(tmp_path):
+    path = tmp_path / "session.npy"
+    tracker = TrackerBase(trace=TraceWriter(path))
+    tracker.features = features(0.5)
+    tracker._found(0.0)
+    tracker._stale(16.0)
+    tracker._stale()            # no frame behind it (e.g. playback past the end)
+    tracker._lost(33.0)
+    tracker.close()
+
+    records = load_trace(str(path))
+    assert list(records["present"]) == [PRESENT, STALE, ABSENT]
+    assert records["t"][1] == pytest.approx(0.016)
@@ -0,0 +1,165 @@
+import math
+
+# Shot / stroke thresholds (engine/shots.py, main.py CONSTANTS) were tuned as
+# per-frame deltas on a ~30 FPS webcam. Filters output velocity in units per
+# second; multiplying by REFERENCE_DT turns it back into the "delta at 30 FPS"
+# those thresholds expect, whatever the real frame rate is.
+REFERENCE_FPS = 30
+REFERENCE_DT = 1.0 / REFERENCE_FPS
+
+# Guards against duplicate / out-of-order timestamps
+MIN_DT = 1e-4
+MAX_DT = 0.25
+
+# Every filter keeps plain float state and exposes the last estimate as
+# x, y (position), vx, vy (units/s) and ax, ay (units/s²), plus the previous
+# velocity pvx, pvy. update(t, x, y) is O(1) and allocates no containers.
+
+# Exact first-order low-pass discretization: the same cutoff gives the same
+# smoothing at any dt, which is the point of this module.
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 - math.exp(-dt / tau)
+
+
+# ---------------- ONE EURO ----------------
+class OneEuroFilter:
+    # Casiez et al.: low cutoff when slow (kills jitter), cutoff rises with
+    # speed (keeps strokes responsive).
+    def __init__(self, min_cutoff=1.5, beta=0.5, d_cutoff=6.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.t = None
+        self.x = self.y = 0.0
+        self.raw_x = self.raw_y = 0.0
+        self.vx = self.vy = 0.0
+        self.pvx = self.pvy = 0.0
+        self.ax = self.ay = 0.0
+
+    def update(self, t, x, y):
+        if self.t is None:
+            self.t = t
+            self.x, self.y = x, y
+            self.raw_x, self.raw_y = x, y
+            self.vx = self.vy = 0.0
+            self.pvx = self.pvy = 0.0
+            self.ax = self.ay = 0.0
+            return
+
+        dt = min(max(t - self.t, MIN_DT), MAX_DT)
+        self.t = t
+
+        # -------- VELOCITY (raw derivative, low-passed) --------
+        a_d = _alpha(self.d_cutoff, dt)
+        vx = self.vx + a_d * ((x - self.raw_x) / dt - self.vx)
+        vy = self.vy + a_d * ((y - self.raw_y) / dt - self.vy)
+        self.raw_x, self.raw_y = x, y
+
+        # -------- ACCELERATION (of the already smoothed velocity) --------
+        self.ax = (vx - self.vx) / dt
+        self.ay = (vy - self.vy) / dt
+        self.pvx, self.pvy = self.vx, self.vy
+        self.vx, self.vy = vx, vy
+
+        # -------- POSITION (speed-adaptive cutoff) --------
+        speed = math.sqrt(vx * vx + vy * vy)
+        a_x = _alpha(self.min_cutoff + self.beta * speed, dt)
+        self.x += a_x * (x - self.x)
+        self.y += a_x * (y - self.y)
+
+
+# ---------------- CONSTANT-VELOCITY KALMAN ----------------
+class KalmanFilter:
+    # Independent [position, velocity] Kalman filter per axis with a white
+    # acceleration process model. The 2x2 covariance is kept as three
+    # floats per axis (p00, p01, p11), so predict/correct are scalar math.
+    def __init__(self, accel_noise=40.0, measure_noise=0.004):
+        self.q = accel_noise ** 2
+        self.r = measure_noise ** 2
+        self.reset()
+
+    def reset(self):
+        self.t = None
+        self.x = self.y = 0.0
+        self.vx = self.vy = 0.0
+        self.pvx = self.pvy = 0.0
+        self.ax = self.ay = 0.0
+        self.px = [0.0, 0.0, 0.0]
+        self.py = [0.0, 0.0, 0.0]
+
+    def _step(self, pos, vel, p, z, dt):
+        # -------- PREDICT --------
+        pos += vel * dt
+        q = self.q
+        dt2 = dt * dt
+        p00 = p[0] + dt * (2 * p[1] + dt * p[2]) + q * dt2 * dt2 / 4
+        p01 = p[1] + dt * p[2] + q * dt2 * dt / 2
+        p11 = p[2] + q * dt2
+
+        # -------- CORRECT --------
+        s = p00 + self.r
+        k0 = p00 / s
+        k1 = p01 / s
+        err = z - pos
+        pos += k0 * err
+        vel += k1 * err
+
+        p[0] = (1 - k0) * p00
+        p[1] = (1 - k0) * p01
+        p[2] = p11 - k1 * p01
+        return pos, vel
+
+    def update(self, t, x, y):
+        if self.t is None:
+            self.t = t
+            self.x, self.y = x, y
+            self.vx = self.vy = 0.0
+            self.pvx = self.pvy = 0.0
+            self.ax = self.ay = 0.0
+            self.px[0] = self.py[0] = self.r
+            self.px[1] = self.py[1] = 0.0
+            self.px[2] = self.py[2] = 1.0
+            return
+
+        dt = min(max(t - self.t, MIN_DT), MAX_DT)
+        self.t = t
+
+        self.pvx, self.pvy = self.vx, self.vy
+        self.x, self.vx = self._step(self.x, self.vx, self.px, x, dt)
+        self.y, self.vy = self._step(self.y, self.vy, self.py, y, dt)
+
+        # Acceleration is not part of the CV state; differentiate the
+        # (already filtered) velocity estimate
+        self.ax = (self.vx - self.pvx) / dt
+        self.ay = (self.vy - self.pvy) / dt
+
+
+# ---------------- STROKE PEAK ----------------
+# Thresholding the first frame that crosses MOVE_THRESHOLD classifies a
+# stroke on its rising edge, which is frame-rate dependent. Instead a stroke
+# is reported once, on the sample where speed stops growing, with the
+# velocity of the peak sample (as a REFERENCE_DT delta).
+def peak_delta(f):
+    speed2 = f.vx * f.vx + f.vy * f.vy
+    prev2 = f.pvx * f.pvx + f.pvy * f.pvy
+    if speed2 >= prev2:
+        return None
+    return f.pvx * REFERENCE_DT, f.pvy * REFERENCE_DT
+
+
+# ---------------- REGISTRY ----------------
+FILTERS = {
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+def make_filter(name, **kwargs):
+    if name is None or name == "none":
+        return None
+    if name not in FILTERS:
+        raise ValueError(f"Unknown motion filter: {name}")
+    return FILTERS[name](**kwargs)
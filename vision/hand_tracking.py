@@ -1,41 +1,252 @@
+import threading
+import time
+
 import cv2
 import mediapipe as mp
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 
-class HandTracker:
-    def __init__(self):
+from runtime.buffers import FramePool
+from runtime.profiler import PROFILER
+from vision.multi_hand import PlayerSlots
+from vision.tracker_base import TrackerBase
+
+# IMAGE:       blocking detect() per frame, full palm detection every time
+# VIDEO:       blocking detect_for_video(), reuses landmark tracking between frames
+# LIVE_STREAM: detect_async() with a result callback, get_hand_data never blocks
+RUNNING_MODES = {
+    "IMAGE": vision.RunningMode.IMAGE,
+    "VIDEO": vision.RunningMode.VIDEO,
+    "LIVE_STREAM": vision.RunningMode.LIVE_STREAM,
+}
+
+# ---------------- ROI ----------------
+ROI_MARGIN = 0.4      # extra space around the hand box, as a fraction of its size
+ROI_SIZE = 256        # longest side of the downscaled crop fed to MediaPipe
+ROI_MIN_PX = 64       # never crop tighter than this many source pixels
+
+# ---------------- LIVE TRACKER ----------------
+class HandTracker(TrackerBase):
+    def __init__(self, running_mode="IMAGE", roi=False, roi_margin=ROI_MARGIN,
+                 roi_size=ROI_SIZE, full_size=None, motion_filter=None, trace=None, num_hands=1):
+        super().__init__(motion_filter, trace)
+        self.running_mode = running_mode.upper()
+        if self.running_mode not in RUNNING_MODES:
+            raise ValueError(f"Unknown running mode: {running_mode}")
+        # VIDEO / LIVE_STREAM track across frames and need a fixed framing
+        if roi and self.running_mode != "IMAGE":
+            raise ValueError(f"roi needs the IMAGE running mode, not {self.running_mode}")
+
         base_options = python.BaseOptions(
             model_asset_path="models/hand_landmarker.task"
         )
         options = vision.HandLandmarkerOptions(
             base_options=base_options,
-            num_hands=1
+            running_mode=RUNNING_MODES[self.running_mode],
+            num_hands=num_hands,
+            result_callback=self._on_result if self.running_mode == "LIVE_STREAM" else None,
         )
         self.detector = vision.HandLandmarker.create_from_options(options)
-        self.prev_x = None
-        self.prev_y = None
 
-    def get_hand_data(self, frame):
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # MediaPipe requires strictly increasing timestamps in VIDEO / LIVE_STREAM
+        self.last_timestamp_ms = -1
+
+        # LIVE_STREAM: latest result delivered by the callback thread
+        self.lock = threading.Lock()
+        self.latest_result = None
+        self.latest_timestamp_ms = -1
+        self.consumed_timestamp_ms = -1
+
+        # ROI mode: crop + downscale around the previous hand box.
+        # full_size optionally downscales full-frame detection too.
+        self.use_roi = roi
+        self.roi_margin = roi_margin
+        self.roi_size = roi_size
+        self.full_size = full_size
+        self.roi = None
+
+        # LIVE_STREAM: crop rect each pending timestamp was run with
+        self.pending_rects = {}
+
+        # Resize / RGB outputs; mp.Image copies the pixels, so _detect
+        # releases them as soon as the image is built
+        self.buffers = FramePool(limit=4)
+
+    # ---------------- TIMESTAMPS ----------------
+    def _next_timestamp_ms(self, timestamp_ms=None):
+        if timestamp_ms is None:
+            timestamp_ms = int(time.monotonic() * 1000)
+        timestamp_ms = max(int(timestamp_ms), self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    # ---------------- LIVE_STREAM CALLBACK ----------------
+    def _on_result(self, result, output_image, timestamp_ms):
+        with self.lock:
+            if timestamp_ms > self.latest_timestamp_ms:
+                self.latest_result = result
+                self.latest_timestamp_ms = timestamp_ms
+
+    def _take_latest(self):
+        with self.lock:
+            if self.latest_timestamp_ms <= self.consumed_timestamp_ms:
+                return None
+            self.consumed_timestamp_ms = self.latest_timestamp_ms
+            return self.latest_result, self.latest_timestamp_ms
+
+    # ---------------- PREPROCESS ----------------
+    # Returns the RGB image for MediaPipe and the rect it covers:
+    # (x0, y0, x1, y1, frame_w, frame_h) in source pixels.
+    def _prepare(self, frame, use_roi=True):
+        h, w = frame.shape[:2]
+
+        if use_roi and self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            limit = self.roi_size
+        else:
+            x0, y0, x1, y1 = 0, 0, w, h
+            limit = self.full_size
+
+        # Crop is a view; resize and colour conversion write into pooled
+        # buffers. The caller releases the returned image (_detect).
+        crop = frame[y0:y1, x0:x1]
+        ch, cw = crop.shape[:2]
+        with PROFILER.stage("convert"):
+            small = None
+            if limit and max(ch, cw) > limit:
+                s = limit / max(ch, cw)
+                size = (max(1, int(cw * s)), max(1, int(ch * s)))
+                small = self.buffers.acquire((size[1], size[0], 3))
+                cv2.resize(crop, size, dst=small, interpolation=cv2.INTER_AREA)
+                crop = small
+
+            rgb = self.buffers.acquire(crop.shape)
+            cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=rgb)
+            if small is not None:
+                self.buffers.release(small)
+        return rgb, (x0, y0, x1, y1, w, h)
+
+    def _roi_around(self, bbox, w, h):
+        left, right = bbox[0] * w, bbox[2] * w
+        top, bottom = bbox[1] * h, bbox[3] * h
+
+        side = max(right - left, bottom - top) * (1 + 2 * self.roi_margin)
+        side = max(side, ROI_MIN_PX)
+        mid_x = (left + right) / 2
+        mid_y = (top + bottom) / 2
+
+        x0 = int(max(0, mid_x - side / 2))
+        y0 = int(max(0, mid_y - side / 2))
+        x1 = int(min(w, mid_x + side / 2))
+        y1 = int(min(h, mid_y + side / 2))
+
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return x0, y0, x1, y1
+
+    # ---------------- INFERENCE ----------------
+    def _detect(self, frame, timestamp_ms, use_roi=True):
+        rgb, rect = self._prepare(frame, use_roi)
         mp_image = mp.Image(
             image_format=mp.ImageFormat.SRGB,
             data=rgb
         )
-        result = self.detector.detect(mp_image)
+        self.buffers.release(rgb)
+
+        ts = self._next_timestamp_ms(timestamp_ms)
+
+        if self.running_mode == "IMAGE":
+            with PROFILER.stage("detect"):
+                return self.detector.detect(mp_image), rect, ts
+        if self.running_mode == "VIDEO":
+            with PROFILER.stage("detect"):
+                return self.detector.detect_for_video(mp_image, ts), rect, ts
+
+        self.pending_rects[ts] = rect
+        with PROFILER.stage("detect"):
+            self.detector.detect_async(mp_image, ts)
+
+        latest = self._take_latest()
+        if latest is None:
+            # No result yet: the frame's own timestamp, for the trace
+            return None, None, ts
+
+        result, result_ts = latest
+        rect = self.pending_rects.pop(result_ts, rect)
+        for old_ts in [t for t in self.pending_rects if t < result_ts]:
+            del self.pending_rects[old_ts]
+        return result, rect, result_ts
+
+    def get_hand_data(self, frame, timestamp_ms=None):
+        result, rect, ts = self._detect(frame, timestamp_ms)
 
+        # LIVE_STREAM with no new result yet
+        if result is None:
+            return self._stale(ts)
+
+        # Hand lost inside the ROI: re-detect on the full frame right away
+        # (LIVE_STREAM falls back on the next frame instead)
+        if self.roi is not None and not result.hand_landmarks:
+            self.roi = None
+            if self.running_mode != "LIVE_STREAM":
+                result, rect, ts = self._detect(frame, timestamp_ms, use_roi=False)
+
+        return self._process(result, rect, ts)
+
+    def _process(self, result, rect, timestamp_ms):
         if not result.hand_landmarks:
-            return None, None, None, None
+            self.roi = None
+            return self._lost(timestamp_ms)
+
+        # Landmarks are normalized to the crop; HandFeatures maps them back
+        # to full-frame normalized coordinates
+        handedness = result.handedness[0] if result.handedness else None
+        features = self.features.update(result.hand_landmarks[0], handedness, rect, timestamp_ms / 1000.0)
+
+        if self.use_roi:
+            self.roi = self._roi_around(features.bbox, rect[4], rect[5])
+
+        return self._found(timestamp_ms)
+
+    def close(self):
+        self.detector.close()
+        super().close()
+
+
+# ---------------- MULTI-HAND TRACKER ----------------
+# Several players in front of one camera. Every frame goes through a single
+# HandLandmarker call with num_hands=players: the image is converted once
+# and palm detection runs once per frame for everybody (VIDEO mode also
+# keeps tracking each hand between frames), so only the landmark pass is
+# paid per hand. vision.multi_hand.PlayerSlots then gives each detection a
+# stable player ID.
+#
+# get_hand_data() keeps the single-player contract for player 1;
+# self.slots[i].data / .stroke_delta / .features hold every player's input.
+# No ROI: a crop around one hand would lose the others.
+class MultiHandTracker(HandTracker):
+    def __init__(self, players=2, running_mode="VIDEO", full_size=None, motion_filter=None, trace=None):
+        super().__init__(running_mode, full_size=full_size, num_hands=players)
+        self.slots = PlayerSlots(players, motion_filter, trace)
 
-        hand = result.hand_landmarks[0]
-        cx = sum(lm.x for lm in hand) / len(hand)
-        cy = sum(lm.y for lm in hand) / len(hand)
+    def get_hand_data(self, frame, timestamp_ms=None):
+        result, rect, ts = self._detect(frame, timestamp_ms, use_roi=False)
 
-        dx = dy = 0
-        if self.prev_x is not None:
-            dx = cx - self.prev_x
-            dy = cy - self.prev_y
+        slots = self.slots
+        if result is None:
+            slots.stale(ts)
+        else:
+            handedness = result.handedness
+            slots.update([
+                (hand, handedness[i] if i < len(handedness) else None, rect)
+                for i, hand in enumerate(result.hand_landmarks)
+            ], ts)
 
-        self.prev_x, self.prev_y = cx, cy
+        first = slots[0]
+        self.features = first.features
+        self.stroke_delta = first.stroke_delta
+        return first.data
 
-        return cx, cy, dx, dy
+    def close(self):
+        self.detector.close()
+        self.slots.close()
@@ -0,0 +1,167 @@
+import math
+
+import numpy as np
+
+# ---------------- MEDIAPIPE HAND LANDMARK IDS ----------------
+WRIST = 0
+THUMB_TIP = 4
+INDEX_MCP = 5
+INDEX_TIP = 8
+MIDDLE_MCP = 9
+MIDDLE_TIP = 12
+RING_TIP = 16
+PINKY_MCP = 17
+PINKY_TIP = 20
+
+NUM_LANDMARKS = 21
+FINGERTIPS = np.array([THUMB_TIP, INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP])
+
+# Handedness codes stored alongside the landmark array
+LEFT = -1
+UNKNOWN = 0
+RIGHT = 1
+
+# ---------------- CONVERSION ----------------
+def landmarks_to_array(hand, out=None):
+    # One pass over the landmark objects into a (21, 3) float32 array;
+    # everything downstream works on the array.
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 3), np.float32)
+    out.reshape(-1)[:] = [v for lm in hand for v in (lm.x, lm.y, lm.z)]
+    return out
+
+def handedness_code(handedness):
+    # handedness: MediaPipe category list for one hand
+    if not handedness:
+        return UNKNOWN, 0.0
+    top = handedness[0]
+    code = RIGHT if top.category_name == "Right" else LEFT
+    return code, float(top.score)
+
+
+# ---------------- FEATURES ----------------
+class HandFeatures:
+    # All buffers are allocated once; update() only writes into them.
+    def __init__(self):
+        self.points = np.zeros((NUM_LANDMARKS, 3), np.float32)
+        self.prev_points = np.zeros((NUM_LANDMARKS, 3), np.float32)
+        self.handedness = UNKNOWN
+        self.score = 0.0
+
+        self.centroid = np.zeros(3, np.float32)
+        self.wrist_velocity = np.zeros(3, np.float32)
+        self.fingertip_velocity = np.zeros((len(FINGERTIPS), 3), np.float32)
+        self.tip_speed = 0.0          # fastest fingertip, image units per second (per step if not timed)
+        self.bbox = np.zeros(4, np.float32)   # x0, y0, x1, y1
+        self.palm_normal = np.zeros(3, np.float32)
+        self.palm_angle = 0.0         # wrist -> middle MCP, radians, 0 = pointing up
+
+        self.valid = False
+        self.has_prev = False
+        self.timed = False            # velocities are per second
+        self.timestamp = None
+
+        self._scratch = np.zeros((NUM_LANDMARKS, 3), np.float32)
+
+    # rect: optional (x0, y0, x1, y1, frame_w, frame_h) crop the landmarks are
+    #       normalized to (see HandTracker ROI mode)
+    # t:    optional timestamp in seconds; velocities are per second when
+    #       given, per update otherwise
+    def update(self, hand, handedness=None, rect=None, t=None):
+        if self.valid:
+            self.prev_points[:] = self.points
+
+        landmarks_to_array(hand, self.points)
+        self.handedness, self.score = handedness_code(handedness)
+
+        if rect is not None:
+            x0, y0, x1, y1, w, h = rect
+            self.points[:, 0] *= (x1 - x0) / w
+            self.points[:, 0] += x0 / w
+            self.points[:, 1] *= (y1 - y0) / h
+            self.points[:, 1] += y0 / h
+
+        return self._derive(t)
+
+    # Same as update() for landmarks that are already a full-frame (21, 3)
+    # array, e.g. read back from a landmark trace
+    def load(self, points, handedness=UNKNOWN, score=0.0, t=None):
+        if self.valid:
+            self.prev_points[:] = self.points
+
+        self.points[:] = points
+        self.handedness = int(handedness)
+        self.score = float(score)
+        return self._derive(t)
+
+    def _derive(self, t):
+        # -------- CENTROID / BOX --------
+        self.points.mean(axis=0, out=self.centroid)
+        self.points[:, :2].min(axis=0, out=self.bbox[:2])
+        self.points[:, :2].max(axis=0, out=self.bbox[2:])
+
+        # -------- PALM ORIENTATION --------
+        # Three 3-vectors: plain float math beats np.cross call overhead here
+        wx, wy, wz = self.points[WRIST].tolist()
+        ix, iy, iz = self.points[INDEX_MCP].tolist()
+        px, py, pz = self.points[PINKY_MCP].tolist()
+        ix, iy, iz = ix - wx, iy - wy, iz - wz
+        px, py, pz = px - wx, py - wy, pz - wz
+        nx = iy * pz - iz * py
+        ny = iz * px - ix * pz
+        nz = ix * py - iy * px
+        norm = math.sqrt(nx * nx + ny * ny + nz * nz) or 1.0
+        self.palm_normal[0] = nx / norm
+        self.palm_normal[1] = ny / norm
+        self.palm_normal[2] = nz / norm
+
+        mx, my, _ = self.points[MIDDLE_MCP].tolist()
+        self.palm_angle = math.atan2(mx - wx, -(my - wy))
+
+        # -------- VELOCITIES --------
+        if self.valid:
+            self.timed = t is not None and self.timestamp is not None and t > self.timestamp
+            dt = t - self.timestamp if self.timed else 1.0
+
+            np.subtract(self.points, self.prev_points, out=self._scratch)
+            self._scratch /= dt
+            self.wrist_velocity[:] = self._scratch[WRIST]
+            self.fingertip_velocity[:] = self._scratch[FINGERTIPS]
+            self.tip_speed = float(np.sqrt((self.fingertip_velocity[:, :2] ** 2).sum(axis=1)).max())
+            self.has_prev = True
+        else:
+            self.wrist_velocity[:] = 0
+            self.fingertip_velocity[:] = 0
+            self.tip_speed = 0.0
+            self.has_prev = False
+            self.timed = False
+
+        self.valid = True
+        self.timestamp = t
+        return self
+
+    def reset(self):
+        self.valid = False
+        self.has_prev = False
+        self.timed = False
+        self.timestamp = None
+
+    def copy(self):
+        # Small fixed-size snapshot for handing features to another thread
+        other = HandFeatures()
+        other.points[:] = self.points
+        other.prev_points[:] = self.prev_points
+        other.handedness = self.handedness
+        other.score = self.score
+        other.centroid[:] = self.centroid
+        other.wrist_velocity[:] = self.wrist_velocity
+        other.fingertip_velocity[:] = self.fingertip_velocity
+        other.tip_speed = self.tip_speed
+        other.bbox[:] = self.bbox
+        other.palm_normal[:] = self.palm_normal
+        other.palm_angle = self.palm_angle
+        other.valid = self.valid
+        other.has_prev = self.has_prev
+        other.timed = self.timed
+        other.timestamp = self.timestamp
+        return other
@@ -0,0 +1,143 @@
+import itertools
+import math
+
+import numpy as np
+
+from vision.landmarks import NUM_LANDMARKS, handedness_code, landmarks_to_array
+from vision.tracker_base import TrackerBase
+
+# Kept free of MediaPipe like tracker_base: detections only need .x / .y
+# landmarks.
+
+# ---------------- ID TRACKING ----------------
+MAX_JUMP = 0.25         # normalized frame units a hand may move between detections
+LOST_FRAMES = 15        # frames a player keeps its identity while unseen
+NEW_HAND_COST = 1.0     # extra cost of (re)starting a slot vs continuing one
+
+class PlayerSlot(TrackerBase):
+    # One player's hand: the usual get_hand_data() state (filter, features,
+    # stroke_delta, trace) plus what the ID tracker needs. data holds this
+    # frame's (cx, cy, dx, dy) with cx relative to the player's own strip
+    # of the frame, so each player covers the whole court from where they
+    # stand; dx / dy stay in frame units for the stroke thresholds.
+    def __init__(self, home_x, width, motion_filter=None, trace=None):
+        super().__init__(motion_filter, trace)
+        self.home_x = home_x
+        self.width = width
+        self.last = None            # raw centroid of the last detection
+        self.missed = 0
+        self.data = (None, None, None, None)
+
+    @property
+    def tracked(self):
+        return self.last is not None and self.missed <= LOST_FRAMES
+
+    def _local(self, data):
+        cx, cy, dx, dy = data
+        if cx is not None:
+            cx = min(1.0, max(0.0, (cx - self.home_x) / self.width + 0.5))
+        return cx, cy, dx, dy
+
+
+def _points(hand, rect, out):
+    # One detection's landmarks as a full-frame (21, 3) array, written into
+    # out; the centroid and the slot's features both read from it
+    landmarks_to_array(hand, out)
+    if rect is not None:
+        x0, y0, x1, y1, w, h = rect
+        out[:, 0] *= (x1 - x0) / w
+        out[:, 0] += x0 / w
+        out[:, 1] *= (y1 - y0) / h
+        out[:, 1] += y0 / h
+    return out
+
+def assign(slots, centroids, max_jump=MAX_JUMP):
+    # Detection index per slot (or None). A tracked slot costs its distance
+    # to the detection and cannot jump further than max_jump; a free slot
+    # takes a detection near its home side at a fixed penalty, so new hands
+    # never steal from tracked ones. Slots and detections may both stay
+    # unmatched: the pick matches as many pairs as the gating allows, at
+    # the lowest total cost among those. Brute force over partial
+    # assignments: a handful of players at most.
+    def cost(slot, point):
+        if slot.tracked:
+            d = math.dist(slot.last, point)
+            return d if d <= max_jump else None
+        return NEW_HAND_COST + abs(point[0] - slot.home_x)
+
+    n = len(slots)
+    for k in range(min(len(centroids), n), 0, -1):
+        best, best_cost = None, math.inf
+        for dets in itertools.permutations(range(len(centroids)), k):
+            for chosen in itertools.combinations(range(n), k):
+                total = 0.0
+                for s, d in zip(chosen, dets):
+                    c = cost(slots[s], centroids[d])
+                    if c is None:
+                        break
+                    total += c
+                else:
+                    if total < best_cost:
+                        best_cost = total
+                        best = [None] * n
+                        for s, d in zip(chosen, dets):
+                            best[s] = d
+        if best is not None:
+            return best
+    return [None] * n
+
+
+# ---------------- PLAYER SLOTS ----------------
+class PlayerSlots:
+    # Player i's home is the i-th vertical strip of the frame (player 1 on
+    # the left of the mirrored picture); that only matters when a hand is
+    # first seen, afterwards each slot follows its own hand. motion_filter
+    # is a vision.filters name: every slot builds its own filter. trace
+    # records player 1 only (the single-hand trace format).
+    def __init__(self, players=2, motion_filter=None, trace=None, max_jump=MAX_JUMP):
+        self.max_jump = max_jump
+        self.slots = [PlayerSlot((i + 0.5) / players, 1.0 / players, motion_filter) for i in range(players)]
+        self.slots[0].trace = trace
+        # Landmarks of this frame's detections, one (21, 3) block per hand;
+        # regrown only when more hands show up than ever before
+        self.points = np.empty((players, NUM_LANDMARKS, 3), np.float32)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __getitem__(self, i):
+        return self.slots[i]
+
+    def update(self, detections, timestamp_ms):
+        # detections: (landmarks, handedness, rect) per hand found this frame
+        count = len(detections)
+        if count > len(self.points):
+            self.points = np.empty((count, NUM_LANDMARKS, 3), np.float32)
+        points = self.points
+        for i, (hand, _, rect) in enumerate(detections):
+            _points(hand, rect, points[i])
+
+        # Every centroid in one reduction, however many hands
+        sums = np.add.reduce(points[:count, :, :2], axis=1).tolist()
+        centroids = [(x / NUM_LANDMARKS, y / NUM_LANDMARKS) for x, y in sums]
+        picks = assign(self.slots, centroids, self.max_jump)
+
+        for slot, pick in zip(self.slots, picks):
+            if pick is None:
+                slot.missed += 1
+                slot.data = slot._lost(timestamp_ms)
+                continue
+            slot.last = centroids[pick]
+            slot.missed = 0
+            handedness, score = handedness_code(detections[pick][1])
+            slot.features.load(points[pick], handedness, score, timestamp_ms / 1000.0)
+            slot.data = slot._local(slot._found(timestamp_ms))
+
+    def stale(self, timestamp_ms=None):
+        # No new inference result this frame (LIVE_STREAM)
+        for slot in self.slots:
+            slot.data = slot._local(slot._stale(timestamp_ms))
+
+    def close(self):
+        for slot in self.slots:
+            slot.close()
@@ -0,0 +1,239 @@
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+# Frame sources all look like cv2.VideoCapture (read / isOpened / release),
+# so they drop into the existing loops unchanged. On top of that each one
+# exposes `timestamp`: seconds since the start of the stream for the frame
+# returned by the last read(). Like VideoCapture.read(image), read(dst)
+# fills dst in place when it has the frame's shape (see runtime/buffers.py).
+#
+# A recorded session is a directory:
+#   meta.json        width, height, count, fps, format ("raw" or "video")
+#   timestamps.npy   float64 capture time of every frame, seconds from start
+#   frames.raw       format "raw": BGR uint8 frames back to back (memory-mapped)
+#   frames.avi       format "video": MJPG-encoded frames
+
+META_FILE = "meta.json"
+TIMESTAMPS_FILE = "timestamps.npy"
+RAW_FILE = "frames.raw"
+VIDEO_FILE = "frames.avi"
+
+
+# ---------------- CAMERA ----------------
+class CameraSource:
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+        self.start = None
+        self.timestamp = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, dst=None):
+        ret, frame = self.cap.read(dst)
+        if not ret:
+            return False, None
+
+        now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+        self.timestamp = now - self.start
+        return True, frame
+
+    def release(self):
+        self.cap.release()
+
+
+# ---------------- REPLAY ----------------
+class _ReplaySource:
+    # realtime=True paces reads to the recorded timestamps (native speed),
+    # realtime=False returns frames as fast as they can be consumed.
+    def __init__(self, timestamps, realtime=True):
+        self.timestamps = timestamps
+        self.realtime = realtime
+        self.index = 0
+        self.wall_start = None
+        self.timestamp = None
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def isOpened(self):
+        return True
+
+    def _pace(self, t=None):
+        # t: this frame's timestamp when it is not in self.timestamps
+        if t is None:
+            t = float(self.timestamps[self.index])
+        if self.realtime:
+            now = time.perf_counter()
+            if self.wall_start is None:
+                self.wall_start = now - t
+            delay = self.wall_start + t - now
+            if delay > 0:
+                time.sleep(delay)
+        self.timestamp = t
+        self.index += 1
+
+    def release(self):
+        pass
+
+
+class RawDumpSource(_ReplaySource):
+    # Frames are served straight from a memory-mapped dump: no decode, and
+    # opening a long session costs nothing up front.
+    def __init__(self, path, realtime=True, copy=True):
+        meta = load_meta(path)
+        shape = (meta["count"], meta["height"], meta["width"], 3)
+        self.frames = np.memmap(os.path.join(path, RAW_FILE), np.uint8, "r", shape=shape)
+        # copy=False hands out read-only views into the map
+        self.copy = copy
+        super().__init__(np.load(os.path.join(path, TIMESTAMPS_FILE)), realtime)
+
+    def read(self, dst=None):
+        if self.index >= len(self.frames):
+            return False, None
+        frame = self.frames[self.index]
+        self._pace()
+        if self.copy and dst is not None and dst.shape == frame.shape:
+            np.copyto(dst, frame)
+            return True, dst
+        return True, np.array(frame) if self.copy else frame
+
+
+class VideoFileSource(_ReplaySource):
+    # Any video file cv2 can decode, read until the decoder runs out: the
+    # container's frame count is 0 or wrong for many files and streams, so
+    # it only sizes the timestamp table (len() is an estimate). Timestamps
+    # come from a recorded session when available, otherwise from the
+    # container frame rate; frames past the table continue at that rate.
+    def __init__(self, path, realtime=True, timestamps=None):
+        self.cap = cv2.VideoCapture(path)
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps > 0 else 30.0
+        if timestamps is None:
+            count = max(0, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+            timestamps = np.arange(count, dtype=np.float64) / self.fps
+        super().__init__(timestamps, realtime)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _time(self, index):
+        known = len(self.timestamps)
+        if index < known:
+            return float(self.timestamps[index])
+        last = float(self.timestamps[-1]) if known else -1 / self.fps
+        return last + (index - known + 1) / self.fps
+
+    def read(self, dst=None):
+        ret, frame = self.cap.read(dst)
+        if not ret:
+            return False, None
+        self._pace(self._time(self.index))
+        return True, frame
+
+    def release(self):
+        self.cap.release()
+
+
+# ---------------- RECORD ----------------
+class SessionRecorder:
+    def __init__(self, path, fmt="raw", fps=30.0):
+        if fmt not in ("raw", "video"):
+            raise ValueError(f"Unknown session format: {fmt}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.fmt = fmt
+        self.fps = fps
+        self.shape = None
+        self.timestamps = []
+        self.file = None
+        self.writer = None
+
+    def write(self, frame, timestamp):
+        if self.shape is None:
+            self.shape = frame.shape
+            if self.fmt == "raw":
+                self.file = open(os.path.join(self.path, RAW_FILE), "wb")
+            else:
+                h, w = frame.shape[:2]
+                self.writer = cv2.VideoWriter(
+                    os.path.join(self.path, VIDEO_FILE),
+                    cv2.VideoWriter_fourcc(*"MJPG"),
+                    self.fps,
+                    (w, h),
+                )
+        elif frame.shape != self.shape:
+            raise ValueError(f"Frame shape changed: {self.shape} -> {frame.shape}")
+
+        if self.file is not None:
+            self.file.write(np.ascontiguousarray(frame).data)
+        else:
+            self.writer.write(frame)
+        self.timestamps.append(timestamp)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        if self.writer is not None:
+            self.writer.release()
+
+        np.save(os.path.join(self.path, TIMESTAMPS_FILE), np.array(self.timestamps, np.float64))
+        h, w = self.shape[:2] if self.shape else (0, 0)
+        meta = {
+            "width": w,
+            "height": h,
+            "count": len(self.timestamps),
+            "fps": self.fps,
+            "format": self.fmt,
+        }
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+
+
+class RecordingSource:
+    # Passes frames through from another source while recording them
+    def __init__(self, source, recorder):
+        self.source = source
+        self.recorder = recorder
+        self.timestamp = None
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def read(self, dst=None):
+        ret, frame = self.source.read(dst)
+        if ret:
+            self.timestamp = self.source.timestamp
+            self.recorder.write(frame, self.timestamp)
+        return ret, frame
+
+    def release(self):
+        self.source.release()
+        self.recorder.close()
+
+
+# ---------------- OPEN ----------------
+def load_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+def open_source(spec=0, realtime=True):
+    # spec: camera index (int or digit string), recorded session directory,
+    #       or a video file path
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec))
+
+    if os.path.isdir(spec):
+        meta = load_meta(spec)
+        if meta["format"] == "raw":
+            return RawDumpSource(spec, realtime)
+        timestamps = np.load(os.path.join(spec, TIMESTAMPS_FILE))
+        return VideoFileSource(os.path.join(spec, VIDEO_FILE), realtime, timestamps)
+
+    return VideoFileSource(spec, realtime)
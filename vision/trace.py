@@ -0,0 +1,141 @@
+import os
+
+import numpy as np
+
+from vision.landmarks import NUM_LANDMARKS
+from vision.tracker_base import TrackerBase
+
+# A landmark trace is a single .npy file holding one record per processed
+# frame. Frames without a hand are kept (ABSENT) so playback sees the same
+# lost / found sequence as the live run, and so are LIVE_STREAM frames that
+# got no new result (STALE), so rows stay in step with the frames. ~270
+# bytes per frame; opened memory-mapped, so long traces load instantly.
+TRACE_DTYPE = np.dtype([
+    ("t", "<f8"),                                  # seconds
+    ("present", "u1"),                             # ABSENT / PRESENT / STALE
+    ("handedness", "i1"),                          # vision.landmarks LEFT / UNKNOWN / RIGHT
+    ("score", "<f4"),
+    ("points", "<f4", (NUM_LANDMARKS, 3)),         # full-frame normalized x, y, z
+])
+ABSENT, PRESENT, STALE = range(3)
+
+CHUNK = 256             # rows buffered between writes (~4 s at 60 FPS)
+
+
+# ---------------- WRITE ----------------
+class TraceWriter:
+    # Rows are buffered in one preallocated chunk and appended to the file
+    # whenever it fills, after which the .npy header is rewritten with the
+    # new row count (the header has a fixed size). A crash or kill loses at
+    # most the last CHUNK rows; the file loads as it stands.
+    def __init__(self, path):
+        # np.save's naming: .npy is added when missing
+        if not str(path).endswith(".npy"):
+            path = f"{path}.npy"
+        self.path = path
+        self.file = open(path, "wb")
+        self.chunk = np.zeros(CHUNK, TRACE_DTYPE)
+        self.fill = 0
+        self.written = 0
+        self._write_header()
+
+    def _write_header(self):
+        self.file.seek(0)
+        np.lib.format.write_array_header_1_0(self.file, {
+            "descr": np.lib.format.dtype_to_descr(TRACE_DTYPE),
+            "fortran_order": False,
+            "shape": (self.written,),
+        })
+        self.file.seek(0, os.SEEK_END)
+
+    def _flush(self):
+        self.file.write(self.chunk[:self.fill].tobytes())
+        self.written += self.fill
+        self.fill = 0
+        self.chunk.fill(0)
+        self._write_header()
+        self.file.flush()
+
+    def _row(self, t, present):
+        if self.fill == CHUNK:
+            self._flush()
+        rec = self.chunk[self.fill]
+        rec["t"] = t
+        rec["present"] = present
+        self.fill += 1
+        return rec
+
+    def append(self, t, features):
+        # One processed frame: its detection, or None when no hand was found
+        if features is None:
+            self._row(t, ABSENT)
+            return
+        rec = self._row(t, PRESENT)
+        rec["handedness"] = features.handedness
+        rec["score"] = features.score
+        rec["points"] = features.points
+
+    def append_stale(self, t):
+        # A frame that produced no new result (LIVE_STREAM)
+        self._row(t, STALE)
+
+    def __len__(self):
+        return self.written + self.fill
+
+    def close(self):
+        if self.file is None:
+            return
+        self._flush()
+        self.file.close()
+        self.file = None
+
+
+def load_trace(path, mmap=True):
+    records = np.load(path, mmap_mode="r" if mmap else None)
+    if records.dtype != TRACE_DTYPE:
+        raise ValueError(f"{path} is not a landmark trace")
+    return records
+
+
+# ---------------- PLAYBACK ----------------
+class TraceTracker(TrackerBase):
+    # Drop-in for HandTracker: each get_hand_data() call consumes the next
+    # recorded detection. The frame argument is ignored (may be None) and the
+    # recorded timestamps are used, so filters see the original timing.
+    def __init__(self, trace, motion_filter=None):
+        super().__init__(motion_filter)
+        self.records = load_trace(trace) if isinstance(trace, str) else trace
+        self.index = 0
+        self.timestamp = None
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def done(self):
+        return self.index >= len(self.records)
+
+    def rewind(self):
+        if self.motion_filter is not None:
+            self.motion_filter.reset()
+        super().__init__(self.motion_filter)
+        self.index = 0
+        self.timestamp = None
+
+    def get_hand_data(self, frame=None, timestamp_ms=None):
+        if self.done:
+            return self._stale()
+
+        rec = self.records[self.index]
+        self.index += 1
+        self.timestamp = float(rec["t"])
+        ts_ms = self.timestamp * 1000
+
+        present = rec["present"]
+        if present == STALE:
+            return self._stale()
+        if present == ABSENT:
+            return self._lost(ts_ms)
+
+        self.features.load(rec["points"], rec["handedness"], rec["score"], self.timestamp)
+        return self._found(ts_ms)
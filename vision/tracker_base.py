@@ -0,0 +1,85 @@
+from vision.filters import REFERENCE_DT, make_filter, peak_delta
+from vision.landmarks import HandFeatures
+
+# Kept free of MediaPipe so trace playback runs on machines without it.
+
+# Turns one detection per frame (HandFeatures or nothing) into the
+# get_hand_data() contract: cx, cy, dx, dy plus stroke_delta. Shared by the
+# live tracker and trace playback (vision/trace.py).
+class TrackerBase:
+    def __init__(self, motion_filter=None, trace=None):
+        self.prev_x = None
+        self.prev_y = None
+        self.hand_visible = False
+
+        # Vectorized landmark features of the last detection
+        self.features = HandFeatures()
+
+        # Optional temporal filter (vision.filters). When set, cx/cy are
+        # smoothed and dx/dy become time-normalized: velocity * REFERENCE_DT,
+        # so thresholds behave the same at 15 or 60 FPS.
+        if isinstance(motion_filter, str):
+            motion_filter = make_filter(motion_filter)
+        self.motion_filter = motion_filter
+
+        # Delta to use for stroke detection this frame. Raw mode: same as
+        # dx/dy. Filtered: the peak velocity, set only on the frame a stroke
+        # stops accelerating (see vision.filters.peak_delta).
+        self.stroke_delta = None
+
+        # Optional vision.trace.TraceWriter recording every detection
+        self.trace = trace
+
+    def _stale(self, timestamp_ms=None):
+        # No new detection this call: keep the last position, report no
+        # motion sample. The trace gets a row for the frame all the same.
+        self.stroke_delta = None
+        if self.trace is not None and timestamp_ms is not None:
+            self.trace.append_stale(timestamp_ms / 1000.0)
+        if not self.hand_visible:
+            return None, None, None, None
+        return self.prev_x, self.prev_y, None, None
+
+    def _lost(self, timestamp_ms):
+        self.hand_visible = False
+        self.stroke_delta = None
+        self.features.reset()
+        if self.motion_filter is not None:
+            self.motion_filter.reset()
+        if self.trace is not None:
+            self.trace.append(timestamp_ms / 1000.0, None)
+        return None, None, None, None
+
+    # Call after self.features has been updated with this frame's detection
+    def _found(self, timestamp_ms):
+        self.hand_visible = True
+        features = self.features
+        if self.trace is not None:
+            self.trace.append(timestamp_ms / 1000.0, features)
+
+        cx = float(features.centroid[0])
+        cy = float(features.centroid[1])
+
+        if self.motion_filter is not None:
+            f = self.motion_filter
+            f.update(timestamp_ms / 1000.0, cx, cy)
+            cx, cy = f.x, f.y
+            dx = f.vx * REFERENCE_DT
+            dy = f.vy * REFERENCE_DT
+            self.stroke_delta = peak_delta(f)
+            self.prev_x, self.prev_y = cx, cy
+            return cx, cy, dx, dy
+
+        dx = dy = 0
+        if self.prev_x is not None:
+            dx = cx - self.prev_x
+            dy = cy - self.prev_y
+
+        self.prev_x, self.prev_y = cx, cy
+        self.stroke_delta = (dx, dy)
+
+        return cx, cy, dx, dy
+
+    def close(self):
+        if self.trace is not None:
+            self.trace.close()